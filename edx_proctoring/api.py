@@ -5,31 +5,47 @@ In-Proc API (aka Library) for the edx_proctoring subsystem. This is not to be co
 API which is in the views.py file, per edX coding standards
 """
 
+import csv
+import io
+import json
 import logging
+import time
 import uuid
 from datetime import datetime, timedelta
+from itertools import islice
 
 import pytz
 from opaque_keys import InvalidKeyError
+from simple_history.utils import bulk_create_with_history, bulk_update_with_history
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ObjectDoesNotExist
 from django.core.mail.message import EmailMessage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
 from django.template import loader
 from django.urls import NoReverseMatch, reverse
 from django.utils.translation import gettext as _
 from django.utils.translation import gettext_noop
 
 from edx_proctoring import constants
-from edx_proctoring.backends import get_backend_provider
+from edx_proctoring.backends import get_backend_provider, outbox
+from edx_proctoring.backends.outbox import send_backend_operation
+from edx_proctoring.cache import (
+    cache_exam,
+    cache_without_active_attempt,
+    get_cached_exam_by_content_id,
+    get_cached_exam_by_id,
+    invalidate_exam_cache,
+    is_cached_without_active_attempt
+)
 from edx_proctoring.exceptions import (
     AllowanceValueNotAllowedException,
     BackendProviderCannotRegisterAttempt,
     BackendProviderNotConfigured,
     BackendProviderOnboardingException,
     BackendProviderSentNoAttemptID,
-    ProctoredBaseException,
     ProctoredExamAlreadyExists,
     ProctoredExamIllegalResumeUpdate,
     ProctoredExamIllegalStatusTransition,
@@ -43,19 +59,30 @@ from edx_proctoring.exceptions import (
     StudentExamAttemptedAlreadyStarted,
     StudentExamAttemptOnPastDueProctoredExam
 )
+from edx_proctoring.instrumentation import instrumented, span
 from edx_proctoring.models import (
+    OnboardingVerification,
     ProctoredExam,
     ProctoredExamReviewPolicy,
+    ProctoredExamSoftwareSecureComment,
     ProctoredExamSoftwareSecureReview,
     ProctoredExamStudentAllowance,
-    ProctoredExamStudentAttempt
+    ProctoredExamStudentAttempt,
+    current_exam_attempts_scope,
+    forget_current_exam_attempts
 )
-from edx_proctoring.runtime import get_runtime_service
+from edx_proctoring.runtime import get_runtime_service, memoize_runtime_services
 from edx_proctoring.serializers import (
     ProctoredExamReviewPolicySerializer,
     ProctoredExamSerializer,
     ProctoredExamStudentAllowanceSerializer,
-    ProctoredExamStudentAttemptSerializer
+    ProctoredExamStudentAttemptSerializer,
+    serialize_attempts
+)
+from edx_proctoring.side_effects import (
+    attempt_side_effect,
+    attempt_side_effects_transaction,
+    dispatch_attempt_side_effect
 )
 from edx_proctoring.signals import exam_attempt_status_signal
 from edx_proctoring.statuses import InstructorDashboardOnboardingAttemptStatus, ProctoredExamStudentAttemptStatus
@@ -423,6 +450,7 @@ def update_exam(exam_id, exam_name=None, time_limit_mins=None, due_date=constant
     if backend is not None:
         proctored_exam.backend = backend
     proctored_exam.save()
+    invalidate_exam_cache(proctored_exam.id, proctored_exam.course_id, proctored_exam.content_id)
 
     # read back exam so we can emit an event on it
     exam = get_exam_by_id(proctored_exam.id)
@@ -446,7 +474,14 @@ def get_exam_by_id(exam_id):
         "is_proctored": true,
         "is_active": true
     }
+
+    Results are served from the exam cache when possible, so callers are
+    always handed a fresh copy which they are free to modify.
     """
+    exam = get_cached_exam_by_id(exam_id)
+    if exam is not None:
+        return exam
+
     proctored_exam = ProctoredExam.get_exam_by_id(exam_id)
     if proctored_exam is None:
         err_msg = (
@@ -455,6 +490,7 @@ def get_exam_by_id(exam_id):
         raise ProctoredExamNotFoundException(err_msg)
 
     serialized_exam_object = ProctoredExamSerializer(proctored_exam)
+    cache_exam(serialized_exam_object.data)
     return serialized_exam_object.data
 
 
@@ -473,7 +509,14 @@ def get_exam_by_content_id(course_id, content_id):
         "is_proctored": true,
         "is_active": true
     }
+
+    Results are served from the exam cache when possible, so callers are
+    always handed a fresh copy which they are free to modify.
     """
+    exam = get_cached_exam_by_content_id(course_id, content_id)
+    if exam is not None:
+        return exam
+
     proctored_exam = ProctoredExam.get_exam_by_content_id(course_id, content_id)
     if proctored_exam is None:
         err_msg = (
@@ -482,6 +525,7 @@ def get_exam_by_content_id(course_id, content_id):
         raise ProctoredExamNotFoundException(err_msg)
 
     serialized_exam_object = ProctoredExamSerializer(proctored_exam)
+    cache_exam(serialized_exam_object.data)
     return serialized_exam_object.data
 
 
@@ -597,14 +641,25 @@ def add_bulk_allowances(exam_ids, user_ids, allowance_type, value):
         )
         raise AllowanceValueNotAllowedException(err_msg)
 
-    # Data processing logic to add allowances to the database
+    if allowance_type == constants.TIME_MULTIPLIER:
+        key = ProctoredExamStudentAllowance.ADDITIONAL_TIME_GRANTED[0]
+    elif isinstance(allowance_type, tuple):
+        key = allowance_type[0]
+    else:
+        key = allowance_type
+
+    # Data processing logic to add allowances to the database.
+    # Users and exams are resolved up front so that the allowances can be written in bulk.
+    exams = {str(exam.id): exam for exam in ProctoredExam.objects.filter(id__in=exam_ids)}
+    user_ids_by_user_info = ProctoredExamStudentAllowance.get_user_ids_by_user_info(user_ids)
+
     successes = 0
     failures = 0
     data = []
+    allowances = []
     for exam_id in exam_ids:
-        try:
-            target_exam = get_exam_by_id(exam_id)
-        except ProctoredExamNotFoundException:
+        target_exam = exams.get(str(exam_id))
+        if target_exam is None:
             log.error(
                 'Attempted to get exam_id=%(exam_id)s, but this exam does not exist.',
                 {
@@ -620,70 +675,57 @@ def add_bulk_allowances(exam_ids, user_ids, allowance_type, value):
                 })
             continue
         if allowance_type == constants.TIME_MULTIPLIER:
-            exam_time = target_exam["time_limit_mins"]
+            exam_time = target_exam.time_limit_mins
             added_time = round(exam_time * multiplier)
-            time_allowed = str(added_time)
-            for user_id in user_ids:
-                try:
-                    add_allowance_for_user(exam_id, user_id,
-                                           ProctoredExamStudentAllowance.ADDITIONAL_TIME_GRANTED,
-                                           time_allowed)
-                    successes += 1
-                    data.append({
-
-                        'exam_id': exam_id,
+            exam_value = str(added_time)
+        else:
+            exam_value = value
+        can_add_allowances = (
+            target_exam.is_active and ProctoredExamStudentAllowance.is_allowance_value_valid(key, exam_value)
+        )
+        for user_id in user_ids:
+            if can_add_allowances and user_id in user_ids_by_user_info:
+                allowances.append((target_exam.id, user_ids_by_user_info[user_id], key, exam_value))
+                successes += 1
+            else:
+                log.error(
+                    ('Failed to add allowance for user_id=%(user_id)s '
+                     'for exam_id=%(exam_id)s'),
+                    {
                         'user_id': user_id,
-                    })
-
-                except ProctoredBaseException:
-                    log.error(
-                        ('Failed to add allowance for user_id=%(user_id)s '
-                         'for exam_id=%(exam_id)s'),
-                        {
-                            'user_id': user_id,
-                            'exam_id': exam_id,
-                        }
-                    )
-                    failures += 1
-                    data.append({
-
                         'exam_id': exam_id,
-                        'user_id': user_id,
-                    })
-        else:
-            for user_id in user_ids:
-                try:
-                    add_allowance_for_user(exam_id, user_id,
-                                           allowance_type,
-                                           value)
-                    successes += 1
-                    data.append({
+                    }
+                )
+                failures += 1
+            data.append({
 
-                        'exam_id': exam_id,
-                        'user_id': user_id,
-                    })
-                except ProctoredBaseException:
-                    log.error(
-                        ('Failed to add allowance for user_id=%(user_id)s '
-                         'for exam_id=%(exam_id)s'),
-                        {
-                            'user_id': user_id,
-                            'exam_id': exam_id,
-                        }
-                    )
-                    failures += 1
-                    data.append({
+                'exam_id': exam_id,
+                'user_id': user_id,
+            })
+
+    serialized_exams = {exam.id: ProctoredExamSerializer(exam).data for exam in exams.values()}
+    for student_allowance, action in ProctoredExamStudentAllowance.add_allowances(allowances):
+        # emit an event for 'allowance.created|updated'
+        event_data = {
+            'allowance_user_id': student_allowance.user_id,
+            'allowance_key': student_allowance.key,
+            'allowance_value': student_allowance.value
+        }
+        emit_event(serialized_exams[student_allowance.proctored_exam_id], f'allowance.{action}',
+                   override_data=event_data)
 
-                        'exam_id': exam_id,
-                        'user_id': user_id,
-                    })
     return data, successes, failures
 
 
-def _check_for_attempt_timeout(attempt):
+def _check_for_attempt_timeout(attempt, time_out=None):
     """
     Helper method to see if the status of an
     exam needs to be updated, e.g. timeout
+
+    An expired attempt is timed out on the spot when ``time_out`` is True, or
+    when it is None and TIME_OUT_EXPIRED_ATTEMPTS_ON_READ is enabled. Otherwise
+    the timeout is only reported in the returned attempt, and left for
+    expire_exam_attempts to persist.
     """
 
     if not attempt:
@@ -702,6 +744,10 @@ def _check_for_attempt_timeout(attempt):
         has_time_expired = now_utc > expires_at
 
         if has_time_expired:
+            if time_out is None:
+                time_out = constants.TIME_OUT_EXPIRED_ATTEMPTS_ON_READ
+            if not time_out:
+                return _get_timed_out_attempt(attempt, expires_at)
             update_attempt_status(
                 attempt['id'],
                 ProctoredExamStudentAttemptStatus.timed_out,
@@ -712,6 +758,59 @@ def _check_for_attempt_timeout(attempt):
     return attempt
 
 
+def _get_timed_out_attempt(attempt, expires_at):
+    """
+    Returns a copy of the serialized attempt as it will be once it is timed out
+    """
+    attempt = dict(attempt)
+    if settings.PROCTORING_SETTINGS.get('ALLOW_TIMED_OUT_STATE', False):
+        attempt['status'] = ProctoredExamStudentAttemptStatus.timed_out
+    else:
+        # see _update_attempt_status, a timeout is then the same as a submission
+        attempt['status'] = ProctoredExamStudentAttemptStatus.submitted
+        attempt['completed_at'] = expires_at
+    return attempt
+
+
+# name of the celery task defined in edx_proctoring.tasks
+EXPIRE_EXAM_ATTEMPTS_TASK = 'edx_proctoring.tasks.expire_exam_attempts_task'
+
+
+def expire_exam_attempts(batch_size=100, sleep_time=0):
+    """
+    Times out the started and ready to submit attempts whose time limit has
+    expired, in batches of ``batch_size`` attempts separated by ``sleep_time``
+    seconds, and returns how many attempts were timed out.
+    """
+    now = datetime.now(pytz.UTC)
+    attempt_ids = list(ProctoredExamStudentAttempt.objects.get_expired_attempts(now).values_list('id', flat=True))
+    timed_out = 0
+    for start in range(0, len(attempt_ids), batch_size):
+        if start and sleep_time:
+            time.sleep(sleep_time)
+        attempts = ProctoredExamStudentAttempt.objects.filter(
+            id__in=attempt_ids[start:start + batch_size]
+        ).select_related('user', 'proctored_exam').order_by('started_at', 'id')
+        for attempt_obj in attempts:
+            attempt = ProctoredExamStudentAttemptSerializer(attempt_obj).data
+            try:
+                updated_attempt = _check_for_attempt_timeout(attempt, time_out=True)
+            except Exception:  # pylint: disable=broad-exception-caught
+                # a failing attempt must not hold back the others
+                log.exception(
+                    'Could not time out expired attempt_id=%(attempt_id)s',
+                    {'attempt_id': attempt['id']}
+                )
+                continue
+            if updated_attempt['status'] != attempt['status']:
+                timed_out += 1
+    log.info(
+        'Timed out %(timed_out)s of %(expired)s expired exam attempts',
+        {'timed_out': timed_out, 'expired': len(attempt_ids)}
+    )
+    return timed_out
+
+
 def _get_exam_attempt(exam_attempt_obj):
     """
     Helper method to commonalize all query patterns
@@ -739,6 +838,27 @@ def get_current_exam_attempt(exam_id, user_id):
     return _get_exam_attempt(exam_attempt_obj)
 
 
+def get_current_exam_attempts(user_id, course_id):
+    """
+    Returns a dictionary of the current attempt of the user on every exam of the
+    course they attempted, keyed by exam id, loaded with a single query.
+
+    Within a current_exam_attempts_scope, later lookups of those attempts by
+    get_current_exam_attempt are served from memory.
+    """
+    attempts = ProctoredExamStudentAttempt.objects.get_current_exam_attempts_for_user(user_id, course_id=course_id)
+    return {exam_id: _get_exam_attempt(attempt) for exam_id, attempt in attempts.items()}
+
+
+def get_current_exam_attempts_for_users(exam_id, user_ids):
+    """
+    Returns a dictionary of the current attempt on the exam of each of the given
+    users who attempted it, keyed by user id, loaded with a single query.
+    """
+    attempts = ProctoredExamStudentAttempt.objects.get_current_exam_attempts_for_users(exam_id, user_ids)
+    return {user_id: _get_exam_attempt(attempt) for user_id, attempt in attempts.items()}
+
+
 def get_exam_attempt_by_id(attempt_id):
     """
     Args:
@@ -788,16 +908,9 @@ def get_exam_attempt_data(exam_id, attempt_id, is_learning_mfe=False):
 
     time_remaining_seconds = get_time_remaining_for_attempt(attempt)
 
-    proctoring_settings = getattr(settings, 'PROCTORING_SETTINGS', {})
-    low_threshold_pct = proctoring_settings.get('low_threshold_pct', .2)
-    critically_low_threshold_pct = proctoring_settings.get('critically_low_threshold_pct', .05)
-
     allowed_time_limit_mins = attempt.get('allowed_time_limit_mins') or 0
 
-    low_threshold = int(low_threshold_pct * float(allowed_time_limit_mins) * 60)
-    critically_low_threshold = int(
-        critically_low_threshold_pct * float(allowed_time_limit_mins) * 60
-    )
+    low_threshold, critically_low_threshold = _get_time_remaining_thresholds(allowed_time_limit_mins)
 
     if not allowed_time_limit_mins or (attempt and is_attempt_ready_to_resume(attempt)):
         allowed_time_limit_mins = _calculate_allowed_mins(exam, attempt['user']['id'])
@@ -854,6 +967,78 @@ def get_exam_attempt_data(exam_id, attempt_id, is_learning_mfe=False):
     return attempt_data
 
 
+def get_active_attempt_heartbeat(user_id, course_id=None):
+    """
+    Returns a compact summary of the user's active exam attempt, suitable for
+    frequent polling by the exam timer, or None if there is no active attempt.
+
+    Unlike get_exam_attempt_data, this reads a single row and never calls out
+    to the proctoring backend. The attempt is not timed out here; that still
+    happens through the full attempt endpoints.
+
+    Returns:
+        dict: {
+            'attempt_id': ...,
+            'exam_id': ...,
+            'course_id': ...,
+            'attempt_status': ...,
+            'modified': <datetime>,
+            'expires_at': <datetime or None if the attempt has not started>,
+            'time_remaining_seconds': ...,
+            'low_threshold_sec': ...,
+            'critically_low_threshold_sec': ...,
+        }
+    """
+    attempt = ProctoredExamStudentAttempt.objects.get_active_student_attempts(user_id, course_id).values(
+        'id',
+        'status',
+        'started_at',
+        'allowed_time_limit_mins',
+        'modified',
+        'proctored_exam_id',
+        'proctored_exam__course_id',
+    ).first()
+    if attempt is None:
+        return None
+
+    allowed_time_limit_mins = attempt['allowed_time_limit_mins'] or 0
+    low_threshold, critically_low_threshold = _get_time_remaining_thresholds(allowed_time_limit_mins)
+
+    expires_at = None
+    if attempt['started_at']:
+        expires_at = attempt['started_at'] + timedelta(minutes=allowed_time_limit_mins)
+
+    return {
+        'attempt_id': attempt['id'],
+        'exam_id': attempt['proctored_exam_id'],
+        'course_id': attempt['proctored_exam__course_id'],
+        'attempt_status': attempt['status'],
+        'modified': attempt['modified'],
+        'expires_at': expires_at,
+        'time_remaining_seconds': get_time_remaining_for_attempt(
+            {'started_at': attempt['started_at'], 'allowed_time_limit_mins': allowed_time_limit_mins}
+        ),
+        'low_threshold_sec': low_threshold,
+        'critically_low_threshold_sec': critically_low_threshold,
+    }
+
+
+def _get_time_remaining_thresholds(allowed_time_limit_mins):
+    """
+    Returns the (low, critically low) remaining time thresholds, in seconds,
+    at which the timer warns the learner
+    """
+    proctoring_settings = getattr(settings, 'PROCTORING_SETTINGS', {})
+    low_threshold_pct = proctoring_settings.get('low_threshold_pct', .2)
+    critically_low_threshold_pct = proctoring_settings.get('critically_low_threshold_pct', .05)
+
+    low_threshold = int(low_threshold_pct * float(allowed_time_limit_mins) * 60)
+    critically_low_threshold = int(
+        critically_low_threshold_pct * float(allowed_time_limit_mins) * 60
+    )
+    return low_threshold, critically_low_threshold
+
+
 def update_exam_attempt(attempt_id, **kwargs):
     """
     Update exam_attempt
@@ -1053,6 +1238,7 @@ def _get_verified_name(user_id, name_affirmation_service):
     return verified_name
 
 
+@instrumented('create_exam_attempt')
 def create_exam_attempt(exam_id, user_id, taking_as_proctored=False):
     """
     Creates an exam attempt for user_id against exam_id. There should only
@@ -1115,21 +1301,23 @@ def create_exam_attempt(exam_id, user_id, taking_as_proctored=False):
         verified_name = None
         if name_affirmation_service:
             verified_name = _get_verified_name(user_id, name_affirmation_service)
-        external_id, force_status, full_name, profile_name = _register_proctored_exam_attempt(
-            user_id, exam_id, exam, attempt_code, review_policy, verified_name,
-        )
+        with span('create_exam_attempt.register'):
+            external_id, force_status, full_name, profile_name = _register_proctored_exam_attempt(
+                user_id, exam_id, exam, attempt_code, review_policy, verified_name,
+            )
 
-    attempt = ProctoredExamStudentAttempt.create_exam_attempt(
-        exam_id,
-        user_id,
-        attempt_code,
-        taking_as_proctored,
-        exam['is_practice_exam'],
-        external_id,
-        review_policy_id=review_policy.id if review_policy else None,
-        status=force_status,
-        time_remaining_seconds=time_remaining_seconds,
-    )
+    with span('create_exam_attempt.save'):
+        attempt = ProctoredExamStudentAttempt.create_exam_attempt(
+            exam_id,
+            user_id,
+            attempt_code,
+            taking_as_proctored,
+            exam['is_practice_exam'],
+            external_id,
+            review_policy_id=review_policy.id if review_policy else None,
+            status=force_status,
+            time_remaining_seconds=time_remaining_seconds,
+        )
 
     exam = get_exam_by_id(exam_id)
     backend = get_backend_provider(exam)
@@ -1394,11 +1582,34 @@ def _is_attempt_resumable(attempt_obj, to_status):
 
 
 # pylint: disable=inconsistent-return-statements,too-many-positional-arguments
+@instrumented('update_attempt_status')
+@memoize_runtime_services
 def update_attempt_status(attempt_id, to_status,
                           raise_if_not_found=True, cascade_effects=True, timeout_timestamp=None,
                           update_attributable_to=None):
     """
     Internal helper to handle state transitions of attempt status
+
+    The side effects of the transition on credit, grades, emails and the
+    proctoring backend are dispatched through edx_proctoring.side_effects, which
+    either runs them inline or queues them to run asynchronously.
+    """
+    with attempt_side_effects_transaction():
+        return _update_attempt_status(
+            attempt_id,
+            to_status,
+            raise_if_not_found=raise_if_not_found,
+            cascade_effects=cascade_effects,
+            timeout_timestamp=timeout_timestamp,
+            update_attributable_to=update_attributable_to,
+        )
+
+
+def _update_attempt_status(attempt_id, to_status,
+                           raise_if_not_found=True, cascade_effects=True, timeout_timestamp=None,
+                           update_attributable_to=None):
+    """
+    Persists a state transition of attempt status and dispatches its side effects
     """
     exam_attempt_obj = ProctoredExamStudentAttempt.objects.get_exam_attempt_by_id(attempt_id)
 
@@ -1481,7 +1692,9 @@ def update_attempt_status(attempt_id, to_status,
     # Update the is_resumable flag of the attempt based on the status transition
     exam_attempt_obj.is_resumable = _is_attempt_resumable(exam_attempt_obj, to_status)
 
-    exam_attempt_obj.save()
+    with span('update_attempt_status.save'):
+        exam_attempt_obj.save()
+    transition_key = f'{attempt_id}.{to_status}.{exam_attempt_obj.modified.isoformat()}'
 
     all_attempts = get_user_attempts_by_exam_id(user_id, exam_id)
 
@@ -1491,8 +1704,6 @@ def update_attempt_status(attempt_id, to_status,
         if ProctoredExamStudentAttemptStatus.needs_credit_status_update(to_status):
 
             # trigger credit workflow, as needed
-            credit_service = get_runtime_service('credit')
-
             if to_status == ProctoredExamStudentAttemptStatus.verified:
                 credit_requirement_status = 'satisfied'
             elif to_status == ProctoredExamStudentAttemptStatus.submitted:
@@ -1502,25 +1713,12 @@ def update_attempt_status(attempt_id, to_status,
             else:
                 credit_requirement_status = 'failed'
 
-            log.info(
-                ('Calling set_credit_requirement_status for '
-                 'user_id=%(user_id)s on course_id=%(course_id)s for '
-                 'content_id=%(content_id)s. status=%(status)s'),
-                {
-                    'user_id': exam_attempt_obj.user_id,
-                    'course_id': exam['course_id'],
-                    'content_id': exam_attempt_obj.proctored_exam.content_id,
-                    'status': credit_requirement_status,
-                }
-            )
-
-            credit_service.set_credit_requirement_status(
-                user_id=exam_attempt_obj.user_id,
-                course_key_or_id=exam['course_id'],
-                req_namespace='proctored_exam',
-                req_name=exam_attempt_obj.proctored_exam.content_id,
-                status=credit_requirement_status
-            )
+            dispatch_attempt_side_effect(attempt_id, transition_key, 'credit_requirement_status', {
+                'user_id': exam_attempt_obj.user_id,
+                'course_id': exam['course_id'],
+                'content_id': exam_attempt_obj.proctored_exam.content_id,
+                'status': credit_requirement_status,
+            })
 
         if cascade_effects and ProctoredExamStudentAttemptStatus.is_a_cascadable_failure(to_status):
             # if user declines attempt, make sure we clear out the external_id and
@@ -1533,156 +1731,34 @@ def update_attempt_status(attempt_id, to_status,
             # will mark other exams as declined because once we fail or decline
             # one exam all other (un-completed) proctored exams will be likewise
             # updated to reflect a declined status
-            # get all other unattempted exams and mark also as declined
-            all_other_exams = ProctoredExam.get_all_exams_for_course(
-                exam_attempt_obj.proctored_exam.course_id,
-                active_only=True
-            )
-
-            # we just want other exams which are proctored and are not practice
-            other_exams = [
-                other_exam
-                for other_exam in all_other_exams
-                if (
-                    other_exam.content_id != exam_attempt_obj.proctored_exam.content_id and
-                    other_exam.is_proctored and not other_exam.is_practice_exam
-                )
-            ]
-
-            for other_exam in other_exams:
-                # see if there was an attempt on those other exams already
-                attempt = get_current_exam_attempt(other_exam.id, user_id)
-                if attempt and ProctoredExamStudentAttemptStatus.is_completed_status(attempt['status']):
-                    # don't touch any completed statuses
-                    # we won't revoke those
-                    continue
-
-                if not attempt:
-                    current_attempt_id = create_exam_attempt(other_exam.id, user_id, taking_as_proctored=False)
-                else:
-                    current_attempt_id = attempt['id']
-
-                # update any new or existing status to declined
-                update_attempt_status(
-                    current_attempt_id,
-                    ProctoredExamStudentAttemptStatus.declined,
-                    cascade_effects=False
-                )
+            with span('update_attempt_status.decline_other_exams'):
+                _decline_other_exam_attempts(exam_attempt_obj)
 
         if ProctoredExamStudentAttemptStatus.needs_grade_override(to_status):
-            grades_service = get_runtime_service('grades')
-
-            if grades_service.should_override_grade_on_rejected_exam(exam['course_id']):
-                log.info(
-                    ('Overriding exam subsection grade for '
-                     'user_id=%(user_id)s on course_id=%(course_id)s for '
-                     'content_id=%(content_id)s. Override '
-                     'earned_all=%(earned_all)s, '
-                     'earned_graded=%(earned_graded)s.'),
-                    {
-                        'user_id': exam_attempt_obj.user_id,
-                        'course_id': exam['course_id'],
-                        'content_id': exam_attempt_obj.proctored_exam.content_id,
-                        'earned_all': REJECTED_GRADE_OVERRIDE_EARNED,
-                        'earned_graded': REJECTED_GRADE_OVERRIDE_EARNED,
-                    }
-                )
-
-                grades_service.override_subsection_grade(
-                    user_id=exam_attempt_obj.user_id,
-                    course_key_or_id=exam['course_id'],
-                    usage_key_or_id=exam_attempt_obj.proctored_exam.content_id,
-                    earned_all=REJECTED_GRADE_OVERRIDE_EARNED,
-                    earned_graded=REJECTED_GRADE_OVERRIDE_EARNED,
-                    overrider=update_attributable_to,
-                    comment=(f'Failed {backend.verbose_name} proctoring'
-                             if backend
-                             else 'Failed Proctoring')
-                )
-
-                certificates_service = get_runtime_service('certificates')
-
-                log.info(
-                    ('Invalidating certificate for user_id=%(user_id)s in course_id=%(course_id)s whose '
-                     'grade dropped below passing threshold due to suspicious proctored exam'),
-                    {
-                        'user_id': exam_attempt_obj.user_id,
-                        'course_id': exam['course_id'],
-                    }
-                )
-
-                # invalidate certificate after overriding subsection grade
-                certificates_service.invalidate_certificate(
-                    user_id=exam_attempt_obj.user_id,
-                    course_key_or_id=exam['course_id']
-                )
+            dispatch_attempt_side_effect(attempt_id, transition_key, 'grade_override', {
+                'user_id': exam_attempt_obj.user_id,
+                'course_id': exam['course_id'],
+                'content_id': exam_attempt_obj.proctored_exam.content_id,
+                'overrider_id': update_attributable_to.id if update_attributable_to else None,
+                'comment': (f'Failed {backend.verbose_name} proctoring'
+                            if backend
+                            else 'Failed Proctoring'),
+            })
 
         if (to_status == ProctoredExamStudentAttemptStatus.verified and
                 ProctoredExamStudentAttemptStatus.needs_grade_override(from_status)):
-            grades_service = get_runtime_service('grades')
-
-            if grades_service.should_override_grade_on_rejected_exam(exam['course_id']):
-                log.info(
-                    ('Deleting override of exam subsection grade for '
-                     'user_id=%(user_id)s on course_id=%(course_id)s for '
-                     'content_id=%(content_id)s. Override '
-                     'earned_all=%(earned_all)s, '
-                     'earned_graded=%(earned_graded)s.'),
-                    {
-                        'user_id': exam_attempt_obj.user_id,
-                        'course_id': exam['course_id'],
-                        'content_id': exam_attempt_obj.proctored_exam.content_id,
-                        'earned_all': REJECTED_GRADE_OVERRIDE_EARNED,
-                        'earned_graded': REJECTED_GRADE_OVERRIDE_EARNED,
-                    }
-                )
-
-                grades_service.undo_override_subsection_grade(
-                    user_id=exam_attempt_obj.user_id,
-                    course_key_or_id=exam['course_id'],
-                    usage_key_or_id=exam_attempt_obj.proctored_exam.content_id,
-                )
-
-        # call service to get course name.
-        credit_service = get_runtime_service('credit')
-        credit_state = credit_service.get_credit_state(
-            exam_attempt_obj.user_id,
-            exam_attempt_obj.proctored_exam.course_id,
-            return_course_info=True
-        )
+            dispatch_attempt_side_effect(attempt_id, transition_key, 'grade_override_undo', {
+                'user_id': exam_attempt_obj.user_id,
+                'course_id': exam['course_id'],
+                'content_id': exam_attempt_obj.proctored_exam.content_id,
+            })
 
-        default_name = _('your course')
-        if credit_state:
-            course_name = credit_state.get('course_name', default_name)
-        else:
-            course_name = default_name
-            log.info(
-                ('While updating attempt status, could not find credit_state for '
-                 'user_id=%(user_id)s in course_id=%(course_id)s'),
-                {
-                    'user_id': exam_attempt_obj.user_id,
-                    'course_id': exam_attempt_obj.proctored_exam.course_id,
-                }
-            )
-        email = create_proctoring_attempt_status_email(
-            exam_attempt_obj,
-            course_name,
-            exam['course_id']
-        )
-        if email:
-            try:
-                email.send()
-            # pylint: disable=broad-exception-caught
-            except Exception as err:
-                log.exception(
-                    ('Exception occurred while trying to send proctoring attempt '
-                     'status email for user_id=%(user_id)s in course_id=%(course_id)s -- %(err)s'),
-                    {
-                        'user_id': exam_attempt_obj.user_id,
-                        'course_id': exam_attempt_obj.proctored_exam.course_id,
-                        'err': err,
-                    }
-                )
+        dispatch_attempt_side_effect(attempt_id, transition_key, 'attempt_status_email', {
+            'attempt_id': attempt_id,
+            'status': exam_attempt_obj.status,
+            'user_id': exam_attempt_obj.user_id,
+            'course_id': exam['course_id'],
+        })
 
     # emit an anlytics event based on the state transition
     # we re-read this from the database in case fields got updated
@@ -1702,35 +1778,335 @@ def update_attempt_status(attempt_id, to_status,
 
         # only proctored/practice exams have a backend
         # timed exams have no backend
-        backend_method = None
+        backend_operation = None
 
         # add_start_time will only have a value of true if this is the first time an
         # attempt is transitioning to started. We only want to notify the backend
         # for the first time an attempt is transitioned to a started status (MST-862).
         if to_status == ProctoredExamStudentAttemptStatus.started and add_start_time:
-            backend_method = backend.start_exam_attempt
+            backend_operation = outbox.START
         elif to_status == ProctoredExamStudentAttemptStatus.submitted:
-            backend_method = backend.stop_exam_attempt
+            backend_operation = outbox.STOP
         elif to_status == ProctoredExamStudentAttemptStatus.error:
-            backend_method = backend.mark_erroneous_exam_attempt
-        if backend_method:
-            backend_method(exam['external_id'], attempt['external_id'])
-    # we use the 'status' field as the name of the event 'verb'
-    emit_event(exam, attempt['status'], attempt=attempt)
+            backend_operation = outbox.ERROR
+        if backend_operation:
+            dispatch_attempt_side_effect(attempt_id, transition_key, outbox.BACKEND_ATTEMPT_UPDATE, {
+                'backend_name': exam['backend'],
+                'operation': backend_operation,
+                'exam_external_id': exam['external_id'],
+                'attempt_external_id': attempt['external_id'],
+            })
+    with span('update_attempt_status.emit_event'):
+        # we use the 'status' field as the name of the event 'verb'
+        emit_event(exam, attempt['status'], attempt=attempt)
 
-    exam_attempt_status_signal.send(
-        sender='edx_proctoring',
-        attempt_id=attempt['id'],
+        exam_attempt_status_signal.send(
+            sender='edx_proctoring',
+            attempt_id=attempt['id'],
+            user_id=user_id,
+            status=attempt['status'],
+            full_name=None,
+            profile_name=None,
+            is_practice_exam=exam['is_practice_exam'],
+            is_proctored=attempt['taking_as_proctored'],
+            backend_supports_onboarding=backend.supports_onboarding if backend else False
+        )
+
+    return attempt['id']
+
+
+def _decline_other_exam_attempts(exam_attempt_obj):
+    """
+    Marks as declined the attempts of the user on all other active proctored
+    exams of the course which are not completed yet, creating the missing
+    attempts as needed.
+
+    This is the cascading effect of a rejected or declined attempt. It has the
+    same outcome as creating and declining those attempts one at a time, but
+    reads and writes all of them at once.
+    """
+    user_id = exam_attempt_obj.user_id
+    other_exams = {
+        exam.id: exam
+        for exam in ProctoredExam.get_all_exams_for_course(
+            exam_attempt_obj.proctored_exam.course_id,
+            active_only=True,
+            proctored_exams_only=True,
+        ).exclude(content_id=exam_attempt_obj.proctored_exam.content_id)
+    }
+    if not other_exams:
+        return
+
+    current_attempts = ProctoredExamStudentAttempt.objects.get_current_exam_attempts_for_user(
+        user_id, exam_ids=list(other_exams)
+    )
+
+    review_policy_ids = dict(
+        ProctoredExamReviewPolicy.objects.filter(
+            proctored_exam_id__in=other_exams
+        ).values_list('proctored_exam_id', 'id')
+    )
+    serialized_exams = {
+        exam_id: ProctoredExamSerializer(exam).data for exam_id, exam in other_exams.items()
+    }
+    backends = {
+        exam_id: get_backend_provider(exam) for exam_id, exam in serialized_exams.items()
+    }
+
+    new_attempts = bulk_create_with_history(
+        [
+            ProctoredExamStudentAttempt(
+                proctored_exam_id=exam_id,
+                user_id=user_id,
+                attempt_code=str(uuid.uuid4()).upper(),
+                taking_as_proctored=False,
+                is_sample_attempt=False,
+                external_id=None,
+                status=ProctoredExamStudentAttemptStatus.created,
+                review_policy_id=review_policy_ids.get(exam_id),
+            )
+            for exam_id in other_exams
+            if exam_id not in current_attempts
+        ],
+        ProctoredExamStudentAttempt,
+    )
+    for attempt in new_attempts:
+        attempt.proctored_exam = other_exams[attempt.proctored_exam_id]
+        attempt.user = exam_attempt_obj.user
+        backend = backends[attempt.proctored_exam_id]
+        exam_attempt_status_signal.send(
+            sender='edx_proctoring',
+            attempt_id=attempt.id,
+            user_id=user_id,
+            status=attempt.status,
+            full_name='',
+            profile_name='',
+            is_practice_exam=False,
+            is_proctored=False,
+            backend_supports_onboarding=backend.supports_onboarding if backend else None
+        )
+        emit_event(serialized_exams[attempt.proctored_exam_id], attempt.status, attempt=_get_exam_attempt(attempt))
+
+    # don't touch any completed statuses, we won't revoke those
+    attempts = [
+        attempt for attempt in current_attempts.values()
+        if not ProctoredExamStudentAttemptStatus.is_completed_status(attempt.status)
+    ] + new_attempts
+    if not attempts:
+        return
+
+    log.info(
+        ('Declining attempt_ids=%(attempt_ids)s of user_id=%(user_id)s '
+         'after the transition of attempt_id=%(attempt_id)s to status=%(status)s'),
+        {
+            'attempt_ids': [attempt.id for attempt in attempts],
+            'user_id': user_id,
+            'attempt_id': exam_attempt_obj.id,
+            'status': exam_attempt_obj.status,
+        }
+    )
+    now = datetime.now(pytz.UTC)
+    for attempt in attempts:
+        attempt.status = ProctoredExamStudentAttemptStatus.declined
+        attempt.is_resumable = _is_attempt_resumable(attempt, ProctoredExamStudentAttemptStatus.declined)
+        attempt.modified = now
+    bulk_update_with_history(
+        attempts, ProctoredExamStudentAttempt, ['status', 'is_resumable', 'modified']
+    )
+    # bulk writes don't send the signals keeping the identity map of current attempts up to date
+    forget_current_exam_attempts()
+
+    for attempt in attempts:
+        attempt.proctored_exam = other_exams[attempt.proctored_exam_id]
+        attempt.user = exam_attempt_obj.user
+        exam = serialized_exams[attempt.proctored_exam_id]
+        backend = backends[attempt.proctored_exam_id]
+        transition_key = f'{attempt.id}.{attempt.status}.{attempt.modified.isoformat()}'
+        # a declined attempt never sends an email, so only the credit requirement is updated
+        dispatch_attempt_side_effect(attempt.id, transition_key, 'credit_requirement_status', {
+            'user_id': user_id,
+            'course_id': exam['course_id'],
+            'content_id': exam['content_id'],
+            'status': 'declined',
+        })
+
+        serialized_attempt = _get_exam_attempt(attempt)
+        emit_event(exam, attempt.status, attempt=serialized_attempt)
+        exam_attempt_status_signal.send(
+            sender='edx_proctoring',
+            attempt_id=attempt.id,
+            user_id=user_id,
+            status=attempt.status,
+            full_name=None,
+            profile_name=None,
+            is_practice_exam=False,
+            is_proctored=serialized_attempt['taking_as_proctored'],
+            backend_supports_onboarding=backend.supports_onboarding if backend else False
+        )
+
+
+@attempt_side_effect('credit_requirement_status')
+def _set_credit_requirement_status(user_id, course_id, content_id, status):
+    """
+    Side effect updating the credit requirement of a proctored exam
+    """
+    log.info(
+        ('Calling set_credit_requirement_status for '
+         'user_id=%(user_id)s on course_id=%(course_id)s for '
+         'content_id=%(content_id)s. status=%(status)s'),
+        {
+            'user_id': user_id,
+            'course_id': course_id,
+            'content_id': content_id,
+            'status': status,
+        }
+    )
+
+    credit_service = get_runtime_service('credit')
+    credit_service.set_credit_requirement_status(
         user_id=user_id,
-        status=attempt['status'],
-        full_name=None,
-        profile_name=None,
-        is_practice_exam=exam['is_practice_exam'],
-        is_proctored=attempt['taking_as_proctored'],
-        backend_supports_onboarding=backend.supports_onboarding if backend else False
+        course_key_or_id=course_id,
+        req_namespace='proctored_exam',
+        req_name=content_id,
+        status=status
     )
 
-    return attempt['id']
+
+@attempt_side_effect('grade_override')
+def _override_grade_for_failed_attempt(user_id, course_id, content_id, overrider_id, comment):
+    """
+    Side effect overriding the subsection grade of a rejected exam, and invalidating the certificate
+    """
+    grades_service = get_runtime_service('grades')
+
+    if grades_service.should_override_grade_on_rejected_exam(course_id):
+        log.info(
+            ('Overriding exam subsection grade for '
+             'user_id=%(user_id)s on course_id=%(course_id)s for '
+             'content_id=%(content_id)s. Override '
+             'earned_all=%(earned_all)s, '
+             'earned_graded=%(earned_graded)s.'),
+            {
+                'user_id': user_id,
+                'course_id': course_id,
+                'content_id': content_id,
+                'earned_all': REJECTED_GRADE_OVERRIDE_EARNED,
+                'earned_graded': REJECTED_GRADE_OVERRIDE_EARNED,
+            }
+        )
+
+        grades_service.override_subsection_grade(
+            user_id=user_id,
+            course_key_or_id=course_id,
+            usage_key_or_id=content_id,
+            earned_all=REJECTED_GRADE_OVERRIDE_EARNED,
+            earned_graded=REJECTED_GRADE_OVERRIDE_EARNED,
+            overrider=USER_MODEL.objects.get(id=overrider_id) if overrider_id else None,
+            comment=comment
+        )
+
+        certificates_service = get_runtime_service('certificates')
+
+        log.info(
+            ('Invalidating certificate for user_id=%(user_id)s in course_id=%(course_id)s whose '
+             'grade dropped below passing threshold due to suspicious proctored exam'),
+            {
+                'user_id': user_id,
+                'course_id': course_id,
+            }
+        )
+
+        # invalidate certificate after overriding subsection grade
+        certificates_service.invalidate_certificate(
+            user_id=user_id,
+            course_key_or_id=course_id
+        )
+
+
+@attempt_side_effect('grade_override_undo')
+def _undo_grade_override_for_verified_attempt(user_id, course_id, content_id):
+    """
+    Side effect deleting the subsection grade override of a rejected exam which was later verified
+    """
+    grades_service = get_runtime_service('grades')
+
+    if grades_service.should_override_grade_on_rejected_exam(course_id):
+        log.info(
+            ('Deleting override of exam subsection grade for '
+             'user_id=%(user_id)s on course_id=%(course_id)s for '
+             'content_id=%(content_id)s. Override '
+             'earned_all=%(earned_all)s, '
+             'earned_graded=%(earned_graded)s.'),
+            {
+                'user_id': user_id,
+                'course_id': course_id,
+                'content_id': content_id,
+                'earned_all': REJECTED_GRADE_OVERRIDE_EARNED,
+                'earned_graded': REJECTED_GRADE_OVERRIDE_EARNED,
+            }
+        )
+
+        grades_service.undo_override_subsection_grade(
+            user_id=user_id,
+            course_key_or_id=course_id,
+            usage_key_or_id=content_id,
+        )
+
+
+@attempt_side_effect('attempt_status_email', best_effort=True)
+def _send_attempt_status_email(attempt_id, status, user_id, course_id):
+    """
+    Side effect emailing the learner about the new status of their attempt
+    """
+    exam_attempt_obj = ProctoredExamStudentAttempt.objects.get_exam_attempt_by_id(attempt_id)
+    if exam_attempt_obj is None:
+        return
+    # the email is about the transition, even if the attempt has changed since
+    exam_attempt_obj.status = status
+
+    # call service to get course name.
+    credit_service = get_runtime_service('credit')
+    credit_state = credit_service.get_credit_state(
+        user_id,
+        course_id,
+        return_course_info=True
+    )
+
+    default_name = _('your course')
+    if credit_state:
+        course_name = credit_state.get('course_name', default_name)
+    else:
+        course_name = default_name
+        log.info(
+            ('While updating attempt status, could not find credit_state for '
+             'user_id=%(user_id)s in course_id=%(course_id)s'),
+            {
+                'user_id': user_id,
+                'course_id': course_id,
+            }
+        )
+    email = create_proctoring_attempt_status_email(
+        exam_attempt_obj,
+        course_name,
+        course_id
+    )
+    if email:
+        # failures are logged with the user and course by the side effect runner, which
+        # also retries them in asynchronous mode
+        email.send()
+
+
+@attempt_side_effect(
+    outbox.BACKEND_ATTEMPT_UPDATE,
+    queue_setting='QUEUE_BACKEND_ATTEMPT_OPERATIONS',
+    batch_runner=outbox.send_queued_backend_operations,
+)
+def _update_backend_attempt(backend_name, operation, exam_external_id, attempt_external_id):
+    """
+    Side effect notifying the proctoring backend that an attempt started, was submitted or errored,
+    or, when queued, was removed
+    """
+    send_backend_operation(backend_name, operation, exam_external_id, attempt_external_id)
 
 
 def create_proctoring_attempt_status_email(exam_attempt_obj, course_name, course_id):
@@ -1984,24 +2360,21 @@ def get_all_exam_attempts(course_id):
     """
     Returns all the exam attempts for the course id.
     """
-    exam_attempts = ProctoredExamStudentAttempt.objects.get_all_exam_attempts(course_id)
-    return [ProctoredExamStudentAttemptSerializer(active_exam).data for active_exam in exam_attempts]
+    return serialize_attempts(ProctoredExamStudentAttempt.objects.get_all_exam_attempts(course_id))
 
 
 def get_filtered_exam_attempts(course_id, search_by):
     """
     Returns all exam attempts for a course id filtered by the search_by string in user names and emails.
     """
-    exam_attempts = ProctoredExamStudentAttempt.objects.get_filtered_exam_attempts(course_id, search_by)
-    return [ProctoredExamStudentAttemptSerializer(active_exam).data for active_exam in exam_attempts]
+    return serialize_attempts(ProctoredExamStudentAttempt.objects.get_filtered_exam_attempts(course_id, search_by))
 
 
 def get_user_attempts_by_exam_id(user_id, exam_id):
     """
     Returns all exam attempts for a given user and exam
     """
-    exam_attempts = ProctoredExamStudentAttempt.objects.get_user_attempts_by_exam_id(user_id, exam_id)
-    return [ProctoredExamStudentAttemptSerializer(active_attempt).data for active_attempt in exam_attempts]
+    return serialize_attempts(ProctoredExamStudentAttempt.objects.get_user_attempts_by_exam_id(user_id, exam_id))
 
 
 def get_last_exam_completion_date(course_id, username):
@@ -2039,26 +2412,37 @@ def get_active_exams_for_user(user_id, course_id=None):
         'allowances': <student allowances as dict of key/value pairs
     }, {}, ...]
 
+    The attempts, their exams and the allowances of the user are loaded with two
+    queries. Users without any active attempt, by far the most common case, may
+    be cached as such, see NO_ACTIVE_ATTEMPT_CACHE_TIMEOUT.
     """
+    if is_cached_without_active_attempt(user_id):
+        return []
+
     result = []
 
-    student_active_exams = ProctoredExamStudentAttempt.objects.get_active_student_attempts(user_id, course_id)
+    student_active_exams = ProctoredExamStudentAttempt.objects.get_active_student_attempts(
+        user_id, course_id
+    ).select_related('proctored_exam', 'user').prefetch_related(Prefetch(
+        'proctored_exam__proctoredexamstudentallowance_set',
+        queryset=ProctoredExamStudentAllowance.objects.filter(user_id=user_id).select_related('user'),
+        to_attr='user_allowances'
+    ))
     for active_exam in student_active_exams:
         # convert the django orm objects
         # into the serialized form.
         exam_serialized_data = ProctoredExamSerializer(active_exam.proctored_exam).data
         active_exam_serialized_data = ProctoredExamStudentAttemptSerializer(active_exam).data
-        student_allowances = ProctoredExamStudentAllowance.get_allowances_for_user(
-            active_exam.proctored_exam.id, user_id
-        )
         allowance_serialized_data = [ProctoredExamStudentAllowanceSerializer(allowance).data for allowance in
-                                     student_allowances]
+                                     active_exam.proctored_exam.user_allowances]
         result.append({
             'exam': exam_serialized_data,
             'attempt': active_exam_serialized_data,
             'allowances': allowance_serialized_data
         })
 
+    if not result and course_id is None:
+        cache_without_active_attempt(user_id)
     return result
 
 
@@ -2309,6 +2693,7 @@ TIMED_EXAM_STATUS_SUMMARY_MAP = {
 }
 
 
+@memoize_runtime_services
 def get_attempt_status_summary(user_id, course_id, content_id):
     """
     Collects a summary about the status of the attempt.
@@ -2346,13 +2731,7 @@ def get_attempt_status_summary(user_id, course_id, content_id):
 
     # check if the exam is not proctored
     if not exam['is_proctored']:
-        summary = {}
-        summary.update(TIMED_EXAM_STATUS_SUMMARY_MAP['_default'])
-        # Note: translate the short description as it was stored unlocalized
-        summary.update({
-            'short_description': _(summary['short_description'])  # pylint: disable=translation-of-non-string
-        })
-        return summary
+        return _get_timed_exam_status_summary()
 
     # let's check credit eligibility
     credit_service = get_runtime_service('credit')
@@ -2368,6 +2747,98 @@ def get_attempt_status_summary(user_id, course_id, content_id):
             return None
 
     attempt = get_current_exam_attempt(exam['id'], user_id)
+    return _get_proctored_exam_status_summary(exam, attempt, credit_state)
+
+
+@memoize_runtime_services
+def get_attempt_status_summaries(user_id, course_id, content_ids):
+    """
+    Collects the summaries about the status of the attempts of the user on
+    several exams of a course, e.g. to render the course outline.
+
+    The exams, the most recent attempts of the user and the credit state are
+    loaded once for all the exams. Returns a dictionary keyed by content_id
+    of the same summaries get_attempt_status_summary returns.
+    """
+    exams = {}
+    missing_content_ids = []
+    for content_id in content_ids:
+        exam = get_cached_exam_by_content_id(course_id, content_id)
+        if exam is None:
+            missing_content_ids.append(content_id)
+        else:
+            exams[content_id] = exam
+    if missing_content_ids:
+        for proctored_exam in ProctoredExam.objects.filter(course_id=course_id, content_id__in=missing_content_ids):
+            exam = ProctoredExamSerializer(proctored_exam).data
+            cache_exam(exam)
+            exams[exam['content_id']] = exam
+
+    summaries = dict.fromkeys(content_ids)
+    not_found_content_ids = [content_id for content_id in content_ids if content_id not in exams]
+    if not_found_content_ids:
+        # this really shouldn't happen, but log it at least
+        log.error(
+            ('Requested attempt status summaries for user_id=%(user_id)s, but could not find exams '
+             'in course_id=%(course_id)s with content_ids=%(content_ids)s'),
+            {
+                'user_id': user_id,
+                'course_id': course_id,
+                'content_ids': not_found_content_ids,
+            }
+        )
+
+    proctored_exams = {}
+    for content_id, exam in exams.items():
+        if exam['is_proctored']:
+            proctored_exams[content_id] = exam
+        else:
+            summaries[content_id] = _get_timed_exam_status_summary()
+    if not proctored_exams:
+        return summaries
+
+    credit_service = get_runtime_service('credit')
+    credit_state = None
+    if credit_service and any(not exam.get('is_practice_exam') for exam in proctored_exams.values()):
+        credit_state = credit_service.get_credit_state(user_id, str(course_id), return_course_info=True)
+        user = USER_MODEL.objects.get(id=user_id)
+        proctored_exams = {
+            content_id: exam for content_id, exam in proctored_exams.items()
+            if exam.get('is_practice_exam') or user.has_perm('edx_proctoring.can_take_proctored_exam', exam)
+        }
+
+    attempts = ProctoredExamStudentAttempt.objects.get_current_exam_attempts_for_user(
+        user_id, exam_ids=[exam['id'] for exam in proctored_exams.values()]
+    )
+
+    for content_id, exam in proctored_exams.items():
+        summaries[content_id] = _get_proctored_exam_status_summary(
+            exam,
+            _get_exam_attempt(attempts.get(exam['id'])),
+            credit_state if not exam.get('is_practice_exam') else None,
+        )
+    return summaries
+
+
+def _get_timed_exam_status_summary():
+    """
+    Returns the attempt status summary of a timed exam
+    """
+    summary = {}
+    summary.update(TIMED_EXAM_STATUS_SUMMARY_MAP['_default'])
+    # Note: translate the short description as it was stored unlocalized
+    summary.update({
+        'short_description': _(summary['short_description'])  # pylint: disable=translation-of-non-string
+    })
+    return summary
+
+
+def _get_proctored_exam_status_summary(exam, attempt, credit_state):
+    """
+    Returns the attempt status summary of a proctored or practice exam given the
+    current attempt of the user on the exam and their credit state
+    """
+    not_practice_exam = not exam.get('is_practice_exam')
     due_date_is_passed = has_due_date_passed(credit_state.get('course_end_date')) if credit_state else False
 
     if attempt:
@@ -2399,8 +2870,8 @@ def get_last_verified_onboarding_attempts_per_user(users_list, backend):
     """
     Returns a dictionary of last verified proctored onboarding attempt for a specific backend,
     keyed off the user_id within the passed in users_list, if attempts exist.
-    This only considers attempts within the last two years, as attempts
-    before this point are considered expired.
+    This only considers attempts whose verification has not expired, and looks them
+    up in the onboarding verifications recorded for each user and backend.
 
     Parameters:
         * users: A list of users object of which we are checking the attempts
@@ -2413,16 +2884,11 @@ def get_last_verified_onboarding_attempts_per_user(users_list, backend):
             455454 (user_id): attempt_object(attempt_id=34303),
         }
     """
-    attempts = ProctoredExamStudentAttempt.objects.get_last_verified_proctored_onboarding_attempts(
+    verifications = OnboardingVerification.objects.get_unexpired_verifications(
         users_list,
         backend,
     )
-    user_attempt_dict = {}
-    for attempt in attempts:
-        user_id = attempt.user_id
-        if not user_attempt_dict.get(user_id):
-            user_attempt_dict[user_id] = attempt
-    return user_attempt_dict
+    return {verification.user_id: verification.verified_attempt for verification in verifications}
 
 
 def _does_time_remain(attempt):
@@ -2897,6 +3363,8 @@ def _get_proctored_exam_view(exam, context, exam_id, user_id, course_id):
         return template.render(context)
 
 
+@instrumented('get_student_view')
+@memoize_runtime_services
 def get_student_view(user_id, course_id, content_id,
                      context, user_role='student'):
     """
@@ -2961,57 +3429,115 @@ def get_student_view(user_id, course_id, content_id,
         sub_view_func = _get_proctored_exam_view
 
     if sub_view_func:
-        return sub_view_func(exam, context, exam_id, user_id, course_id)
+        # the sub view loads the attempt and renders the template of its state
+        with current_exam_attempts_scope(), span(f'get_student_view.{sub_view_func.__name__.lstrip("_")}'):
+            return sub_view_func(exam, context, exam_id, user_id, course_id)
     return None
 
 
+# columns of the exam violation report, followed by one '<status> Comments' column per comment status
+EXAM_VIOLATION_REPORT_FIELDS = (
+    'course_id', 'exam_name', 'username', 'email', 'attempt_code', 'allowed_time_limit_mins',
+    'is_sample_attempt', 'started_at', 'completed_at', 'status', 'review_status', 'provider', 'user_id',
+)
+
+
 def get_exam_violation_report(course_id, include_practice_exams=False):
     """
     Returns proctored exam attempts for the course id, including review details.
     Violation status messages are aggregated as a list per attempt for each
     violation type.
     """
+    return list(iter_exam_violation_report(course_id, include_practice_exams=include_practice_exams))
+
+
+def iter_exam_violation_report(course_id, include_practice_exams=False, chunk_size=1000):
+    """
+    Yields the rows of get_exam_violation_report one at a time, in the same order.
+
+    Attempts are read with a server side cursor, and the reviews and comments of
+    each chunk of ``chunk_size`` attempts are fetched together, so that memory use
+    does not grow with the number of attempts in the course.
+    """
+    attempts = ProctoredExamStudentAttempt.objects.filter(
+        proctored_exam__course_id=course_id
+    ).order_by('proctored_exam__exam_name', '-created').values(
+        'attempt_code', 'allowed_time_limit_mins', 'is_sample_attempt', 'started_at', 'completed_at',
+        'status', 'user_id', 'user__username', 'user__email',
+        'proctored_exam__course_id', 'proctored_exam__exam_name', 'proctored_exam__backend',
+    ).iterator(chunk_size=chunk_size)
+
+    while True:
+        chunk = list(islice(attempts, chunk_size))
+        if not chunk:
+            return
+        reviews = ProctoredExamSoftwareSecureReview.objects.filter(
+            attempt_code__in=[attempt['attempt_code'] for attempt in chunk if attempt['attempt_code']],
+            exam__course_id=course_id,
+            exam__is_practice_exam=include_practice_exams
+        ).only('attempt_code', 'review_status').prefetch_related('proctoredexamsoftwaresecurecomment_set')
+        reviews_by_code = {review.attempt_code: review for review in reviews}
+
+        for attempt in chunk:
+            row = {
+                'course_id': attempt['proctored_exam__course_id'],
+                'exam_name': attempt['proctored_exam__exam_name'],
+                'username': attempt['user__username'],
+                'email': attempt['user__email'],
+                'attempt_code': attempt['attempt_code'],
+                'allowed_time_limit_mins': attempt['allowed_time_limit_mins'],
+                'is_sample_attempt': attempt['is_sample_attempt'],
+                'started_at': attempt['started_at'],
+                'completed_at': attempt['completed_at'],
+                'status': attempt['status'],
+                'review_status': None,
+                'provider': attempt['proctored_exam__backend'],
+                'user_id': attempt['user_id']
+            }
+            review = reviews_by_code.get(attempt['attempt_code'])
+            if review:
+                row['review_status'] = review.review_status
+                for comment in review.proctoredexamsoftwaresecurecomment_set.all():
+                    row.setdefault(f'{comment.status} Comments', []).append(comment.comment)
+            yield row
 
-    attempts_by_code = {
-        attempt['attempt_code']: {
-            'course_id': attempt['proctored_exam']['course_id'],
-            'exam_name': attempt['proctored_exam']['exam_name'],
-            'username': attempt['user']['username'],
-            'email': attempt['user']['email'],
-            'attempt_code': attempt['attempt_code'],
-            'allowed_time_limit_mins': attempt['allowed_time_limit_mins'],
-            'is_sample_attempt': attempt['is_sample_attempt'],
-            'started_at': attempt['started_at'],
-            'completed_at': attempt['completed_at'],
-            'status': attempt['status'],
-            'review_status': None,
-            'provider': attempt['proctored_exam']['backend'],
-            'user_id': attempt['user']['id']
-
-        } for attempt in get_all_exam_attempts(course_id)
-    }
-
-    reviews = ProctoredExamSoftwareSecureReview.objects.prefetch_related(
-        'proctoredexamsoftwaresecurecomment_set'
-    ).filter(
-        exam__course_id=course_id,
-        exam__is_practice_exam=include_practice_exams
-    )
-
-    for review in reviews:
-        attempt_code = review.attempt_code
-        if attempt_code in attempts_by_code:
-            attempts_by_code[attempt_code]['review_status'] = review.review_status
-
-            for comment in review.proctoredexamsoftwaresecurecomment_set.all():
-                comments_key = f'{comment.status} Comments'
-
-                if comments_key not in attempts_by_code[attempt_code]:
-                    attempts_by_code[attempt_code][comments_key] = []
 
-                attempts_by_code[attempt_code][comments_key].append(comment.comment)
+def stream_exam_violation_report(course_id, include_practice_exams=False, output_format='csv'):
+    """
+    Yields the exam violation report of the course as lines of text, either
+    as CSV (with a header line) or as JSON lines. The result can be passed to a
+    StreamingHttpResponse or written to a file.
 
-    return sorted(list(attempts_by_code.values()), key=lambda a: a['exam_name'])
+    In CSV, the comments of each violation status are joined in a single column.
+    """
+    rows = iter_exam_violation_report(course_id, include_practice_exams=include_practice_exams)
+    if output_format == 'jsonl':
+        for row in rows:
+            yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+        return
+    if output_format != 'csv':
+        raise ValueError(f'Unsupported violation report format: {output_format}')
+
+    comment_statuses = ProctoredExamSoftwareSecureComment.objects.filter(
+        review__exam__course_id=course_id,
+        review__exam__is_practice_exam=include_practice_exams
+    ).order_by('status').values_list('status', flat=True).distinct()
+    comment_columns = [f'{status} Comments' for status in comment_statuses]
+    line = io.StringIO()
+    writer = csv.writer(line)
+
+    def _csv_line(values):
+        line.seek(0)
+        line.truncate()
+        writer.writerow(values)
+        return line.getvalue()
+
+    yield _csv_line(EXAM_VIOLATION_REPORT_FIELDS + tuple(comment_columns))
+    for row in rows:
+        yield _csv_line(
+            [row[field] for field in EXAM_VIOLATION_REPORT_FIELDS] +
+            ['; '.join(row.get(column, [])) for column in comment_columns]
+        )
 
 
 def is_backend_dashboard_available(course_id):
@@ -3126,16 +3652,12 @@ def get_onboarding_attempt_data_for_learner(course_id, user, backend):
         }
 
     # otherwise look for another course's verified attempt
-    attempt_dict = get_last_verified_onboarding_attempts_per_user(
-         [user],
-         backend,
-    )
-    verified_attempt = attempt_dict.get(user.id)
+    verification = OnboardingVerification.objects.get_unexpired_verifications([user], backend).first()
 
-    if verified_attempt:
+    if verification:
         return {
             'onboarding_status': InstructorDashboardOnboardingAttemptStatus.other_course_approved,
-            'expiration_date': verified_attempt.modified + timedelta(days=constants.VERIFICATION_DAYS_VALID),
+            'expiration_date': verification.expires_at,
         }
 
     if relevant_attempt:
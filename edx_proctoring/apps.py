@@ -24,9 +24,17 @@ BACKEND_CONFIGURATION_ALLOW_LIST = [
     'exam_sponsor',
     'has_dashboard',
     'help_center_article_url',
+    'http_keep_alive',
+    'http_max_retries',
+    'http_pool_connections',
+    'http_pool_maxsize',
+    'http_retry_backoff',
+    'http_timeouts',
     'integration_specific_email',
     'learner_notification_from_email',
     'needs_oauth',
+    'onboarding_profile_fetch_workers',
+    'onboarding_profile_page_size',
     'organization',
     'passing_statuses',
     'ping_interval',
@@ -3,8 +3,26 @@ Defines the abstract base class that all backends should derive from
 """
 
 import abc
+from concurrent.futures import ThreadPoolExecutor
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from edx_proctoring import constants
+from edx_proctoring.instrumentation import span
+
+# statuses of the responses on which idempotent requests to a backend are retried
+RETRY_STATUSES = (502, 503, 504)
+
+
+class InstrumentedHTTPAdapter(HTTPAdapter):
+    """
+    Transport adapter sending each request to a backend within an instrumentation span
+    """
+
+    def send(self, request, *args, **kwargs):
+        with span(f'backend.http.{request.method.lower()}'):
+            return super().send(request, *args, **kwargs)
 
 
 class ProctoringBackendProvider(metaclass=abc.ABCMeta):
@@ -21,11 +39,71 @@ class ProctoringBackendProvider(metaclass=abc.ABCMeta):
     # whether practice exams map to "onboarding" exams for this backend
     supports_onboarding = False
     help_center_article_url = ''
+    # whether queued attempt operations can be sent in a single update_exam_attempts call
+    supports_batch_attempt_updates = False
+
+    # HTTP transport settings of the backends talking to a remote service
+    # size of the pool of keep-alive connections kept to each host
+    http_pool_maxsize = 10
+    # number of hosts for which connection pools are kept
+    http_pool_connections = 10
+    # number of times failed connections, and idempotent requests answered with
+    # one of RETRY_STATUSES, are retried
+    http_max_retries = 0
+    # backoff factor, in seconds, between retries
+    http_retry_backoff = 0.5
+    # whether connections are kept open between requests
+    http_keep_alive = True
+    # timeouts of the requests made to each endpoint of the backend, in seconds
+    # or as a [connect, read] pair, keyed by endpoint name. The 'default' entry
+    # applies to the endpoints not listed.
+    http_timeouts = None
+    # timeout used when http_timeouts configures neither the endpoint nor a default
+    default_http_timeout = None
+
+    # paging of the onboarding profiles of a course, see get_all_onboarding_profiles
+    # number of profiles requested per page
+    onboarding_profile_page_size = 500
+    # maximum number of pages requested concurrently
+    onboarding_profile_fetch_workers = 4
 
     def __init__(self, **kwargs):
         for key, value in kwargs.items():
             setattr(self, key, value)
 
+    def configure_http_session(self, session):
+        """
+        Mounts a pooled, retrying transport adapter on the given requests
+        session, following the http_* settings of the backend, and returns it
+        """
+        retries = Retry(
+            total=self.http_max_retries,
+            backoff_factor=self.http_retry_backoff,
+            status_forcelist=RETRY_STATUSES,
+            raise_on_status=False,
+        )
+        adapter = InstrumentedHTTPAdapter(
+            pool_connections=self.http_pool_connections,
+            pool_maxsize=self.http_pool_maxsize,
+            max_retries=retries,
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        if not self.http_keep_alive:
+            session.headers['Connection'] = 'close'
+        return session
+
+    def get_http_timeout(self, endpoint):
+        """
+        Returns the timeout of the requests made to the given endpoint
+        """
+        timeouts = self.http_timeouts or {}
+        timeout = timeouts.get(endpoint, timeouts.get('default', self.default_http_timeout))
+        if isinstance(timeout, list):
+            # settings loaded from json/yaml hold lists rather than tuples
+            timeout = tuple(timeout)
+        return timeout
+
     @abc.abstractmethod
     def register_exam_attempt(self, exam, context):
         """
@@ -64,6 +142,25 @@ class ProctoringBackendProvider(metaclass=abc.ABCMeta):
         """
         raise NotImplementedError()
 
+    def update_exam_attempts(self, operations):
+        """
+        Applies a batch of queued attempt operations on the backend.
+
+        operations: list of {'exam_id': ..., 'attempt_id': ..., 'operation': ...}
+        dictionaries, where operation is one of start, stop, error or remove.
+
+        This default implementation applies them one at a time. Backends with a
+        batch endpoint override it and set supports_batch_attempt_updates.
+        """
+        methods = {
+            'start': self.start_exam_attempt,
+            'stop': self.stop_exam_attempt,
+            'error': self.mark_erroneous_exam_attempt,
+            'remove': self.remove_exam_attempt,
+        }
+        for operation in operations:
+            methods[operation['operation']](operation['exam_id'], operation['attempt_id'])
+
     @abc.abstractmethod
     def get_software_download_url(self):
         """
@@ -140,9 +237,39 @@ class ProctoringBackendProvider(metaclass=abc.ABCMeta):
     def get_onboarding_profile_info(self, course_id, **kwargs):
         """
         Returns onboarding profile information for a given course and optional user
+
+        The profiles of a course are returned in pages: backends accept ``page`` and
+        ``page_size`` arguments, and return the profiles of the requested page under
+        ``results`` and the number of pages under ``num_pages``.
         """
         return None
 
+    def get_all_onboarding_profiles(self, course_id, **kwargs):
+        """
+        Returns the onboarding profiles of all the pages for a given course, or None
+        if the backend has no onboarding profiles.
+
+        The first page is requested on its own, to learn the number of pages, then
+        the others are requested concurrently by up to onboarding_profile_fetch_workers
+        threads. The first error of a page request is raised.
+        """
+        def get_page(page):
+            return self.get_onboarding_profile_info(
+                course_id, page=page, page_size=self.onboarding_profile_page_size, **kwargs
+            )
+
+        first_page = get_page(1)
+        if first_page is None:
+            return None
+        profiles = list(first_page.get('results', []))
+        num_pages = first_page.get('num_pages') or 1
+        if num_pages > 1:
+            workers = min(self.onboarding_profile_fetch_workers, num_pages - 1)
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='onboarding_profiles') as executor:
+                for page in executor.map(get_page, range(2, num_pages + 1)):
+                    profiles.extend(page.get('results', []))
+        return profiles
+
     def get_proctoring_config(self):
         """
         Returns the metadata and configuration options for the proctoring service
@@ -0,0 +1,138 @@
+"""
+Attempt operations sent to the proctoring backends.
+
+Starting, stopping, erroring and removing an attempt each make a call to the
+proctoring backend, through the backend_attempt_update attempt side effect. By
+default these calls are made inline. When attempt side effects are queued, with
+ASYNC_ATTEMPT_SIDE_EFFECTS, or with QUEUE_BACKEND_ATTEMPT_OPERATIONS for the
+backend calls only, they are sent by the attempt side effect runner, so that a
+slow or failing backend never stalls learner requests.
+
+When sending queued operations, the redundant operations of each attempt are
+superseded: the repetitions of the same operation, and every operation followed
+by the removal of the attempt. Backends which set
+``supports_batch_attempt_updates`` receive all the operations of a batch in a
+single ``update_exam_attempts`` call.
+"""
+
+from collections import defaultdict
+
+from edx_proctoring.backends import get_backend_provider
+from edx_proctoring.exceptions import BackendProviderCannotRemoveAttempt
+from edx_proctoring.statuses import AttemptSideEffectStatus
+
+# attempt side effect type of the backend operations
+BACKEND_ATTEMPT_UPDATE = 'backend_attempt_update'
+
+START = 'start'
+STOP = 'stop'
+ERROR = 'error'
+REMOVE = 'remove'
+
+# backend method called for each operation
+OPERATION_METHODS = {
+    START: 'start_exam_attempt',
+    STOP: 'stop_exam_attempt',
+    ERROR: 'mark_erroneous_exam_attempt',
+    REMOVE: 'remove_exam_attempt',
+}
+
+
+def send_backend_operation(backend_name, operation, exam_external_id, attempt_external_id):
+    """
+    Sends the operation to the backend, and returns the result of the backend call
+    """
+    backend = get_backend_provider(name=backend_name)
+    return getattr(backend, OPERATION_METHODS[operation])(exam_external_id, attempt_external_id)
+
+
+def _coalesce(side_effects):
+    """
+    Splits the queued operations, in the order they were queued, into the ones to send
+    and the ones which are redundant
+    """
+    side_effects_by_attempt = defaultdict(list)
+    for side_effect in side_effects:
+        side_effects_by_attempt[side_effect.attempt_id].append(side_effect)
+
+    to_send = []
+    superseded = []
+    for attempt_side_effects in side_effects_by_attempt.values():
+        # nothing needs to be sent before the attempt is removed
+        last_removal = max(
+            (
+                index for index, side_effect in enumerate(attempt_side_effects)
+                if side_effect.payload['operation'] == REMOVE
+            ),
+            default=0
+        )
+        superseded.extend(attempt_side_effects[:last_removal])
+        remaining = attempt_side_effects[last_removal:]
+        for side_effect, next_side_effect in zip(remaining, remaining[1:] + [None]):
+            # of consecutive repetitions of an operation, only the last one is sent
+            if next_side_effect and next_side_effect.payload == side_effect.payload:
+                superseded.append(side_effect)
+            else:
+                to_send.append(side_effect)
+    return sorted(to_send, key=lambda side_effect: side_effect.id), superseded
+
+
+def send_queued_backend_operations(side_effects):
+    """
+    Runs queued backend_attempt_update side effects, and returns their outcomes by id
+    """
+    to_send, superseded = _coalesce(side_effects)
+    outcomes = {side_effect.id: AttemptSideEffectStatus.superseded for side_effect in superseded}
+
+    side_effects_by_backend = defaultdict(list)
+    for side_effect in to_send:
+        side_effects_by_backend[side_effect.payload['backend_name']].append(side_effect)
+    for backend_name, backend_side_effects in side_effects_by_backend.items():
+        outcomes.update(_send_operations(backend_name, backend_side_effects))
+    return outcomes
+
+
+def _send_operations(backend_name, side_effects):
+    """
+    Sends the operations of queued side effects to a backend, in a single batch if the backend
+    supports it, and returns their outcomes by id
+    """
+    try:
+        backend = get_backend_provider(name=backend_name)
+    except Exception as err:  # pylint: disable=broad-exception-caught
+        # e.g. a backend which was renamed or removed, the operations are retried until they fail
+        return {side_effect.id: err for side_effect in side_effects}
+
+    if backend.supports_batch_attempt_updates and len(side_effects) > 1:
+        try:
+            backend.update_exam_attempts([
+                {
+                    'exam_id': side_effect.payload['exam_external_id'],
+                    'attempt_id': side_effect.payload['attempt_external_id'],
+                    'operation': side_effect.payload['operation'],
+                }
+                for side_effect in side_effects
+            ])
+        except Exception as err:  # pylint: disable=broad-exception-caught
+            return {side_effect.id: err for side_effect in side_effects}
+        return {side_effect.id: AttemptSideEffectStatus.done for side_effect in side_effects}
+
+    outcomes = {}
+    # attempts whose remaining operations must wait, since an older one failed
+    failed_attempt_ids = set()
+    for side_effect in side_effects:
+        if side_effect.attempt_id in failed_attempt_ids:
+            continue
+        operation = side_effect.payload['operation']
+        try:
+            result = getattr(backend, OPERATION_METHODS[operation])(
+                side_effect.payload['exam_external_id'], side_effect.payload['attempt_external_id']
+            )
+            if operation == REMOVE and not result:
+                raise BackendProviderCannotRemoveAttempt(f'backend={backend_name} did not remove the attempt')
+        except Exception as err:  # pylint: disable=broad-exception-caught
+            outcomes[side_effect.id] = err
+            failed_attempt_ids.add(side_effect.attempt_id)
+        else:
+            outcomes[side_effect.id] = AttemptSideEffectStatus.done
+    return outcomes
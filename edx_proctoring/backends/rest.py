@@ -3,6 +3,7 @@ Base implementation of a REST backend, following the API documented in
 docs/backends.rst
 """
 
+import hashlib
 import logging
 import time
 import uuid
@@ -17,6 +18,7 @@ from webpack_loader.utils import get_files
 from django.conf import settings
 
 from edx_proctoring.backends.backend import ProctoringBackendProvider
+from edx_proctoring.cache import get_cached_proctoring_config, invalidate_proctoring_config_cache
 from edx_proctoring.exceptions import (
     BackendProviderCannotRegisterAttempt,
     BackendProviderCannotRetireUser,
@@ -52,6 +54,11 @@ class BaseRestProctoringProvider(ProctoringBackendProvider):
         "Returns the create exam url"
         return self.base_url + '/api/v1/exam/{exam_id}/attempt/'
 
+    @property
+    def exam_attempts_batch_url(self):
+        "Returns the url to update several exam attempts at once"
+        return self.base_url + '/api/v1/attempts/'
+
     @property
     def create_exam_url(self):
         "Returns create exam url"
@@ -97,7 +104,9 @@ class BaseRestProctoringProvider(ProctoringBackendProvider):
         super().__init__(**kwargs)
         self.client_id = client_id
         self.client_secret = client_secret
-        self.session = OAuthAPIClient(self.base_url, self.client_id, self.client_secret)
+        self.session = self.configure_http_session(
+            OAuthAPIClient(self.base_url, self.client_id, self.client_secret)
+        )
 
     def get_javascript(self):
         """
@@ -142,14 +151,41 @@ class BaseRestProctoringProvider(ProctoringBackendProvider):
         """
         return self.get_proctoring_config().get('download_url', None)
 
+    @property
+    def config_cache_id(self):
+        "Returns the identifier under which the configurations of this backend are cached"
+        backend = f'{self.__class__.__module__}.{self.__class__.__qualname__}|{self.base_url}|{self.client_id}'
+        return hashlib.md5(backend.encode('utf-8')).hexdigest()
+
     def get_proctoring_config(self):
         """
-        Returns the metadata and configuration options for the proctoring service
+        Returns the metadata and configuration options for the proctoring service.
+
+        Configurations are cached per language, see PROCTORING_CONFIG_CACHE_TIMEOUT.
+        """
+        headers = self._get_language_headers()
+        return get_cached_proctoring_config(
+            self.config_cache_id,
+            headers['Accept-Language'],
+            lambda: self._request_proctoring_config(headers),
+        )
+
+    def _request_proctoring_config(self, headers):
+        """
+        Requests the configuration of the proctoring service, returning it along
+        with whether it may be cached
         """
         url = self.config_url
         log.debug('Requesting config from %r', url)
-        response = self.session.get(url, headers=self._get_language_headers()).json()
-        return response
+        response = self.session.get(url, headers=headers, timeout=self.get_http_timeout('config'))
+        return response.json(), response.ok
+
+    def invalidate_proctoring_config(self):
+        """
+        Drops the cached configurations of the proctoring service, so that they
+        are requested again on their next use
+        """
+        invalidate_proctoring_config_cache(self.config_cache_id)
 
     def get_exam(self, exam):
         """
@@ -157,7 +193,7 @@ class BaseRestProctoringProvider(ProctoringBackendProvider):
         """
         url = self.exam_url.format(exam_id=exam['id'])
         log.debug('Requesting exam from %r', url)
-        response = self.session.get(url).json()
+        response = self.session.get(url, timeout=self.get_http_timeout('exam')).json()
         return response
 
     def get_attempt(self, attempt):
@@ -187,7 +223,7 @@ class BaseRestProctoringProvider(ProctoringBackendProvider):
             'Creating exam attempt for exam_id=%(exam_id)i (external_id=%(external_id)s) at %(url)s',
             {'exam_id': exam['id'], 'external_id': exam['external_id'], 'url': url}
         )
-        response = self.session.post(url, json=payload)
+        response = self.session.post(url, json=payload, timeout=self.get_http_timeout('attempt'))
         if response.status_code != 200:
             raise BackendProviderCannotRegisterAttempt(response.content, response.status_code)
         status_code = response.status_code
@@ -247,6 +283,32 @@ class BaseRestProctoringProvider(ProctoringBackendProvider):
             method='PATCH')
         return response.get('status')
 
+    def update_exam_attempts(self, operations):
+        """
+        Sends a batch of attempt status changes and removals to the backend
+        provider. Only used by subclasses which set supports_batch_attempt_updates.
+        """
+        statuses = {
+            'start': ProctoredExamStudentAttemptStatus.started,
+            'stop': ProctoredExamStudentAttemptStatus.submitted,
+            'error': ProctoredExamStudentAttemptStatus.error,
+            'remove': 'deleted',
+        }
+        payload = [
+            {
+                'exam_id': operation['exam_id'],
+                'attempt_id': operation['attempt_id'],
+                'status': statuses[operation['operation']],
+            }
+            for operation in operations
+        ]
+        log.debug('Making batch attempt request at %r', self.exam_attempts_batch_url)
+        response = self.session.patch(
+            self.exam_attempts_batch_url, json=payload, timeout=self.get_http_timeout('attempt')
+        )
+        response.raise_for_status()
+        return response.json()
+
     def on_review_callback(self, attempt, payload):
         """
         Called when the reviewing 3rd party service posts back the results
@@ -272,7 +334,7 @@ class BaseRestProctoringProvider(ProctoringBackendProvider):
         )
         response = None
         try:
-            response = self.session.post(url, json=exam)
+            response = self.session.post(url, json=exam, timeout=self.get_http_timeout('exam'))
             data = response.json()
         except Exception as exc:  # pylint: disable=broad-exception-caught
             if response:
@@ -328,7 +390,7 @@ class BaseRestProctoringProvider(ProctoringBackendProvider):
     def retire_user(self, user_id):
         url = self.user_info_url.format(user_id=user_id)
         try:
-            response = self.session.delete(url)
+            response = self.session.delete(url, timeout=self.get_http_timeout('user'))
             data = response.json()
             assert data in (True, False)
         except Exception as exc:
@@ -346,7 +408,7 @@ class BaseRestProctoringProvider(ProctoringBackendProvider):
             query_string = urlencode(kwargs)
             url += '?' + query_string
 
-        response = self.session.get(url)
+        response = self.session.get(url, timeout=self.get_http_timeout('onboarding'))
 
         if response.status_code != 200:
             raise BackendProviderOnboardingProfilesException(response.content, response.status_code)
@@ -384,7 +446,9 @@ class BaseRestProctoringProvider(ProctoringBackendProvider):
         if method == 'GET':
             headers.update(self._get_language_headers())
         log.debug('Making %r attempt request at %r', method, url)
-        response = self.session.request(method, url, json=payload, headers=headers)
+        response = self.session.request(
+            method, url, json=payload, headers=headers, timeout=self.get_http_timeout('attempt')
+        )
         try:
             data = response.json()
         except ValueError:
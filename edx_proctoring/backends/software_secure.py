@@ -38,6 +38,7 @@ class SoftwareSecureBackendProvider(ProctoringBackendProvider):
     """
     verbose_name = 'RPNow'
     passing_statuses = SoftwareSecureReviewStatus.passing_statuses
+    default_http_timeout = 10
 
     # pylint: disable=too-many-positional-arguments
     def __init__(self, organization, exam_sponsor, exam_register_endpoint,
@@ -55,7 +56,8 @@ class SoftwareSecureBackendProvider(ProctoringBackendProvider):
         if isinstance(crypto_key, str):
             crypto_key = crypto_key.encode('utf-8')
         self.crypto_key = crypto_key
-        self.timeout = 10
+        # reuse connections to SoftwareSecure across registrations
+        self.session = self.configure_http_session(requests.Session())
         self.software_download_url = software_download_url
         self.send_email = send_email
         self.video_review_aes_key = video_review_aes_key
@@ -351,7 +353,7 @@ class SoftwareSecureBackendProvider(ProctoringBackendProvider):
         """
         Performs the webservice call to SoftwareSecure
         """
-        response = requests.post(
+        response = self.session.post(
             self.exam_register_endpoint,
             headers={
                 'Content-Type': 'application/json',
@@ -359,7 +361,7 @@ class SoftwareSecureBackendProvider(ProctoringBackendProvider):
                 "Date": date
             },
             data=json.dumps(data),
-            timeout=self.timeout
+            timeout=self.get_http_timeout('register')
         )
 
         return response.status_code, response.text
@@ -3,10 +3,12 @@ Tests for backend.py
 """
 
 import time
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
+
+import requests
 
 from django.core.exceptions import ImproperlyConfigured
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from edx_proctoring.backends import get_backend_provider
 from edx_proctoring.backends.backend import ProctoringBackendProvider
@@ -15,6 +17,7 @@ from edx_proctoring.backends.null import NullBackendProvider
 from edx_proctoring.exceptions import (
     BackendProviderCannotRetireUser,
     BackendProviderOnboardingException,
+    BackendProviderOnboardingProfilesException,
     BackendProviderSentNoAttemptID
 )
 
@@ -250,6 +253,76 @@ class TestBackends(TestCase):
         self.assertIsNone(provider.on_review_callback(None, None))
         self.assertIsNone(provider.on_exam_saved(None))
 
+    def test_update_exam_attempts(self):
+        """
+        The default batch update applies each operation in turn
+        """
+        provider = TestBackendProvider()
+        provider.update_exam_attempts([
+            {'exam_id': 'exam', 'attempt_id': 'a', 'operation': 'stop'},
+            {'exam_id': 'exam', 'attempt_id': 'b', 'operation': 'remove'},
+        ])
+        self.assertEqual(provider.last_attempt_remove, ('exam', 'b'))
+        self.assertFalse(provider.supports_batch_attempt_updates)
+
+    def test_configure_http_session(self):
+        """
+        The transport adapter follows the http settings of the backend
+        """
+        provider = TestBackendProvider(
+            http_pool_maxsize=25, http_max_retries=3, http_keep_alive=False
+        )
+        session = provider.configure_http_session(requests.Session())
+        adapter = session.get_adapter('https://proctoring.example.com')
+        self.assertEqual(adapter._pool_maxsize, 25)  # pylint: disable=protected-access
+        self.assertEqual(adapter.max_retries.total, 3)
+        self.assertIn(502, adapter.max_retries.status_forcelist)
+        self.assertEqual(session.headers['Connection'], 'close')
+
+        session = TestBackendProvider().configure_http_session(requests.Session())
+        self.assertEqual(session.get_adapter('http://proctoring.example.com').max_retries.total, 0)
+        self.assertEqual(session.headers['Connection'], 'keep-alive')
+
+    def test_get_http_timeout(self):
+        """
+        Timeouts are looked up per endpoint, falling back to the default ones
+        """
+        provider = TestBackendProvider()
+        self.assertIsNone(provider.get_http_timeout('config'))
+
+        provider = TestBackendProvider(http_timeouts={'config': [1, 2], 'default': 5})
+        self.assertEqual(provider.get_http_timeout('config'), (1, 2))
+        self.assertEqual(provider.get_http_timeout('attempt'), 5)
+
+    def test_get_all_onboarding_profiles(self):
+        """
+        The pages of onboarding profiles after the first one are requested concurrently
+        """
+        def get_page(course_id, page, page_size, **kwargs):
+            self.assertEqual((course_id, page_size, kwargs), ('test', 2, {'status': 'approved-in-course'}))
+            return {'num_pages': 3, 'results': [f'{page}a', f'{page}b'] if page < 3 else ['3a']}
+
+        provider = TestBackendProvider(onboarding_profile_page_size=2)
+        self.assertIsNone(provider.get_all_onboarding_profiles('test'))
+
+        with patch.object(TestBackendProvider, 'get_onboarding_profile_info', side_effect=get_page) as mock_get:
+            profiles = provider.get_all_onboarding_profiles('test', status='approved-in-course')
+        self.assertEqual(profiles, ['1a', '1b', '2a', '2b', '3a'])
+        self.assertEqual(sorted(call.kwargs['page'] for call in mock_get.call_args_list), [1, 2, 3])
+
+    def test_get_all_onboarding_profiles_error(self):
+        """
+        Errors of the requests of later pages are raised
+        """
+        def get_page(course_id, page, page_size):  # pylint: disable=unused-argument
+            if page == 2:
+                raise BackendProviderOnboardingProfilesException('error', 500)
+            return {'num_pages': 3, 'results': [page]}
+
+        with patch.object(TestBackendProvider, 'get_onboarding_profile_info', side_effect=get_page):
+            with self.assertRaises(BackendProviderOnboardingProfilesException):
+                TestBackendProvider().get_all_onboarding_profiles('test')
+
     def test_mock_provider(self):
         """
         Test that the mock backend provider does what we expect it to do.
@@ -338,6 +411,30 @@ class BackendChooserTests(TestCase):
         ]
         self.assertEqual(choices, expected)
 
+    @override_settings(PROCTORING_BACKENDS={
+        'test': {'onboarding_profile_page_size': 50, 'onboarding_profile_fetch_workers': 2, 'unknown_option': 1},
+        'DEFAULT': 'test',
+    })
+    @patch('edx_proctoring.apps.make_worker_config')
+    def test_backend_configuration(self, mock_make_worker_config):  # pylint: disable=unused-argument
+        """
+        Test that the allowed options of PROCTORING_BACKENDS are passed to the backends
+        """
+        from django.apps import apps  # pylint: disable=import-outside-toplevel
+        config = apps.get_app_config('edx_proctoring')
+        backends = config.backends
+        extension = MagicMock(plugin=TestBackendProvider)
+        extension.name = 'test'
+        try:
+            with patch('edx_proctoring.apps.ExtensionManager', return_value=[extension]):
+                config.ready()
+            backend = get_backend_provider(name='test')
+            self.assertEqual(backend.onboarding_profile_page_size, 50)
+            self.assertEqual(backend.onboarding_profile_fetch_workers, 2)
+            self.assertFalse(hasattr(backend, 'unknown_option'))
+        finally:
+            config.backends = backends
+
     def test_no_backend_for_timed_exams(self):
         """
         Timed exams should not return a backend, even if one has accidentally been set
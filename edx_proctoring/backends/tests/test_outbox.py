@@ -0,0 +1,206 @@
+"""
+Tests for the backend attempt operations sent through the attempt side effect outbox
+"""
+from datetime import datetime
+from itertools import count
+from unittest.mock import MagicMock, call, patch
+
+import pytz
+
+from edx_proctoring.api import update_attempt_status
+from edx_proctoring.backends import outbox
+from edx_proctoring.backends.tests.test_backend import TestBackendProvider
+from edx_proctoring.models import ProctoredExamStudentAttemptSideEffect
+from edx_proctoring.side_effects import dispatch_attempt_side_effect, process_attempt_side_effects
+from edx_proctoring.statuses import AttemptSideEffectStatus, ProctoredExamStudentAttemptStatus
+from edx_proctoring.tests.test_utils.utils import ProctoredExamTestCase
+
+
+@patch('django.urls.reverse', MagicMock)
+@patch('edx_proctoring.constants.QUEUE_BACKEND_ATTEMPT_OPERATIONS', True)
+@patch('edx_proctoring.constants.ATTEMPT_SIDE_EFFECTS_USE_CELERY', False)
+class BackendOperationOutboxTests(ProctoredExamTestCase):
+    """
+    Tests for queueing and sending backend attempt operations
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.proctored_exam_id = self._create_proctored_exam()
+        self.transitions = count()
+
+    def _queue(self, operation, attempt_id=1, backend_name='test'):
+        dispatch_attempt_side_effect(
+            attempt_id,
+            f'transition{next(self.transitions)}',
+            outbox.BACKEND_ATTEMPT_UPDATE,
+            {
+                'backend_name': backend_name,
+                'operation': operation,
+                'exam_external_id': 'exam',
+                'attempt_external_id': f'attempt{attempt_id}',
+            }
+        )
+
+    def _statuses(self):
+        return list(ProctoredExamStudentAttemptSideEffect.objects.order_by('id').values_list('status', flat=True))
+
+    @patch.object(TestBackendProvider, 'stop_exam_attempt')
+    def test_transition_queues_operation(self, mock_stop):
+        attempt = self._create_started_exam_attempt()
+        update_attempt_status(attempt.id, ProctoredExamStudentAttemptStatus.submitted)
+
+        # only the backend operation is queued
+        mock_stop.assert_not_called()
+        side_effect = ProctoredExamStudentAttemptSideEffect.objects.get()
+        self.assertEqual(side_effect.effect_type, outbox.BACKEND_ATTEMPT_UPDATE)
+        self.assertEqual(side_effect.payload['operation'], outbox.STOP)
+        self.assertEqual(side_effect.payload['attempt_external_id'], attempt.external_id)
+
+        self.assertEqual(process_attempt_side_effects(), 1)
+        mock_stop.assert_called_once_with(side_effect.payload['exam_external_id'], attempt.external_id)
+        self.assertEqual(self._statuses(), [AttemptSideEffectStatus.done])
+
+    @patch.object(TestBackendProvider, 'remove_exam_attempt', return_value=True)
+    def test_deleting_attempt_queues_removal(self, mock_remove):
+        attempt = self._create_started_exam_attempt()
+        attempt.delete_exam_attempt()
+        mock_remove.assert_not_called()
+        side_effect = ProctoredExamStudentAttemptSideEffect.objects.get()
+        self.assertEqual(side_effect.payload['operation'], outbox.REMOVE)
+
+        process_attempt_side_effects()
+        mock_remove.assert_called_once_with(side_effect.payload['exam_external_id'], attempt.external_id)
+
+    @patch.object(TestBackendProvider, 'stop_exam_attempt')
+    def test_operation_sent_inline(self, mock_stop):
+        with patch('edx_proctoring.constants.QUEUE_BACKEND_ATTEMPT_OPERATIONS', False):
+            self._queue(outbox.STOP)
+        mock_stop.assert_called_once_with('exam', 'attempt1')
+        self.assertFalse(ProctoredExamStudentAttemptSideEffect.objects.exists())
+
+    @patch.object(TestBackendProvider, 'start_exam_attempt')
+    @patch.object(TestBackendProvider, 'stop_exam_attempt')
+    def test_start_then_stop_are_both_sent(self, mock_stop, mock_start):
+        manager = MagicMock()
+        manager.attach_mock(mock_start, 'start')
+        manager.attach_mock(mock_stop, 'stop')
+        self._queue(outbox.START)
+        self._queue(outbox.STOP)
+
+        self.assertEqual(process_attempt_side_effects(), 2)
+        self.assertEqual(manager.mock_calls, [call.start('exam', 'attempt1'), call.stop('exam', 'attempt1')])
+        self.assertEqual(self._statuses(), [AttemptSideEffectStatus.done, AttemptSideEffectStatus.done])
+
+    @patch.object(TestBackendProvider, 'stop_exam_attempt')
+    def test_repeated_operation_sent_once(self, mock_stop):
+        self._queue(outbox.STOP)
+        self._queue(outbox.STOP)
+        self._queue(outbox.STOP, attempt_id=2)
+
+        self.assertEqual(process_attempt_side_effects(), 3)
+        self.assertEqual(mock_stop.call_args_list, [call('exam', 'attempt1'), call('exam', 'attempt2')])
+        self.assertEqual(
+            self._statuses(),
+            [AttemptSideEffectStatus.superseded, AttemptSideEffectStatus.done, AttemptSideEffectStatus.done]
+        )
+
+    @patch.object(TestBackendProvider, 'start_exam_attempt')
+    @patch.object(TestBackendProvider, 'stop_exam_attempt')
+    @patch.object(TestBackendProvider, 'remove_exam_attempt', return_value=True)
+    def test_removal_supersedes_earlier_operations(self, mock_remove, mock_stop, mock_start):
+        self._queue(outbox.START)
+        self._queue(outbox.STOP)
+        self._queue(outbox.REMOVE)
+
+        self.assertEqual(process_attempt_side_effects(), 3)
+        mock_start.assert_not_called()
+        mock_stop.assert_not_called()
+        mock_remove.assert_called_once_with('exam', 'attempt1')
+        self.assertEqual(
+            self._statuses(),
+            [AttemptSideEffectStatus.superseded, AttemptSideEffectStatus.superseded, AttemptSideEffectStatus.done]
+        )
+
+    @patch('edx_proctoring.constants.ATTEMPT_SIDE_EFFECT_MAX_RETRIES', 2)
+    @patch.object(TestBackendProvider, 'remove_exam_attempt', return_value=False)
+    def test_failed_removal_is_retried(self, mock_remove):
+        self._queue(outbox.REMOVE)
+
+        before = datetime.now(pytz.UTC)
+        process_attempt_side_effects()
+        side_effect = ProctoredExamStudentAttemptSideEffect.objects.get()
+        self.assertEqual(side_effect.status, AttemptSideEffectStatus.pending)
+        self.assertEqual(side_effect.retries, 1)
+        self.assertIn('BackendProviderCannotRemoveAttempt', side_effect.last_error)
+        self.assertGreater(side_effect.next_attempt_at, before)
+
+        # not due yet
+        self.assertEqual(process_attempt_side_effects(), 0)
+
+        ProctoredExamStudentAttemptSideEffect.objects.update(next_attempt_at=before)
+        process_attempt_side_effects()
+        side_effect.refresh_from_db()
+        self.assertEqual(side_effect.status, AttemptSideEffectStatus.failed)
+        self.assertEqual(mock_remove.call_count, 2)
+
+    @patch.object(TestBackendProvider, 'stop_exam_attempt')
+    def test_unknown_backend_is_retried(self, mock_stop):
+        self._queue(outbox.STOP, backend_name='removed')
+        self._queue(outbox.START, backend_name='removed')
+        self._queue(outbox.STOP, attempt_id=2)
+
+        self.assertEqual(process_attempt_side_effects(), 3)
+        # the operations on other backends are still sent
+        mock_stop.assert_called_once_with('exam', 'attempt2')
+        side_effects = list(ProctoredExamStudentAttemptSideEffect.objects.order_by('id'))
+        self.assertEqual(
+            [side_effect.status for side_effect in side_effects],
+            [AttemptSideEffectStatus.pending, AttemptSideEffectStatus.pending, AttemptSideEffectStatus.done]
+        )
+        self.assertEqual([side_effect.retries for side_effect in side_effects], [1, 1, 0])
+        self.assertIn('NotImplementedError', side_effects[0].last_error)
+
+    @patch.object(TestBackendProvider, 'stop_exam_attempt', side_effect=[Exception('down'), None])
+    @patch.object(TestBackendProvider, 'mark_erroneous_exam_attempt')
+    def test_operations_wait_on_failed_operation(self, mock_error, mock_stop):
+        self._queue(outbox.STOP)
+        self._queue(outbox.ERROR)
+        process_attempt_side_effects()
+        self.assertEqual(mock_stop.call_count, 1)
+        mock_error.assert_not_called()
+        self.assertEqual(self._statuses(), [AttemptSideEffectStatus.pending, AttemptSideEffectStatus.pending])
+
+        # the later operation is held back until the failed one is retried
+        self.assertEqual(process_attempt_side_effects(), 0)
+        ProctoredExamStudentAttemptSideEffect.objects.update(next_attempt_at=datetime.now(pytz.UTC))
+        self.assertEqual(process_attempt_side_effects(), 2)
+        self.assertEqual(mock_stop.call_count, 2)
+        mock_error.assert_called_once_with('exam', 'attempt1')
+
+    @patch.object(TestBackendProvider, 'supports_batch_attempt_updates', True)
+    @patch.object(TestBackendProvider, 'update_exam_attempts')
+    def test_batch(self, mock_update):
+        self._queue(outbox.START)
+        self._queue(outbox.STOP)
+        self._queue(outbox.REMOVE, attempt_id=2)
+
+        process_attempt_side_effects()
+        mock_update.assert_called_once_with([
+            {'exam_id': 'exam', 'attempt_id': 'attempt1', 'operation': outbox.START},
+            {'exam_id': 'exam', 'attempt_id': 'attempt1', 'operation': outbox.STOP},
+            {'exam_id': 'exam', 'attempt_id': 'attempt2', 'operation': outbox.REMOVE},
+        ])
+        self.assertEqual(self._statuses(), [AttemptSideEffectStatus.done] * 3)
+
+    @patch.object(TestBackendProvider, 'supports_batch_attempt_updates', True)
+    @patch.object(TestBackendProvider, 'update_exam_attempts', side_effect=Exception('down'))
+    def test_failed_batch_is_retried(self, mock_update):  # pylint: disable=unused-argument
+        self._queue(outbox.STOP)
+        self._queue(outbox.STOP, attempt_id=2)
+
+        process_attempt_side_effects()
+        self.assertEqual(self._statuses(), [AttemptSideEffectStatus.pending, AttemptSideEffectStatus.pending])
+        self.assertEqual(
+            list(ProctoredExamStudentAttemptSideEffect.objects.values_list('retries', flat=True)), [1, 1]
+        )
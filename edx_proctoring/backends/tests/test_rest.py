@@ -7,12 +7,15 @@ from unittest.mock import patch
 
 import ddt
 import jwt
+import requests
 import responses
 
+from django.core.cache import cache
 from django.test import TestCase, override_settings
 from django.utils import translation
 
 from edx_proctoring.backends.rest import BaseRestProctoringProvider
+from edx_proctoring.cache import clear_local_caches
 from edx_proctoring.exceptions import (
     BackendProviderCannotRegisterAttempt,
     BackendProviderCannotRetireUser,
@@ -30,6 +33,8 @@ class RESTBackendTests(TestCase):
     """
     def setUp(self):
         "setup tests"
+        cache.clear()
+        clear_local_caches()
         BaseRestProctoringProvider.base_url = 'http://rr.fake'
         self.provider = BaseRestProctoringProvider('client_id', 'client_secret')
         responses.add(
@@ -54,6 +59,27 @@ class RESTBackendTests(TestCase):
             'lms_host': 'http://lms.com'
         }
 
+    @patch('edx_proctoring.constants.PROCTORING_CONFIG_CACHE_TIMEOUT', 0)
+    def test_http_timeouts(self):
+        """
+        Requests are made with the timeout configured for their endpoint
+        """
+        provider = BaseRestProctoringProvider(
+            'client_id', 'client_secret', http_timeouts={'config': [1, 5], 'default': 10}
+        )
+        with patch.object(provider.session, 'request') as mock_request:
+            provider.get_proctoring_config()
+            self.assertEqual(mock_request.call_args[1]['timeout'], (1, 5))
+            provider.get_exam(self.backend_exam)
+            self.assertEqual(mock_request.call_args[1]['timeout'], 10)
+
+    def test_session_is_pooled(self):
+        """
+        The session reuses a pool of keep-alive connections
+        """
+        adapter = self.provider.session.get_adapter(self.provider.base_url)
+        self.assertEqual(adapter._pool_maxsize, self.provider.http_pool_maxsize)  # pylint: disable=protected-access
+
     @responses.activate
     def test_get_software_download_url(self):
         """
@@ -80,6 +106,72 @@ class RESTBackendTests(TestCase):
         config = self.provider.get_proctoring_config()
         self.assertEqual(config['config']['allow_test'], 'Allow Testing')
 
+    @responses.activate
+    def test_proctoring_config_is_cached(self):
+        responses.add(responses.GET, url=self.provider.config_url, json={'name': 'Proctoring'})
+        for _ in range(2):
+            self.assertEqual(self.provider.get_proctoring_config(), {'name': 'Proctoring'})
+        responses.assert_call_count(self.provider.config_url, 1)
+
+        # another instance of the same backend shares the cached configuration
+        other_provider = BaseRestProctoringProvider('client_id', 'client_secret')
+        self.assertEqual(other_provider.get_proctoring_config(), {'name': 'Proctoring'})
+        responses.assert_call_count(self.provider.config_url, 1)
+
+        # the configuration is cached per language
+        with translation.override('es'):
+            self.provider.get_proctoring_config()
+        responses.assert_call_count(self.provider.config_url, 2)
+        self.assertEqual(responses.calls[-1].request.headers['Accept-Language'], 'es;en-us')
+
+    @responses.activate
+    def test_invalidate_proctoring_config(self):
+        responses.add(responses.GET, url=self.provider.config_url, json={'name': 'Old'})
+        responses.add(responses.GET, url=self.provider.config_url, json={'name': 'New'})
+        self.assertEqual(self.provider.get_proctoring_config(), {'name': 'Old'})
+        self.provider.invalidate_proctoring_config()
+        self.assertEqual(self.provider.get_proctoring_config(), {'name': 'New'})
+
+    @responses.activate
+    def test_failed_proctoring_config_is_not_cached(self):
+        responses.add(responses.GET, url=self.provider.config_url, json={'detail': 'error'}, status=500)
+        responses.add(responses.GET, url=self.provider.config_url, json={'name': 'Proctoring'})
+        self.assertEqual(self.provider.get_proctoring_config(), {'detail': 'error'})
+        self.assertEqual(self.provider.get_proctoring_config(), {'name': 'Proctoring'})
+
+    @responses.activate
+    @patch('edx_proctoring.constants.PROCTORING_CONFIG_CACHE_TIMEOUT', 60)
+    @patch('edx_proctoring.cache.time.time')
+    def test_stale_proctoring_config(self, mock_time):
+        mock_time.return_value = 1000
+        responses.add(responses.GET, url=self.provider.config_url, json={'name': 'Old'})
+        responses.add(responses.GET, url=self.provider.config_url, body=requests.ConnectionError('down'))
+        responses.add(responses.GET, url=self.provider.config_url, json={'name': 'New'})
+        self.provider.get_proctoring_config()
+
+        mock_time.return_value = 1061
+        clear_local_caches()
+        # the stale configuration is served while refreshing it fails
+        with self.assertLogs('edx_proctoring.cache', level='WARNING'):
+            self.assertEqual(self.provider.get_proctoring_config(), {'name': 'Old'})
+        self.assertEqual(self.provider.get_proctoring_config(), {'name': 'New'})
+        mock_time.return_value = 1100
+        self.assertEqual(self.provider.get_proctoring_config(), {'name': 'New'})
+
+    @responses.activate
+    @patch('edx_proctoring.constants.PROCTORING_CONFIG_CACHE_TIMEOUT', 60)
+    @patch('edx_proctoring.cache.time.time')
+    def test_stale_proctoring_config_is_refreshed_once(self, mock_time):
+        mock_time.return_value = 1000
+        responses.add(responses.GET, url=self.provider.config_url, json={'name': 'Old'})
+        self.provider.get_proctoring_config()
+
+        mock_time.return_value = 1061
+        with patch('edx_proctoring.cache.cache.add', return_value=False):
+            # another worker is already refreshing the configuration
+            self.assertEqual(self.provider.get_proctoring_config(), {'name': 'Old'})
+        responses.assert_call_count(self.provider.config_url, 1)
+
     @responses.activate
     def test_get_exam(self):
         responses.add(
@@ -277,6 +369,33 @@ class RESTBackendTests(TestCase):
         status = self.provider.remove_exam_attempt(self.backend_exam['external_id'], None)
         self.assertFalse(status)
 
+    @responses.activate
+    def test_update_exam_attempts(self):
+        responses.add(
+            responses.PATCH,
+            url=self.provider.exam_attempts_batch_url,
+            json={'updated': 2},
+        )
+        result = self.provider.update_exam_attempts([
+            {'exam_id': 'exam', 'attempt_id': 'a', 'operation': 'stop'},
+            {'exam_id': 'exam', 'attempt_id': 'b', 'operation': 'remove'},
+        ])
+        self.assertEqual(result, {'updated': 2})
+        self.assertEqual(json.loads(responses.calls[-1].request.body), [
+            {'exam_id': 'exam', 'attempt_id': 'a', 'status': ProctoredExamStudentAttemptStatus.submitted},
+            {'exam_id': 'exam', 'attempt_id': 'b', 'status': 'deleted'},
+        ])
+
+    @responses.activate
+    def test_update_exam_attempts_failure(self):
+        responses.add(
+            responses.PATCH,
+            url=self.provider.exam_attempts_batch_url,
+            status=503,
+        )
+        with self.assertRaises(requests.HTTPError):
+            self.provider.update_exam_attempts([{'exam_id': 'exam', 'attempt_id': 'a', 'operation': 'start'}])
+
     def test_on_review_callback(self):
         """
         on_review_callback should just return the payload
@@ -499,6 +618,25 @@ class RESTBackendTests(TestCase):
         result = self.provider.get_onboarding_profile_info(course_id=course_id)
         assert result == response_json
 
+    @responses.activate
+    def test_get_all_onboarding_profiles(self):
+        course_id = 'course+abc'
+        for page in (1, 2, 3):
+            responses.add(
+                responses.GET,
+                url=self.provider.onboarding_statuses_url.format(
+                    course_id=course_id
+                ) + f'?page={page}&page_size=500&status=approved-in-course',
+                json={
+                    'count': 3,
+                    'num_pages': 3,
+                    'number': page,
+                    'results': [{'user_id': f'user{page}', 'status': 'approved-in-course'}],
+                }
+            )
+        result = self.provider.get_all_onboarding_profiles(course_id=course_id, status='approved-in-course')
+        self.assertEqual([profile['user_id'] for profile in result], ['user1', 'user2', 'user3'])
+
     @responses.activate
     def test_get_onboarding_profiles_for_unknown_user_id(self):
         user_id = 'bad_user'
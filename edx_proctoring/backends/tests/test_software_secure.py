@@ -166,6 +166,28 @@ class SoftwareSecureTests(TestCase):
             self.assertEqual(attempt['external_id'], 'foobar')
             self.assertIsNone(attempt['started_at'])
 
+    def test_register_attempts_reuse_session(self):
+        """
+        Registrations share the pooled session of the provider
+        """
+        exam_id = create_exam(
+            course_id='foo/bar/baz',
+            content_id='content',
+            exam_name='Sample Exam',
+            time_limit_mins=10,
+            is_proctored=True,
+            backend='software_secure',
+        )
+        provider = get_backend_provider(name='software_secure')
+        session = provider.session
+
+        with patch.object(session, 'post', wraps=session.post) as mock_post:
+            with HTTMock(mock_response_content):
+                create_exam_attempt(exam_id, self.user.id, taking_as_proctored=True)
+        self.assertIs(provider.session, session)
+        mock_post.assert_called_once()
+        self.assertEqual(mock_post.call_args[1]['timeout'], 10)
+
     @patch.dict('django.conf.settings.PROCTORING_SETTINGS', {'ALLOW_CALLBACK_SIMULATION': True})
     @patch('edx_proctoring.constants.REQUIRE_FAILURE_SECOND_REVIEWS', False)
     def test_allow_simulated_callbacks(self):
@@ -0,0 +1,372 @@
+"""
+Caching helpers for the edx-proctoring subsystem.
+
+Cached values live in two tiers: a small in-process LRU which absorbs repeated
+reads within a worker, and the Django cache which is shared between workers.
+Writers invalidate both tiers; the in-process tier additionally expires entries
+after a short timeout so that invalidations issued by other workers are picked
+up quickly.
+"""
+
+import copy
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.db import transaction
+
+from edx_proctoring import constants
+
+log = logging.getLogger(__name__)
+
+# Bump this whenever the shape of a cached exam dictionary changes, so that
+# values written by older code are never read back by newer code.
+EXAM_CACHE_VERSION = 1
+
+# Same as EXAM_CACHE_VERSION, for cached proctoring backend configurations
+PROCTORING_CONFIG_CACHE_VERSION = 1
+
+# Same as EXAM_CACHE_VERSION, for cached onboarding profiles
+ONBOARDING_PROFILE_CACHE_VERSION = 1
+
+# number of seconds a worker may spend fetching a stale backend configuration
+# before another worker is allowed to try
+CONFIG_REVALIDATION_LOCK_TIMEOUT = 30
+
+_MISSING = object()
+
+
+class LocalLRUCache:
+    """
+    A thread-safe, size-bounded, in-process cache whose entries expire after
+    ``timeout`` seconds.
+    """
+
+    def __init__(self, maxsize=1024, timeout=10):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Return the value stored under ``key``, or ``default`` if it is missing or expired.
+        """
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout=None):
+        """
+        Store ``value`` under ``key``, evicting the least recently used entries if needed.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        if timeout <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + timeout, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        """
+        Remove ``key`` from the cache, if present.
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """
+        Remove every entry from the cache.
+        """
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+_exam_local_cache = LocalLRUCache(
+    maxsize=constants.EXAM_LOCAL_CACHE_SIZE,
+    timeout=constants.EXAM_LOCAL_CACHE_TIMEOUT,
+)
+
+
+def _exam_id_cache_key(exam_id):
+    """
+    Cache key for an exam looked up by its primary key
+    """
+    return f'edx_proctoring.exam.v{EXAM_CACHE_VERSION}.id.{exam_id}'
+
+
+def _exam_content_cache_key(course_id, content_id):
+    """
+    Cache key for an exam looked up by its course_id/content_id pair.
+
+    The pair is hashed since content ids may contain characters that are not
+    safe to use in memcached keys.
+    """
+    digest = hashlib.md5(f'{course_id}|{content_id}'.encode('utf-8')).hexdigest()
+    return f'edx_proctoring.exam.v{EXAM_CACHE_VERSION}.content.{digest}'
+
+
+def _get_cached_exam(key):
+    """
+    Look up a serialized exam in both cache tiers, returning a copy or None
+    """
+    exam = _exam_local_cache.get(key)
+    if exam is None and constants.EXAM_CACHE_TIMEOUT:
+        exam = cache.get(key)
+        if exam is not None:
+            _exam_local_cache.set(key, exam)
+    return dict(exam) if exam is not None else None
+
+
+def get_cached_exam_by_id(exam_id):
+    """
+    Returns the cached serialized exam with the given id, or None on a cache miss
+    """
+    return _get_cached_exam(_exam_id_cache_key(exam_id))
+
+
+def get_cached_exam_by_content_id(course_id, content_id):
+    """
+    Returns the cached serialized exam for the course_id/content_id pair, or None on a cache miss
+    """
+    return _get_cached_exam(_exam_content_cache_key(course_id, content_id))
+
+
+def cache_exam(exam):
+    """
+    Store a serialized exam under both its id and its course_id/content_id pair
+    """
+    if not constants.EXAM_CACHE_TIMEOUT:
+        return
+    exam = dict(exam)
+    keys = (
+        _exam_id_cache_key(exam['id']),
+        _exam_content_cache_key(exam['course_id'], exam['content_id']),
+    )
+    cache.set_many({key: exam for key in keys}, constants.EXAM_CACHE_TIMEOUT)
+    for key in keys:
+        _exam_local_cache.set(key, exam)
+
+
+def invalidate_exam_cache(exam_id, course_id, content_id):
+    """
+    Drop any cached copy of an exam.
+
+    The entries are dropped immediately and once more when the surrounding
+    transaction commits, so that a concurrent reader cannot repopulate the cache
+    with the pre-commit row.
+    """
+    keys = [_exam_content_cache_key(course_id, content_id)]
+    if exam_id is not None:
+        keys.append(_exam_id_cache_key(exam_id))
+
+    def _delete():
+        for key in keys:
+            _exam_local_cache.delete(key)
+        cache.delete_many(keys)
+
+    _delete()
+    transaction.on_commit(_delete)
+
+
+def _no_active_attempt_cache_key(user_id):
+    """
+    Cache key marking a learner as having no active attempt
+    """
+    return f'edx_proctoring.no_active_attempt.{user_id}'
+
+
+def is_cached_without_active_attempt(user_id):
+    """
+    Returns whether the learner is cached as having no active attempt.
+
+    Only the shared Django cache is used, so that an attempt started through
+    another worker is seen as soon as it is saved.
+    """
+    if not constants.NO_ACTIVE_ATTEMPT_CACHE_TIMEOUT:
+        return False
+    return cache.get(_no_active_attempt_cache_key(user_id)) is not None
+
+
+def cache_without_active_attempt(user_id):
+    """
+    Remember that the learner has no active attempt, for NO_ACTIVE_ATTEMPT_CACHE_TIMEOUT seconds
+    """
+    if constants.NO_ACTIVE_ATTEMPT_CACHE_TIMEOUT:
+        cache.set(_no_active_attempt_cache_key(user_id), True, constants.NO_ACTIVE_ATTEMPT_CACHE_TIMEOUT)
+
+
+def invalidate_no_active_attempt_cache(user_id):
+    """
+    Forget that the learner has no active attempt, immediately and once more when
+    the surrounding transaction commits, like invalidate_exam_cache does
+    """
+    if not constants.NO_ACTIVE_ATTEMPT_CACHE_TIMEOUT:
+        return
+    key = _no_active_attempt_cache_key(user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def _onboarding_profiles_cache_key(backend_name, course_id, params):
+    """
+    Cache key for the onboarding profiles returned by a backend for a course and query parameters
+    """
+    query = '&'.join(f'{name}={value}' for name, value in sorted(params.items()))
+    digest = hashlib.md5(f'{backend_name}|{course_id}|{query}'.encode('utf-8')).hexdigest()
+    return f'edx_proctoring.onboarding_profiles.v{ONBOARDING_PROFILE_CACHE_VERSION}.{digest}'
+
+
+def get_cached_onboarding_profiles(backend_name, course_id, params, fetch):
+    """
+    Returns the onboarding profiles of the named backend for the course and query
+    parameters, e.g. a status filter or a user_id, calling ``fetch`` to retrieve them
+    from the backend when they are not cached.
+
+    Profiles are kept in the Django cache for ONBOARDING_PROFILE_CACHE_TIMEOUT seconds.
+    Errors raised by ``fetch``, and None returned by backends without onboarding
+    profiles, are not cached.
+    """
+    if not constants.ONBOARDING_PROFILE_CACHE_TIMEOUT:
+        return fetch()
+
+    key = _onboarding_profiles_cache_key(backend_name, course_id, params)
+    profiles = cache.get(key)
+    if profiles is None:
+        profiles = fetch()
+        if profiles is not None:
+            cache.set(key, profiles, constants.ONBOARDING_PROFILE_CACHE_TIMEOUT)
+    return profiles
+
+
+_config_local_cache = LocalLRUCache(
+    maxsize=64,
+    timeout=constants.EXAM_LOCAL_CACHE_TIMEOUT,
+)
+
+
+def _config_generation_key(backend_id):
+    """
+    Cache key of the current generation of the cached configurations of a backend
+    """
+    return f'edx_proctoring.config.v{PROCTORING_CONFIG_CACHE_VERSION}.{backend_id}.generation'
+
+
+def _get_config_generation(backend_id):
+    """
+    Returns the current generation of the cached configurations of a backend.
+
+    Invalidating the configurations of a backend starts a new generation, which
+    orphans the configurations cached for every language at once.
+    """
+    key = _config_generation_key(backend_id)
+    generation = _config_local_cache.get(key)
+    if generation is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        generation = cache.get(key)
+        _config_local_cache.set(key, generation)
+    return generation
+
+
+def _config_cache_key(backend_id, language):
+    """
+    Cache key for the configuration of a backend in the given language
+    """
+    generation = _get_config_generation(backend_id)
+    digest = hashlib.md5(language.encode('utf-8')).hexdigest()
+    return f'edx_proctoring.config.v{PROCTORING_CONFIG_CACHE_VERSION}.{backend_id}.{generation}.{digest}'
+
+
+def _store_config(key, config):
+    """
+    Store a backend configuration in both cache tiers
+    """
+    entry = {
+        'config': config,
+        'fresh_until': time.time() + constants.PROCTORING_CONFIG_CACHE_TIMEOUT,
+    }
+    cache.set(
+        key, entry, constants.PROCTORING_CONFIG_CACHE_TIMEOUT + constants.PROCTORING_CONFIG_CACHE_STALE_TIMEOUT
+    )
+    _config_local_cache.set(key, entry)
+
+
+def get_cached_proctoring_config(backend_id, language, fetch):
+    """
+    Returns the configuration of the backend identified by ``backend_id`` in the
+    given language, calling ``fetch`` to retrieve it from the backend when it is
+    not cached.
+
+    ``fetch`` returns a ``(config, cacheable)`` pair; configurations which are not
+    cacheable, such as error responses, are returned without being stored.
+
+    Once a configuration is no longer fresh, a single worker fetches a new one
+    while the others keep serving the stale configuration. The stale configuration
+    is also served when that fetch fails.
+    """
+    if not constants.PROCTORING_CONFIG_CACHE_TIMEOUT:
+        return fetch()[0]
+
+    key = _config_cache_key(backend_id, language)
+    entry = _config_local_cache.get(key)
+    if entry is None:
+        entry = cache.get(key)
+        if entry is not None:
+            _config_local_cache.set(key, entry)
+
+    if entry is None:
+        config, cacheable = fetch()
+        if cacheable:
+            _store_config(key, config)
+        return copy.deepcopy(config)
+
+    if entry['fresh_until'] > time.time():
+        return copy.deepcopy(entry['config'])
+
+    lock_key = f'{key}.revalidating'
+    if not cache.add(lock_key, True, CONFIG_REVALIDATION_LOCK_TIMEOUT):
+        return copy.deepcopy(entry['config'])
+    try:
+        config, cacheable = fetch()
+    except Exception:  # pylint: disable=broad-exception-caught
+        log.warning('Could not refresh the configuration of proctoring backend %s', backend_id, exc_info=True)
+        cacheable = False
+    finally:
+        cache.delete(lock_key)
+    if not cacheable:
+        return copy.deepcopy(entry['config'])
+    _store_config(key, config)
+    return copy.deepcopy(config)
+
+
+def invalidate_proctoring_config_cache(backend_id):
+    """
+    Drop the cached configurations of a backend, in every language
+    """
+    key = _config_generation_key(backend_id)
+    cache.set(key, uuid.uuid4().hex, None)
+    _config_local_cache.delete(key)
+
+
+def clear_local_caches():
+    """
+    Empty the in-process cache tier. Mostly useful for tests.
+    """
+    _exam_local_cache.clear()
+    _config_local_cache.clear()
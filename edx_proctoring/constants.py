@@ -74,6 +74,14 @@ ONBOARDING_PROFILE_API = (
     else getattr(settings, 'USE_ONBOARDING_PROFILE_API', False)
 )
 
+# number of seconds the onboarding profiles returned by a proctoring backend for a course, or for a learner in a
+# course, are kept in the Django cache. 0 disables caching of onboarding profiles
+ONBOARDING_PROFILE_CACHE_TIMEOUT = (
+    settings.PROCTORING_SETTINGS['ONBOARDING_PROFILE_CACHE_TIMEOUT'] if
+    'ONBOARDING_PROFILE_CACHE_TIMEOUT' in settings.PROCTORING_SETTINGS
+    else getattr(settings, 'ONBOARDING_PROFILE_CACHE_TIMEOUT', 60)
+)
+
 ONBOARDING_PROFILE_INSTRUCTOR_DASHBOARD_API = 'edx_proctoring.onboarding_profile_instructor_dashboard_api'
 
 REDS_API_REDIRECT = 'edx_proctoring.reds_api_redirect'
@@ -81,3 +89,105 @@ REDS_API_REDIRECT = 'edx_proctoring.reds_api_redirect'
 CONTENT_VIEWABLE_PAST_DUE_DATE = getattr(settings, 'PROCTORED_EXAM_VIEWABLE_PAST_DUE', False)
 
 TIME_MULTIPLIER = 'time_multiplier'
+
+# number of seconds a serialized exam is kept in the shared Django cache, 0 disables exam caching
+EXAM_CACHE_TIMEOUT = (
+    settings.PROCTORING_SETTINGS['EXAM_CACHE_TIMEOUT'] if
+    'EXAM_CACHE_TIMEOUT' in settings.PROCTORING_SETTINGS
+    else getattr(settings, 'EXAM_CACHE_TIMEOUT', 60 * 60)
+)
+
+# number of seconds a serialized exam is kept in the in-process cache of each worker
+EXAM_LOCAL_CACHE_TIMEOUT = (
+    settings.PROCTORING_SETTINGS['EXAM_LOCAL_CACHE_TIMEOUT'] if
+    'EXAM_LOCAL_CACHE_TIMEOUT' in settings.PROCTORING_SETTINGS
+    else getattr(settings, 'EXAM_LOCAL_CACHE_TIMEOUT', 10)
+)
+
+# maximum number of entries held in the in-process exam cache of each worker
+EXAM_LOCAL_CACHE_SIZE = (
+    settings.PROCTORING_SETTINGS['EXAM_LOCAL_CACHE_SIZE'] if
+    'EXAM_LOCAL_CACHE_SIZE' in settings.PROCTORING_SETTINGS
+    else getattr(settings, 'EXAM_LOCAL_CACHE_SIZE', 1024)
+)
+
+# number of seconds the configuration returned by a proctoring backend is considered fresh,
+# 0 disables caching of backend configurations
+PROCTORING_CONFIG_CACHE_TIMEOUT = (
+    settings.PROCTORING_SETTINGS['PROCTORING_CONFIG_CACHE_TIMEOUT'] if
+    'PROCTORING_CONFIG_CACHE_TIMEOUT' in settings.PROCTORING_SETTINGS
+    else getattr(settings, 'PROCTORING_CONFIG_CACHE_TIMEOUT', 5 * 60)
+)
+
+# number of seconds a backend configuration may still be served once it is no longer fresh,
+# while a single worker fetches a new one
+PROCTORING_CONFIG_CACHE_STALE_TIMEOUT = (
+    settings.PROCTORING_SETTINGS['PROCTORING_CONFIG_CACHE_STALE_TIMEOUT'] if
+    'PROCTORING_CONFIG_CACHE_STALE_TIMEOUT' in settings.PROCTORING_SETTINGS
+    else getattr(settings, 'PROCTORING_CONFIG_CACHE_STALE_TIMEOUT', 60 * 60)
+)
+
+# when enabled, the side effects of attempt status transitions (credit, grades, emails and
+# proctoring backend calls) are queued in the database and run outside of the request
+ASYNC_ATTEMPT_SIDE_EFFECTS = (
+    settings.PROCTORING_SETTINGS['ASYNC_ATTEMPT_SIDE_EFFECTS'] if
+    'ASYNC_ATTEMPT_SIDE_EFFECTS' in settings.PROCTORING_SETTINGS
+    else getattr(settings, 'ASYNC_ATTEMPT_SIDE_EFFECTS', False)
+)
+
+# when enabled, a celery task is scheduled to run queued attempt side effects as soon as they are queued,
+# otherwise they are only run by the process_attempt_side_effects management command
+ATTEMPT_SIDE_EFFECTS_USE_CELERY = (
+    settings.PROCTORING_SETTINGS['ATTEMPT_SIDE_EFFECTS_USE_CELERY'] if
+    'ATTEMPT_SIDE_EFFECTS_USE_CELERY' in settings.PROCTORING_SETTINGS
+    else getattr(settings, 'ATTEMPT_SIDE_EFFECTS_USE_CELERY', True)
+)
+
+# number of times a queued attempt side effect is retried before it is marked as failed
+ATTEMPT_SIDE_EFFECT_MAX_RETRIES = (
+    settings.PROCTORING_SETTINGS['ATTEMPT_SIDE_EFFECT_MAX_RETRIES'] if
+    'ATTEMPT_SIDE_EFFECT_MAX_RETRIES' in settings.PROCTORING_SETTINGS
+    else getattr(settings, 'ATTEMPT_SIDE_EFFECT_MAX_RETRIES', 8)
+)
+
+# number of seconds before the first retry of a failed attempt side effect, doubled on every further retry
+ATTEMPT_SIDE_EFFECT_RETRY_DELAY = (
+    settings.PROCTORING_SETTINGS['ATTEMPT_SIDE_EFFECT_RETRY_DELAY'] if
+    'ATTEMPT_SIDE_EFFECT_RETRY_DELAY' in settings.PROCTORING_SETTINGS
+    else getattr(settings, 'ATTEMPT_SIDE_EFFECT_RETRY_DELAY', 30)
+)
+
+# when enabled, attempt operations sent to the proctoring backends (start, stop, error and remove)
+# are queued as attempt side effects and sent outside of the request, even when
+# ASYNC_ATTEMPT_SIDE_EFFECTS is disabled
+QUEUE_BACKEND_ATTEMPT_OPERATIONS = (
+    settings.PROCTORING_SETTINGS['QUEUE_BACKEND_ATTEMPT_OPERATIONS'] if
+    'QUEUE_BACKEND_ATTEMPT_OPERATIONS' in settings.PROCTORING_SETTINGS
+    else getattr(settings, 'QUEUE_BACKEND_ATTEMPT_OPERATIONS', False)
+)
+
+# when enabled, reading an attempt whose time limit has expired times it out on the spot, with all the side
+# effects of the transition. When disabled, the read only reports the timeout and expired attempts are timed out
+# by the expire_exam_attempts management command or celery task, which must then be run periodically
+TIME_OUT_EXPIRED_ATTEMPTS_ON_READ = (
+    settings.PROCTORING_SETTINGS['TIME_OUT_EXPIRED_ATTEMPTS_ON_READ'] if
+    'TIME_OUT_EXPIRED_ATTEMPTS_ON_READ' in settings.PROCTORING_SETTINGS
+    else getattr(settings, 'TIME_OUT_EXPIRED_ATTEMPTS_ON_READ', True)
+)
+
+# dotted paths of the SpanReporter classes to which the durations and query counts of the instrumented phases of
+# the hot paths are reported, e.g. edx_proctoring.instrumentation.MonitoringSpanReporter. Nothing is measured when
+# empty
+INSTRUMENTATION_SPAN_REPORTERS = (
+    settings.PROCTORING_SETTINGS['INSTRUMENTATION_SPAN_REPORTERS'] if
+    'INSTRUMENTATION_SPAN_REPORTERS' in settings.PROCTORING_SETTINGS
+    else getattr(settings, 'INSTRUMENTATION_SPAN_REPORTERS', [])
+)
+
+# number of seconds a learner with no active attempt is remembered as such in the Django cache, which spares the
+# attempt pollers of the LMS a query. The entry is dropped whenever an attempt of the learner is saved. 0 disables it
+NO_ACTIVE_ATTEMPT_CACHE_TIMEOUT = (
+    settings.PROCTORING_SETTINGS['NO_ACTIVE_ATTEMPT_CACHE_TIMEOUT'] if
+    'NO_ACTIVE_ATTEMPT_CACHE_TIMEOUT' in settings.PROCTORING_SETTINGS
+    else getattr(settings, 'NO_ACTIVE_ATTEMPT_CACHE_TIMEOUT', 0)
+)
@@ -162,6 +162,12 @@ class BackendProviderCannotRetireUser(ProctoredBaseException):
     """
 
 
+class BackendProviderCannotRemoveAttempt(ProctoredBaseException):
+    """
+    Raised when a back-end provider cannot remove an attempt
+    """
+
+
 class BackendProviderNotConfigured(ProctoredBaseException):
     """
     Raised when a back-end provider not configured.
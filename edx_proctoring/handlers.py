@@ -6,8 +6,10 @@ from django.db.models.signals import post_delete, post_save, pre_delete, pre_sav
 from django.dispatch import receiver
 
 from edx_proctoring import api, constants, models
-from edx_proctoring.backends import get_backend_provider
+from edx_proctoring.backends import get_backend_provider, outbox
+from edx_proctoring.cache import invalidate_exam_cache, invalidate_no_active_attempt_cache
 from edx_proctoring.runtime import get_runtime_service
+from edx_proctoring.side_effects import dispatch_attempt_side_effect, is_attempt_side_effect_queued
 from edx_proctoring.statuses import ProctoredExamStudentAttemptStatus, SoftwareSecureReviewStatus
 from edx_proctoring.utils import emit_event, locate_attempt_by_attempt_code
 
@@ -15,12 +17,13 @@ log = logging.getLogger(__name__)
 
 
 @receiver(pre_save, sender=models.ProctoredExam)
-def check_for_category_switch(sender, instance, **kwargs):
+def check_for_category_switch(sender, instance, **kwargs):  # pylint: disable=unused-argument
     """
     If the exam switches from proctored to timed, notify the backend
     """
     if instance.id:
-        original = sender.objects.get(pk=instance.id)
+        original = instance.get_original()
+        invalidate_exam_cache(original.id, original.course_id, original.content_id)
         if original.is_proctored and instance.is_proctored != original.is_proctored:
             # pylint: disable=import-outside-toplevel
             from edx_proctoring.serializers import ProctoredExamJSONSafeSerializer
@@ -48,6 +51,7 @@ def save_exam_on_backend(sender, instance, **kwargs):
     """
     if sender == models.ProctoredExam:
         exam_obj = instance
+        invalidate_exam_cache(instance.id, instance.course_id, instance.content_id)
         review_policy = models.ProctoredExamReviewPolicy.get_review_policy_for_exam(instance.id)
     else:
         exam_obj = instance.proctored_exam
@@ -68,14 +72,14 @@ def save_exam_on_backend(sender, instance, **kwargs):
 # Hook up the pre_save signal to record creations in the ProctoredExamReviewPolicyHistory table.
 @receiver(pre_save, sender=models.ProctoredExamReviewPolicy)
 @receiver(pre_delete, sender=models.ProctoredExamReviewPolicy)
-def on_review_policy_changed(sender, instance, signal, **kwargs):
+def on_review_policy_changed(sender, instance, signal, **kwargs):  # pylint: disable=unused-argument
     """
     Archiving all changes made to the Review Policy.
     Will only archive on update/delete, and not on new entries created.
     """
     if signal is pre_save:
         if instance.id:
-            instance = sender.objects.get(id=instance.id)
+            instance = instance.get_original()
         else:
             return
     models.archive_model(models.ProctoredExamReviewPolicyHistory, instance, id='original_id')
@@ -84,7 +88,7 @@ def on_review_policy_changed(sender, instance, signal, **kwargs):
 # Hook up the post_save signal to record creations in the ProctoredExamStudentAllowanceHistory table.
 @receiver(pre_save, sender=models.ProctoredExamStudentAllowance)
 @receiver(pre_delete, sender=models.ProctoredExamStudentAllowance)
-def on_allowance_changed(sender, instance, signal, **kwargs):
+def on_allowance_changed(sender, instance, signal, **kwargs):  # pylint: disable=unused-argument
     """
     Archiving all changes made to the Student Allowance.
     Will only archive on update/delete, and not on new entries created.
@@ -92,7 +96,7 @@ def on_allowance_changed(sender, instance, signal, **kwargs):
 
     if signal is pre_save:
         if instance.id:
-            instance = sender.objects.get(id=instance.id)
+            instance = instance.get_original()
         else:
             return
     models.archive_model(models.ProctoredExamStudentAllowanceHistory, instance, id='allowance_id')
@@ -100,7 +104,7 @@ def on_allowance_changed(sender, instance, signal, **kwargs):
 
 @receiver(pre_save, sender=models.ProctoredExamStudentAttempt)
 @receiver(pre_delete, sender=models.ProctoredExamStudentAttempt)
-def on_attempt_changed(sender, instance, signal, **kwargs):
+def on_attempt_changed(sender, instance, signal, **kwargs):  # pylint: disable=unused-argument
     """
     Archive the exam attempt whenever the attempt status is about to be
     modified. Make a new entry with the previous value of the status in the
@@ -112,7 +116,7 @@ def on_attempt_changed(sender, instance, signal, **kwargs):
             # on an update case, get the original
             # and see if the status has changed, if so, then we need
             # to archive it
-            original = sender.objects.get(id=instance.id)
+            original = instance.get_original()
 
             # if the exam was finished for the first time, we want to mark it as
             # complete in the Completion Service.
@@ -137,7 +141,14 @@ def on_attempt_changed(sender, instance, signal, **kwargs):
         # timed exams have no backend
         if instance.proctored_exam.is_proctored:
             backend = get_backend_provider(name=instance.proctored_exam.backend)
-            if backend:
+            if backend and instance.external_id and is_attempt_side_effect_queued(outbox.BACKEND_ATTEMPT_UPDATE):
+                dispatch_attempt_side_effect(instance.id, f'{instance.id}.removed', outbox.BACKEND_ATTEMPT_UPDATE, {
+                    'backend_name': instance.proctored_exam.backend,
+                    'operation': outbox.REMOVE,
+                    'exam_external_id': instance.proctored_exam.external_id,
+                    'attempt_external_id': instance.external_id,
+                })
+            elif backend:
                 result = backend.remove_exam_attempt(instance.proctored_exam.external_id, instance.external_id)
                 if not result:
                     log.error(
@@ -163,10 +174,42 @@ def finish_attempt_flow(sender, instance, signal, **kwargs):  # pylint: disable=
         current_review.save()
 
 
+@receiver(post_save, sender=models.ProctoredExamStudentAttempt)
+@receiver(post_delete, sender=models.ProctoredExamStudentAttempt)
+def forget_current_exam_attempt(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Make sure the identity map of current attempts, if any, doesn't serve a stale attempt,
+    and that the learner is no longer cached as having no active attempt
+    """
+    models.forget_current_exam_attempts(instance.proctored_exam_id, instance.user_id)
+    invalidate_no_active_attempt_cache(instance.user_id)
+
+
+@receiver(post_save, sender=models.ProctoredExamStudentAttempt)
+@receiver(post_delete, sender=models.ProctoredExamStudentAttempt)
+def refresh_onboarding_verification(sender, instance, signal, **kwargs):  # pylint: disable=unused-argument
+    """
+    Keep the onboarding verification of the learner up to date whenever one of their
+    onboarding attempts is verified, is modified while verified, or stops being verified
+    """
+    verified = ProctoredExamStudentAttemptStatus.verified
+    if instance.status != verified:
+        if signal is post_delete or kwargs.get('created'):
+            return
+        # the stored values of the instance are only refreshed once the post_save handlers ran,
+        # so the original is the attempt as it was before this save
+        if instance.get_original().status != verified:
+            return
+
+    exam = instance.proctored_exam
+    if exam.is_practice_exam:
+        models.OnboardingVerification.objects.refresh_verification(instance.user_id, exam.backend)
+
+
 # Hook up the signals to record updates/deletions in the ProctoredExamSoftwareSecureReview table.
 @receiver(pre_save, sender=models.ProctoredExamSoftwareSecureReview)
 @receiver(pre_delete, sender=models.ProctoredExamSoftwareSecureReview)
-def on_review_changed(sender, instance, signal, **kwargs):
+def on_review_changed(sender, instance, signal, **kwargs):  # pylint: disable=unused-argument
     """
     Archiving all changes made to the Review.
     Will only archive on update/delete, and not on new entries created.
@@ -174,7 +217,7 @@ def on_review_changed(sender, instance, signal, **kwargs):
     if signal is pre_save:
         if instance.id:
             # only for update cases
-            instance = sender.objects.get(id=instance.id)
+            instance = instance.get_original()
         else:
             # don't archive on create
             return
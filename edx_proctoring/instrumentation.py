@@ -0,0 +1,145 @@
+"""
+Instrumentation of the hot paths of edx-proctoring.
+
+The phases of update_attempt_status, create_exam_attempt, get_student_view,
+of the attempt side effects, of the requests made to proctoring backends and of
+review callbacks run within ``span``, which measures their duration and the
+number of database queries they ran, and hands them to the reporters listed in
+the INSTRUMENTATION_SPAN_REPORTERS setting. Without reporters, spans measure
+nothing.
+"""
+
+import logging
+import time
+from contextlib import ExitStack, contextmanager, nullcontext
+from functools import lru_cache, wraps
+
+from edx_django_utils.monitoring import accumulate, function_trace
+
+from django.db import connection
+from django.utils.module_loading import import_string
+
+from edx_proctoring import constants
+
+log = logging.getLogger(__name__)
+
+# prefix of the names of all the spans
+SPAN_PREFIX = 'edx_proctoring'
+
+
+class SpanReporter:
+    """
+    Base class of the reporters of spans, which do nothing
+    """
+
+    def trace(self, name):  # pylint: disable=unused-argument
+        """
+        Returns a context manager wrapping the phase, e.g. to trace it as a segment of the transaction
+        """
+        return nullcontext()
+
+    def report(self, name, duration, query_count):
+        """
+        Reports the duration, in seconds, and the number of database queries of a phase once it ended
+        """
+
+
+class MonitoringSpanReporter(SpanReporter):
+    """
+    Reports spans to the monitoring tools configured in edx-django-utils, such as
+    New Relic, OpenTelemetry or Datadog.
+
+    Each phase is traced as a segment of the transaction, and its duration in
+    milliseconds and query count are accumulated as custom attributes of it.
+    """
+
+    def trace(self, name):
+        return function_trace(name)
+
+    def report(self, name, duration, query_count):
+        accumulate(f'{name}.duration_ms', round(duration * 1000, 3))
+        accumulate(f'{name}.queries', query_count)
+
+
+class LoggingSpanReporter(SpanReporter):
+    """
+    Logs spans, e.g. to be collected by a log based metrics pipeline
+    """
+
+    def report(self, name, duration, query_count):
+        log.info(
+            'Span name=%(name)s duration_ms=%(duration_ms).3f queries=%(queries)d',
+            {'name': name, 'duration_ms': duration * 1000, 'queries': query_count}
+        )
+
+
+@lru_cache(maxsize=None)
+def _get_reporters(paths):
+    """
+    Returns instances of the reporter classes at the given dotted paths
+    """
+    return tuple(import_string(path)() for path in paths)
+
+
+def get_span_reporters():
+    """
+    Returns the configured span reporters
+    """
+    return _get_reporters(tuple(constants.INSTRUMENTATION_SPAN_REPORTERS))
+
+
+class _QueryCounter:
+    """
+    Database execute wrapper counting the queries it sees
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):  # pylint: disable=too-many-positional-arguments
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def span(name):
+    """
+    Context manager measuring the duration and query count of the phase it wraps, and
+    reporting them under ``edx_proctoring.<name>``.
+
+    Spans may be nested, the queries of an inner span are counted by the outer one too.
+    """
+    reporters = get_span_reporters()
+    if not reporters:
+        yield
+        return
+
+    name = f'{SPAN_PREFIX}.{name}'
+    counter = _QueryCounter()
+    with ExitStack() as stack:
+        for reporter in reporters:
+            stack.enter_context(reporter.trace(name))
+        stack.enter_context(connection.execute_wrapper(counter))
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            for reporter in reporters:
+                try:
+                    reporter.report(name, duration, counter.count)
+                except Exception:  # pylint: disable=broad-exception-caught
+                    log.exception('Could not report span name=%(name)s', {'name': name})
+
+
+def instrumented(name):
+    """
+    Decorator running the decorated function within a span
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,62 @@
+"""
+Django management command to record the onboarding verifications of learners from their
+verified onboarding attempts, e.g. for the attempts verified before the verifications
+were recorded, or updated without their signals being sent.
+"""
+
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from edx_proctoring.models import OnboardingVerification, ProctoredExamStudentAttempt
+from edx_proctoring.statuses import ProctoredExamStudentAttemptStatus
+
+log = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Django Management command to backfill the OnboardingVerification table
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch_size',
+            action='store',
+            dest='batch_size',
+            type=int,
+            default=300,
+            help='Maximum number of learners to process before sleeping. '
+                 'This helps avoid overloading the database while updating large amount of data.'
+        )
+        parser.add_argument(
+            '--sleep_time',
+            action='store',
+            dest='sleep_time',
+            type=int,
+            default=10,
+            help='Sleep time in seconds between update of batches'
+        )
+
+    def handle(self, *args, **options):
+        """
+        Management command entry point, refreshes the verification of every learner who has a
+        verified onboarding attempt or a recorded verification, for each backend
+        """
+        batch_size = options['batch_size']
+        sleep_time = options['sleep_time']
+
+        verified_keys = ProctoredExamStudentAttempt.objects.filter(
+            taking_as_proctored=True, proctored_exam__is_practice_exam=True,
+            status=ProctoredExamStudentAttemptStatus.verified,
+        ).values_list('user_id', 'proctored_exam__backend').distinct()
+        recorded_keys = OnboardingVerification.objects.values_list('user_id', 'backend')
+        keys = sorted(set(verified_keys) | set(recorded_keys), key=lambda key: (key[0], key[1] or ''))
+
+        log.info('Refreshing the onboarding verifications of %(count)d learners', {'count': len(keys)})
+        for index, (user_id, backend) in enumerate(keys, start=1):
+            OnboardingVerification.objects.refresh_verification(user_id, backend)
+            if index % batch_size == 0 and index < len(keys):
+                log.info('Refreshed %(index)d onboarding verifications', {'index': index})
+                time.sleep(sleep_time)
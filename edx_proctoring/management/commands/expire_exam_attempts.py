@@ -0,0 +1,61 @@
+"""
+Django management command to time out the exam attempts whose time limit has expired
+"""
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from edx_proctoring.api import expire_exam_attempts
+
+log = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Django Management command to time out expired exam attempts, either once or periodically
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch_size',
+            action='store',
+            dest='batch_size',
+            type=int,
+            default=100,
+            help='Maximum number of attempts to time out per batch.'
+        )
+        parser.add_argument(
+            '--sleep_time',
+            action='store',
+            dest='sleep_time',
+            type=int,
+            default=1,
+            help='Sleep time in seconds between batches, to avoid overloading the database and the LMS services'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            dest='loop',
+            default=False,
+            help='Keep looking for expired attempts instead of exiting once they are all timed out'
+        )
+        parser.add_argument(
+            '--loop_interval',
+            action='store',
+            dest='loop_interval',
+            type=int,
+            default=60,
+            help='Sleep time in seconds between two sweeps when running continuously'
+        )
+
+    def handle(self, *args, **options):
+        """
+        Management command entry point
+        """
+        while True:
+            timed_out = expire_exam_attempts(batch_size=options['batch_size'], sleep_time=options['sleep_time'])
+            log.info('Timed out %(timed_out)s expired exam attempts', {'timed_out': timed_out})
+            if not options['loop']:
+                break
+            time.sleep(options['loop_interval'])
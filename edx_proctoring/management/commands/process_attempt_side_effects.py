@@ -0,0 +1,57 @@
+"""
+Django management command to run the queued side effects of attempt status transitions
+"""
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from edx_proctoring.side_effects import process_attempt_side_effects
+
+log = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Django Management command to run queued attempt side effects, either once or continuously
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch_size',
+            action='store',
+            dest='batch_size',
+            type=int,
+            default=100,
+            help='Maximum number of side effects to run per batch.'
+        )
+        parser.add_argument(
+            '--sleep_time',
+            action='store',
+            dest='sleep_time',
+            type=int,
+            default=10,
+            help='Sleep time in seconds between batches when running continuously'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            dest='loop',
+            default=False,
+            help='Keep polling for queued side effects instead of exiting once the queue is drained'
+        )
+
+    def handle(self, *args, **options):
+        """
+        Management command entry point
+        """
+        batch_size = options['batch_size']
+        sleep_time = options['sleep_time']
+
+        while True:
+            processed = process_attempt_side_effects(batch_size=batch_size)
+            log.info('Ran %(processed)s queued attempt side effects', {'processed': processed})
+            if processed < batch_size:
+                if not options['loop']:
+                    break
+                time.sleep(sleep_time)
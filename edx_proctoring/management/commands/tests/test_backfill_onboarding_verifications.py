@@ -0,0 +1,63 @@
+"""
+Tests for the backfill_onboarding_verifications management command
+"""
+
+from unittest.mock import patch
+
+from django.core.management import call_command
+
+from edx_proctoring.models import OnboardingVerification, ProctoredExam, ProctoredExamStudentAttempt
+from edx_proctoring.statuses import ProctoredExamStudentAttemptStatus
+from edx_proctoring.tests.test_utils.utils import LoggedInTestCase
+
+
+class TestBackfillOnboardingVerifications(LoggedInTestCase):
+    """
+    Coverage of the backfill_onboarding_verifications.py file
+    """
+
+    def setUp(self):
+        """
+        Build up test data
+        """
+        super().setUp()
+        self.onboarding_exam = ProctoredExam.objects.create(
+            course_id='a/b/c',
+            content_id='onboarding',
+            exam_name='Test Onboarding Exam',
+            time_limit_mins=90,
+            is_practice_exam=True,
+            backend='test',
+        )
+        self.users = self.create_batch_users(3)
+        for user in self.users:
+            ProctoredExamStudentAttempt.objects.create(
+                proctored_exam=self.onboarding_exam,
+                user=user,
+                taking_as_proctored=True,
+                status=ProctoredExamStudentAttemptStatus.verified,
+            )
+
+    def test_run_command(self):
+        """
+        Run the management command, recording the verifications of the attempts updated without signals
+        """
+        OnboardingVerification.objects.all().delete()
+        ProctoredExamStudentAttempt.objects.filter(user=self.users[0]).update(
+            status=ProctoredExamStudentAttemptStatus.rejected
+        )
+        OnboardingVerification.objects.create(
+            user=self.users[0],
+            backend='test',
+            verified_at=self.onboarding_exam.created,
+            expires_at=self.onboarding_exam.created,
+        )
+
+        with patch('time.sleep') as mock_sleep:
+            call_command('backfill_onboarding_verifications', batch_size=2, sleep_time=5)
+        mock_sleep.assert_called_once_with(5)
+
+        verifications = OnboardingVerification.objects.order_by('user_id')
+        self.assertEqual([verification.user for verification in verifications], self.users[1:])
+        for verification in verifications:
+            self.assertEqual(verification.verified_attempt.user, verification.user)
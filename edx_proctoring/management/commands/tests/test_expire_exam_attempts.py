@@ -0,0 +1,34 @@
+"""
+Tests for the expire_exam_attempts management command and celery task
+"""
+
+from unittest.mock import patch
+
+from django.core.management import call_command
+
+from edx_proctoring.tasks import expire_exam_attempts_task
+from edx_proctoring.tests.test_utils.utils import ProctoredExamTestCase
+
+
+class TestExpireExamAttempts(ProctoredExamTestCase):
+    """
+    Coverage of the expire_exam_attempts.py file
+    """
+
+    @patch('edx_proctoring.management.commands.expire_exam_attempts.expire_exam_attempts', return_value=0)
+    def test_run_command(self, mock_expire):
+        call_command('expire_exam_attempts', batch_size=10, sleep_time=2)
+        mock_expire.assert_called_once_with(batch_size=10, sleep_time=2)
+
+    @patch('edx_proctoring.management.commands.expire_exam_attempts.time.sleep', side_effect=KeyboardInterrupt)
+    @patch('edx_proctoring.management.commands.expire_exam_attempts.expire_exam_attempts', return_value=0)
+    def test_run_command_in_loop(self, mock_expire, mock_sleep):
+        with self.assertRaises(KeyboardInterrupt):
+            call_command('expire_exam_attempts', loop=True, loop_interval=30)
+        mock_expire.assert_called_once_with(batch_size=100, sleep_time=1)
+        mock_sleep.assert_called_once_with(30)
+
+    @patch('edx_proctoring.tasks.expire_exam_attempts', return_value=0)
+    def test_celery_task(self, mock_expire):
+        expire_exam_attempts_task.apply(kwargs={'batch_size': 50})
+        mock_expire.assert_called_once_with(batch_size=50)
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:11
+
+import django.utils.timezone
+import model_utils.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('edx_proctoring', '0025_auto_20230727_2112'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProctoredExamStudentAttemptSideEffect',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, editable=False, verbose_name='created')),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, editable=False, verbose_name='modified')),
+                ('attempt_id', models.IntegerField(db_index=True)),
+                ('effect_type', models.CharField(max_length=64)),
+                ('payload', models.JSONField(default=dict)),
+                ('idempotency_key', models.CharField(max_length=255, unique=True)),
+                ('status', models.CharField(default='pending', max_length=16)),
+                ('retries', models.PositiveIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField()),
+                ('last_error', models.TextField(blank=True, default='')),
+            ],
+            options={
+                'verbose_name': 'proctored exam attempt side effect',
+                'db_table': 'proctoring_proctoredexamstudentattemptsideeffect',
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='proctoring_sideeffect_due_idx')],
+            },
+        ),
+    ]
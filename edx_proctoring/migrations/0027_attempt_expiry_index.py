@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('edx_proctoring', '0026_attempt_side_effects'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='proctoredexamstudentattempt',
+            index=models.Index(fields=['status', 'allowed_time_limit_mins', 'started_at'], name='proctoring_attempt_expiry_idx'),
+        ),
+    ]
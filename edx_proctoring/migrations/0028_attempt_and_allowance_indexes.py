@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('edx_proctoring', '0027_attempt_expiry_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='proctoredexamstudentallowance',
+            index=models.Index(fields=['proctored_exam', 'user'], name='proctoring_allow_exam_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proctoredexamstudentattempt',
+            index=models.Index(fields=['user', 'proctored_exam', 'created'], name='proctoring_att_user_exam_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proctoredexamstudentattempt',
+            index=models.Index(fields=['user', 'status', 'modified'], name='proctoring_att_user_status_idx'),
+        ),
+    ]
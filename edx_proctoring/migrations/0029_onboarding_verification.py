@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:42
+
+import logging
+
+import django.db.models.deletion
+import django.utils.timezone
+import model_utils.fields
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_onboarding_verifications(apps, schema_editor):
+    """
+    Records the onboarding verifications of the learners who already have a verified
+    proctored onboarding attempt, as they are looked up in this table from now on
+    """
+    # the verifications are recorded by the manager of the current model, which keeps them up to date
+    from edx_proctoring.models import OnboardingVerification, ProctoredExamStudentAttempt
+    from edx_proctoring.statuses import ProctoredExamStudentAttemptStatus
+    log = logging.getLogger(__name__)
+
+    keys = list(ProctoredExamStudentAttempt.objects.filter(
+        taking_as_proctored=True, proctored_exam__is_practice_exam=True,
+        status=ProctoredExamStudentAttemptStatus.verified,
+    ).values_list('user_id', 'proctored_exam__backend').distinct())
+    for user_id, backend in keys:
+        OnboardingVerification.objects.refresh_verification(user_id, backend)
+    log.info('Recorded the onboarding verifications of %(count)d learners', {'count': len(keys)})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('edx_proctoring', '0028_attempt_and_allowance_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OnboardingVerification',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, editable=False, verbose_name='created')),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, editable=False, verbose_name='modified')),
+                ('backend', models.CharField(max_length=255, null=True)),
+                ('verified_at', models.DateTimeField()),
+                ('expires_at', models.DateTimeField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('verified_attempt', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='edx_proctoring.proctoredexamstudentattempt')),
+            ],
+            options={
+                'verbose_name': 'onboarding verification',
+                'db_table': 'proctoring_onboardingverification',
+                'unique_together': {('user', 'backend')},
+            },
+        ),
+        migrations.RunPython(backfill_onboarding_verifications, migrations.RunPython.noop),
+    ]
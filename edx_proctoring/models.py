@@ -2,15 +2,19 @@
 Data models for the proctoring subsystem
 """
 
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime, timedelta
+from functools import lru_cache
 
 import pytz
 from model_utils.models import TimeStampedModel
 from simple_history.models import HistoricalRecords
 
 from django.contrib.auth import get_user_model
-from django.db import models
-from django.db.models import Q
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models, transaction
+from django.db.models import DEFERRED, Exists, OuterRef, Q, Subquery
 from django.db.models.base import ObjectDoesNotExist
 from django.utils.translation import gettext_noop
 
@@ -21,12 +25,97 @@ from edx_proctoring.exceptions import (
     ProctoredExamNotActiveException,
     UserNotFoundException
 )
-from edx_proctoring.statuses import ProctoredExamStudentAttemptStatus, SoftwareSecureReviewStatus
+from edx_proctoring.statuses import (
+    AttemptSideEffectStatus,
+    ProctoredExamStudentAttemptStatus,
+    SoftwareSecureReviewStatus
+)
 
 USER_MODEL = get_user_model()
 
 
-class ProctoredExam(TimeStampedModel):
+class FieldTrackingMixin:
+    """
+    Keeps a snapshot of the field values of a model instance as they are stored
+    in the database, taken when the instance is loaded and refreshed whenever it
+    is saved, so that signal handlers can compare an instance with its stored
+    version without reading the row again.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Snapshots the values of fully loaded instances
+        """
+        instance = super().from_db(db, field_names, values)
+        if len(values) == len(cls._meta.concrete_fields) and DEFERRED not in values:
+            instance._loaded_values = dict(zip(field_names, values))  # pylint: disable=protected-access
+        return instance
+
+    def _get_current_values(self):
+        """
+        Returns the current values of the concrete fields of the instance, or
+        None if some of them are deferred
+        """
+        values = {}
+        for field in self._meta.concrete_fields:
+            if field.attname not in self.__dict__:
+                return None
+            values[field.attname] = self.__dict__[field.attname]
+        return values
+
+    def save(self, *args, **kwargs):
+        """
+        Saves the instance and records the saved values as its stored ones
+        """
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        loaded_values = getattr(self, '_loaded_values', None)
+        if update_fields is not None and loaded_values is not None:
+            for field_name in update_fields:
+                attname = self._meta.get_field(field_name).attname
+                loaded_values[attname] = getattr(self, attname)
+        elif update_fields is None:
+            self._loaded_values = self._get_current_values()
+
+    save.alters_data = True
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        """
+        Reloads the instance and records the reloaded values as its stored ones
+        """
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        loaded_values = getattr(self, '_loaded_values', None)
+        if fields is not None and loaded_values is not None:
+            for field_name in fields:
+                attname = self._meta.get_field(field_name).attname
+                loaded_values[attname] = getattr(self, attname)
+        elif fields is None:
+            self._loaded_values = self._get_current_values()
+
+    def get_original(self):
+        """
+        Returns a copy of the instance as it is stored in the database, without
+        its pending changes. The row is only read again when the instance was not
+        fully loaded from the database.
+        """
+        loaded_values = getattr(self, '_loaded_values', None)
+        if loaded_values is None:
+            return type(self)._default_manager.get(pk=self.pk)
+        original = type(self)(**loaded_values)
+        # pylint: disable=protected-access
+        original._state.adding = False
+        original._state.db = self._state.db
+        original._loaded_values = dict(loaded_values)
+        # share the related objects which have not changed since the instance was loaded
+        for field in self._meta.concrete_fields:
+            if field.is_relation and field.is_cached(self) and \
+                    loaded_values[field.attname] == getattr(self, field.attname):
+                field.set_cached_value(original, field.get_cached_value(self))
+        return original
+
+
+class ProctoredExam(FieldTrackingMixin, TimeStampedModel):
     """
     Information about the Proctored Exam.
 
@@ -134,7 +223,7 @@ class ProctoredExam(TimeStampedModel):
         )
 
 
-class ProctoredExamReviewPolicy(TimeStampedModel):
+class ProctoredExamReviewPolicy(FieldTrackingMixin, TimeStampedModel):
     """
     This is how an instructor can set review policies for a proctored exam
 
@@ -205,22 +294,128 @@ class ProctoredExamReviewPolicyHistory(TimeStampedModel):
         raise NotImplementedError()
 
 
+# identity map of the current attempts of learners on exams, keyed by
+# (exam_id, user_id), while a current_exam_attempts_scope is active
+_current_exam_attempts = ContextVar('edx_proctoring_current_exam_attempts', default=None)
+
+
+@contextmanager
+def current_exam_attempts_scope():
+    """
+    Context manager serving the current attempts of learners on exams from memory,
+    once loaded, until it exits.
+
+    Nested scopes share the identity map of the outermost one. Saving or deleting
+    an attempt forgets the current attempt of its learner on its exam.
+    """
+    if _current_exam_attempts.get() is not None:
+        yield
+        return
+
+    token = _current_exam_attempts.set({})
+    try:
+        yield
+    finally:
+        _current_exam_attempts.reset(token)
+
+
+def forget_current_exam_attempts(exam_id=None, user_id=None):
+    """
+    Forgets the current attempt of a learner on an exam, or every current attempt
+    when no exam is given, e.g. after writing attempts in bulk
+    """
+    current_attempts = _current_exam_attempts.get()
+    if current_attempts is None:
+        return
+    if exam_id is None:
+        current_attempts.clear()
+    else:
+        current_attempts.pop((exam_id, user_id), None)
+
+
 class ProctoredExamStudentAttemptManager(models.Manager):
     """
     Custom manager
     """
 
+    def _get_most_recent_attempt_id(self):
+        """
+        Subquery selecting the id of the most recently created attempt of the learner on the exam of the outer query
+        """
+        return Subquery(self.filter(
+            user_id=OuterRef('user_id'), proctored_exam_id=OuterRef('proctored_exam_id')
+        ).order_by('-created', '-id').values('id')[:1])
+
+    def _get_current_attempts(self):
+        """
+        Returns the most recently created attempt of every learner on every exam
+        """
+        return self.filter(id=self._get_most_recent_attempt_id()).select_related('user', 'proctored_exam')
+
+    def get_current_exam_attempts_for_user(self, user_id, course_id=None, exam_ids=None):
+        """
+        Returns a dictionary of the most recent attempt of the user on every exam,
+        keyed by exam id, optionally limited to a course and/or to some exams.
+
+        The attempts are loaded with a single query.
+        """
+        attempts = self._get_current_attempts().filter(user_id=user_id)
+        if course_id is not None:
+            attempts = attempts.filter(proctored_exam__course_id=course_id)
+        if exam_ids is not None:
+            attempts = attempts.filter(proctored_exam_id__in=exam_ids)
+        current_attempts = {attempt.proctored_exam_id: attempt for attempt in attempts}
+        self._remember(current_attempts.values(), exam_ids, [user_id])
+        return current_attempts
+
+    def get_current_exam_attempts_for_users(self, exam_id, user_ids):
+        """
+        Returns a dictionary of the most recent attempt on the exam of each of the
+        given users who attempted it, keyed by user id.
+
+        The attempts are loaded with a single query.
+        """
+        current_attempts = {
+            attempt.user_id: attempt
+            for attempt in self._get_current_attempts().filter(proctored_exam_id=exam_id, user_id__in=user_ids)
+        }
+        self._remember(current_attempts.values(), [exam_id], user_ids)
+        return current_attempts
+
+    @staticmethod
+    def _remember(attempts, exam_ids, user_ids):
+        """
+        Adds loaded current attempts to the identity map, if any, noting as well
+        which of the requested learners have no attempt on the requested exams
+        """
+        current_attempts = _current_exam_attempts.get()
+        if current_attempts is None:
+            return
+        if exam_ids is not None:
+            current_attempts.update(dict.fromkeys(
+                ((exam_id, user_id) for exam_id in exam_ids for user_id in user_ids)
+            ))
+        current_attempts.update({(attempt.proctored_exam_id, attempt.user_id): attempt for attempt in attempts})
+
     def get_current_exam_attempt(self, exam_id, user_id):
         """
         Returns the most recent Student Exam Attempt object if found
         else Returns None.
+
+        Within a current_exam_attempts_scope, the attempt is served from memory once loaded.
         """
+        current_attempts = _current_exam_attempts.get()
+        if current_attempts is not None and (exam_id, user_id) in current_attempts:
+            return current_attempts[(exam_id, user_id)]
+
         try:
             exam_attempt_obj = self.filter(
                 proctored_exam_id=exam_id, user_id=user_id
             ).latest('created')
         except ObjectDoesNotExist:
             exam_attempt_obj = None
+        if current_attempts is not None:
+            current_attempts[(exam_id, user_id)] = exam_attempt_obj
         return exam_attempt_obj
 
     def get_exam_attempt_by_id(self, attempt_id):
@@ -262,6 +457,32 @@ class ProctoredExamStudentAttemptManager(models.Manager):
         filtered_query = Q(proctored_exam__course_id=course_id)
         return self.filter(filtered_query).order_by('-created')
 
+    def get_most_recent_exam_attempts(self, course_id, search_by=None):
+        """
+        Returns only the most recently created attempt of every learner on every exam
+        in the given course_id, optionally filtered by search_by in user names and emails.
+
+        The de-duplication happens in the database, so the result can be paginated
+        without loading every attempt in the course.
+        """
+        if search_by is not None:
+            attempts = self.get_filtered_exam_attempts(course_id, search_by)
+        else:
+            attempts = self.get_all_exam_attempts(course_id)
+        return attempts.filter(id=self._get_most_recent_attempt_id()).select_related('user', 'proctored_exam')
+
+    def get_attempts_for_user_exam_pairs(self, user_exam_pairs):
+        """
+        Returns all attempts belonging to any of the given (user_id, exam_id) pairs,
+        most recently created first.
+        """
+        filtered_query = Q()
+        for user_id, exam_id in user_exam_pairs:
+            filtered_query |= Q(user_id=user_id, proctored_exam_id=exam_id)
+        if not filtered_query:
+            return self.none()
+        return self.filter(filtered_query).select_related('user', 'proctored_exam').order_by('-created')
+
     def get_all_exam_attempts_by_exam_id(self, exam_id):
         """
         Returns all the exam attempts in an exam with the given exam ID.
@@ -327,6 +548,29 @@ class ProctoredExamStudentAttemptManager(models.Manager):
             is_sample_attempt=False,
         ).order_by('-completed_at')
 
+    def get_expired_attempts(self, now):
+        """
+        Returns the started or ready to submit attempts whose time limit has expired by now,
+        earliest started first.
+
+        Time limits are stored in minutes, so expired attempts are matched with one range on
+        started_at per distinct time limit, rather than with date arithmetic which differs
+        between databases.
+        """
+        in_progress_attempts = self.filter(
+            status__in=[ProctoredExamStudentAttemptStatus.started, ProctoredExamStudentAttemptStatus.ready_to_submit],
+            started_at__isnull=False,
+        )
+        time_limits = in_progress_attempts.exclude(allowed_time_limit_mins=None).order_by().values_list(
+            'allowed_time_limit_mins', flat=True
+        ).distinct()
+        expired_query = Q()
+        for time_limit in time_limits:
+            expired_query |= Q(allowed_time_limit_mins=time_limit, started_at__lt=now - timedelta(minutes=time_limit))
+        if not expired_query:
+            return self.none()
+        return in_progress_attempts.filter(expired_query).order_by('started_at', 'id')
+
     def get_active_student_attempts(self, user_id, course_id=None):
         """
         Returns the active student exams (user in-progress exams)
@@ -354,7 +598,7 @@ class ProctoredExamStudentAttemptManager(models.Manager):
         return self.filter(user_id=user_id, proctored_exam_id=exam_id).order_by('-created')
 
 
-class ProctoredExamStudentAttempt(TimeStampedModel):
+class ProctoredExamStudentAttempt(FieldTrackingMixin, TimeStampedModel):
     """
     Information about the Student Attempt on a
     Proctored Exam.
@@ -426,6 +670,15 @@ class ProctoredExamStudentAttempt(TimeStampedModel):
         """ Meta class for this Django model """
         db_table = 'proctoring_proctoredexamstudentattempt'
         verbose_name = 'proctored exam attempt'
+        indexes = [
+            models.Index(
+                fields=['status', 'allowed_time_limit_mins', 'started_at'], name='proctoring_attempt_expiry_idx'
+            ),
+            # attempts of a learner on an exam, most recent last
+            models.Index(fields=['user', 'proctored_exam', 'created'], name='proctoring_att_user_exam_idx'),
+            # active attempts and recently verified onboarding attempts of learners
+            models.Index(fields=['user', 'status', 'modified'], name='proctoring_att_user_status_idx'),
+        ]
 
     @classmethod
     # pylint: disable=too-many-positional-arguments
@@ -469,22 +722,208 @@ class ProctoredExamStudentAttempt(TimeStampedModel):
         self.delete()
 
 
-def archive_model(model, instance, **mapping):
+class OnboardingVerificationManager(models.Manager):
     """
-    Archives the instance to the given history model
-    optionally maps field names from the instance model to the history model
+    Custom manager for the onboarding verifications
+    """
+    def get_unexpired_verifications(self, users, proctoring_backend):
+        """
+        Returns the onboarding verifications of the passed in users for a specific backend,
+        which have not expired yet, with their verified attempts.
+
+        Parameters:
+            * users: A list of users object of which we are checking the verifications
+            * proctoring_backend: The name of the proctoring backend
+        """
+        return self.filter(
+            user__in=users, backend=proctoring_backend, expires_at__gt=datetime.now(pytz.UTC),
+            verified_attempt__isnull=False,
+        ).select_related('verified_attempt')
+
+    def refresh_verification(self, user_id, proctoring_backend):
+        """
+        Records the last verified proctored onboarding attempt of the user for a specific backend,
+        or forgets the user's verification if there is none anymore.
+        """
+        verified_attempt = ProctoredExamStudentAttempt.objects.filter(
+            user_id=user_id, taking_as_proctored=True, proctored_exam__is_practice_exam=True,
+            proctored_exam__backend=proctoring_backend, status=ProctoredExamStudentAttemptStatus.verified
+        ).order_by('-modified').first()
+        if verified_attempt is None:
+            self.filter(user_id=user_id, backend=proctoring_backend).delete()
+            return None
+
+        verification, _ = self.update_or_create(
+            user_id=user_id,
+            backend=proctoring_backend,
+            defaults={
+                'verified_attempt': verified_attempt,
+                'verified_at': verified_attempt.modified,
+                'expires_at': verified_attempt.modified + timedelta(days=VERIFICATION_DAYS_VALID),
+            }
+        )
+        return verification
+
+
+class OnboardingVerification(TimeStampedModel):
+    """
+    The last verified proctored onboarding attempt of a learner for a proctoring backend,
+    in any course. Kept up to date whenever onboarding attempts are verified or stop being
+    verified, so that the onboarding status of learners is looked up by user and backend
+    rather than by scanning their attempts.
+
+    .. no_pii:
+    """
+    objects = OnboardingVerificationManager()
+
+    user = models.ForeignKey(USER_MODEL, on_delete=models.CASCADE)
+
+    # name of the backend of the onboarding exam, None for the default backend
+    backend = models.CharField(max_length=255, null=True)
+
+    verified_attempt = models.ForeignKey(ProctoredExamStudentAttempt, null=True, on_delete=models.SET_NULL)
+
+    # when the attempt was last modified, and when its verification expires
+    verified_at = models.DateTimeField()
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        """ Meta class for this Django model """
+        db_table = 'proctoring_onboardingverification'
+        verbose_name = 'onboarding verification'
+        unique_together = (('user', 'backend'),)
+
+
+class ProctoredExamStudentAttemptSideEffectManager(models.Manager):
+    """
+    Custom manager for the attempt side effect outbox
+    """
+    def get_due_side_effects(self, now, batch_size):
+        """
+        Returns the side effects which are due to run, oldest first: the pending ones,
+        and the running ones whose claim expired.
+
+        A side effect is held back while an older side effect of the same attempt and
+        type is waiting to be retried or is running, so that the effects of a type of
+        successive transitions (e.g. a grade override and its undo) are always applied
+        in order. Side effects of other types of the same attempt are not held back.
+        """
+        unfinished_statuses = [AttemptSideEffectStatus.pending, AttemptSideEffectStatus.running]
+        older_unfinished = self.filter(
+            attempt_id=OuterRef('attempt_id'),
+            effect_type=OuterRef('effect_type'),
+            status__in=unfinished_statuses,
+            next_attempt_at__gt=now,
+            id__lt=OuterRef('id'),
+        )
+        return self.filter(
+            status__in=unfinished_statuses,
+            next_attempt_at__lte=now,
+        ).exclude(Exists(older_unfinished)).order_by('id')[:batch_size]
+
+
+class ProctoredExamStudentAttemptSideEffect(TimeStampedModel):
     """
-    archive = model()
+    Outbox of side effects of attempt status transitions which are run outside
+    of the request that made the transition.
+
+    .. no_pii:
+    """
+    objects = ProctoredExamStudentAttemptSideEffectManager()
+
+    # not a foreign key, the side effects of an attempt must still run after it is deleted
+    attempt_id = models.IntegerField(db_index=True)
+
+    # name of the handler registered for this side effect
+    effect_type = models.CharField(max_length=64)
+
+    # json serializable arguments of the handler
+    payload = models.JSONField(default=dict)
+
+    # identifies the transition and effect, so that the same effect is never queued twice
+    idempotency_key = models.CharField(max_length=255, unique=True)
+
+    status = models.CharField(max_length=16, default=AttemptSideEffectStatus.pending)
+
+    # number of failed runs so far
+    retries = models.PositiveIntegerField(default=0)
+
+    # when the side effect is due to run or, while it is running, when its claim expires
+    next_attempt_at = models.DateTimeField()
+
+    last_error = models.TextField(blank=True, default='')
+
+    class Meta:
+        """ Meta class for this Django model """
+        db_table = 'proctoring_proctoredexamstudentattemptsideeffect'
+        verbose_name = 'proctored exam attempt side effect'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='proctoring_sideeffect_due_idx'),
+        ]
+
+
+@lru_cache(maxsize=None)
+def _get_archive_fields(model, history_model, mapping):
+    """
+    Returns the (attname, history attname) pairs of the fields copied when
+    archiving instances of model to history_model. ``mapping`` holds the
+    (field name, history field name) pairs of the fields which are renamed,
+    or skipped when mapped to None.
+    """
+    mapping = dict(mapping)
     # timestampedmodels automatically create these
     mapping['created'] = mapping['modified'] = None
-    for field in instance._meta.get_fields():
+    fields = []
+    for field in model._meta.concrete_fields:
         to_name = mapping.get(field.name, field.name)
-        if to_name is not None:
-            setattr(archive, to_name, getattr(instance, field.name, None))
+        if to_name is None:
+            continue
+        try:
+            to_field = history_model._meta.get_field(to_name)
+        except FieldDoesNotExist:
+            continue
+        if to_field.concrete:
+            fields.append((field.attname, to_field.attname))
+    return tuple(fields)
+
+
+def _build_archive(model, instance, mapping):
+    """
+    Returns an unsaved archive of the instance in the given history model
+    """
+    fields = _get_archive_fields(type(instance), model, tuple(sorted(mapping.items())))
+    return model(**{to_attname: getattr(instance, attname) for attname, to_attname in fields})
+
+
+def archive_model(model, instance, **mapping):
+    """
+    Archives the instance to the given history model
+    optionally maps field names from the instance model to the history model
+    """
+    archive = _build_archive(model, instance, mapping)
     archive.save()
     return archive
 
 
+def archive_models(model, instances, **mapping):
+    """
+    Archives a queryset, or a list of instances of the same model, to the given
+    history model with a single insert, mapping field names as archive_model does.
+
+    The rows of a queryset are read with a single query, without building model
+    instances.
+    """
+    if isinstance(instances, models.QuerySet):
+        fields = _get_archive_fields(instances.model, model, tuple(sorted(mapping.items())))
+        archives = [
+            model(**{to_attname: value for (_, to_attname), value in zip(fields, row)})
+            for row in instances.values_list(*(attname for attname, _ in fields))
+        ]
+    else:
+        archives = [_build_archive(model, instance, mapping) for instance in instances]
+    return model.objects.bulk_create(archives)
+
+
 class QuerySetWithUpdateOverride(models.QuerySet):
     """
     Custom QuerySet class to make an archive copy
@@ -492,9 +931,20 @@ class QuerySetWithUpdateOverride(models.QuerySet):
     """
 
     def update(self, **kwargs):
-        """ Create a copy after update """
-        super().update(**kwargs)
-        archive_model(ProctoredExamStudentAllowanceHistory, self.get(), id='allowance_id')
+        """
+        Updates the rows and archives every updated row, as it is after the update
+        """
+        with transaction.atomic(using=self.db):
+            pks = list(self.values_list('pk', flat=True))
+            if not pks:
+                return 0
+            rows = models.QuerySet(model=self.model, using=self.db).filter(pk__in=pks).update(**kwargs)
+            archive_models(
+                ProctoredExamStudentAllowanceHistory,
+                models.QuerySet(model=self.model, using=self.db).filter(pk__in=pks),
+                id='allowance_id'
+            )
+        return rows
 
 
 class ProctoredExamStudentAllowanceManager(models.Manager):
@@ -510,7 +960,7 @@ class ProctoredExamStudentAllowanceManager(models.Manager):
         return QuerySetWithUpdateOverride(self.model, using=self._db)
 
 
-class ProctoredExamStudentAllowance(TimeStampedModel):
+class ProctoredExamStudentAllowance(FieldTrackingMixin, TimeStampedModel):
     """
     Information about allowing a student additional time on exam.
 
@@ -541,16 +991,44 @@ class ProctoredExamStudentAllowance(TimeStampedModel):
     class Meta:
         """ Meta class for this Django model """
         unique_together = (('user', 'proctored_exam', 'key'),)
+        indexes = [
+            models.Index(fields=['proctored_exam', 'user'], name='proctoring_allow_exam_user_idx'),
+        ]
         db_table = 'proctoring_proctoredexamstudentallowance'
         verbose_name = 'proctored allowance'
 
     @classmethod
-    def get_allowances_for_course(cls, course_id):
+    def get_allowances_for_course(cls, course_id, user_ids=None):
         """
-        Returns all the allowances for a course.
+        Returns all the allowances for a course, along with their users and exams.
+
+        Parameters:
+        * course_id: ID of the course
+        * user_ids (optional): an iterable of user ids to filter by
         """
         filtered_query = Q(proctored_exam__course_id=course_id)
-        return cls.objects.filter(filtered_query)
+        if user_ids is not None:
+            filtered_query &= Q(user_id__in=user_ids)
+        return cls.objects.filter(filtered_query).select_related('user', 'proctored_exam')
+
+    @classmethod
+    def get_users_with_allowances_for_course(cls, course_id, username_prefix=None, after_username=None):
+        """
+        Returns (user id, username) pairs of the users with allowances in a course, ordered by username.
+
+        Parameters:
+        * course_id: ID of the course
+        * username_prefix (optional): only returns the users whose username starts with it
+        * after_username (optional): only returns the users whose username sorts after it
+        """
+        filtered_query = Q(proctored_exam__course_id=course_id)
+        if username_prefix:
+            filtered_query &= Q(user__username__startswith=username_prefix)
+        if after_username:
+            filtered_query &= Q(user__username__gt=after_username)
+        return cls.objects.filter(filtered_query).values_list('user_id', 'user__username').distinct().order_by(
+            'user__username'
+        )
 
     @classmethod
     def get_allowance_for_user(cls, exam_id, user_id, key):
@@ -621,6 +1099,98 @@ class ProctoredExamStudentAllowance(TimeStampedModel):
             action = "created"
         return student_allowance, action
 
+    @classmethod
+    def get_user_ids_by_user_info(cls, user_infos):
+        """
+        Resolve many user identifiers at once, the same way add_allowance_for_user resolves a single one:
+        integers are taken to be user ids, anything else is matched against usernames first and
+        against emails second.
+
+        Returns a dictionary keyed by the given user identifiers. Identifiers that could not be
+        resolved are left out.
+        """
+        user_ids = {user_info: user_info for user_info in user_infos if isinstance(user_info, int)}
+        names = {str(user_info) for user_info in user_infos if not isinstance(user_info, int)}
+        if not names:
+            return user_ids
+
+        ids_by_username = {}
+        ids_by_email = {}
+        users = USER_MODEL.objects.filter(
+            Q(username__in=names) | Q(email__in=names)
+        ).order_by('id').values_list('id', 'username', 'email')
+        for user_id, username, email in users:
+            ids_by_username.setdefault(username, user_id)
+            ids_by_email.setdefault(email, user_id)
+
+        for user_info in user_infos:
+            if isinstance(user_info, int):
+                continue
+            user_id = ids_by_username.get(str(user_info), ids_by_email.get(str(user_info)))
+            if user_id is not None:
+                user_ids[user_info] = user_id
+        return user_ids
+
+    @classmethod
+    def add_allowances(cls, allowances):
+        """
+        Add (or Update) many allowances at once.
+
+        Parameters:
+        * allowances: an iterable of (exam_id, user_id, key, value) tuples
+
+        Existing allowances are updated with a single bulk update, after their previous values
+        have been archived, and missing ones are created with a single bulk insert.
+        Returns a list of (allowance, action) tuples, in the order the allowances were given.
+        """
+        allowances = list(allowances)
+        if not allowances:
+            return []
+
+        existing_allowances = {
+            (allowance.proctored_exam_id, allowance.user_id, allowance.key): allowance
+            for allowance in cls.objects.filter(
+                proctored_exam_id__in={exam_id for exam_id, _, _, _ in allowances},
+                user_id__in={user_id for _, user_id, _, _ in allowances},
+                key__in={key for _, _, key, _ in allowances},
+            )
+        }
+
+        results = []
+        history = []
+        to_update = []
+        updated_ids = set()
+        to_create = []
+        now = datetime.now(pytz.UTC)
+        for exam_id, user_id, key, value in allowances:
+            student_allowance = existing_allowances.get((exam_id, user_id, key))
+            if student_allowance is not None and student_allowance.pk is None:
+                # the same allowance was given twice, and is about to be created
+                student_allowance.value = value
+                results.append((student_allowance, 'updated'))
+            elif student_allowance is not None:
+                history.append(_build_archive(
+                    ProctoredExamStudentAllowanceHistory, student_allowance, {'id': 'allowance_id'}
+                ))
+                student_allowance.value = value
+                student_allowance.modified = now
+                if student_allowance.pk not in updated_ids:
+                    updated_ids.add(student_allowance.pk)
+                    to_update.append(student_allowance)
+                results.append((student_allowance, 'updated'))
+            else:
+                student_allowance = cls(proctored_exam_id=exam_id, user_id=user_id, key=key, value=value)
+                existing_allowances[(exam_id, user_id, key)] = student_allowance
+                to_create.append(student_allowance)
+                results.append((student_allowance, 'created'))
+
+        with transaction.atomic():
+            ProctoredExamStudentAllowanceHistory.objects.bulk_create(history)
+            # a plain queryset is used, as the default manager archives the rows it updates
+            models.QuerySet(model=cls).bulk_update(to_update, ['value', 'modified'])
+            cls.objects.bulk_create(to_create)
+        return results
+
     @classmethod
     def is_allowance_value_valid(cls, allowance_type, allowance_value):
         """
@@ -681,7 +1251,7 @@ class ProctoredExamStudentAllowanceHistory(TimeStampedModel):
         verbose_name = 'proctored allowance history'
 
 
-class ProctoredExamSoftwareSecureReview(TimeStampedModel):
+class ProctoredExamSoftwareSecureReview(FieldTrackingMixin, TimeStampedModel):
     """
     This is where we store the proctored exam review feedback
     from the exam reviewers
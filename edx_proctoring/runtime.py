@@ -1,10 +1,40 @@
 """
 Runtime services that the LMS can register than we can callback on
+
+Calls to some of these services are expensive, so the results of their read only
+methods can be memoized for the lifetime of a request or of an API operation, by
+running it within ``runtime_services_scope``.
 """
 
+import copy
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial, wraps
+
 _RUNTIME_SERVICES = {}
 
 
+def _outline_details_key(course_key, user, at_time):  # pylint: disable=unused-argument
+    """
+    The outline of a course is not expected to change during a request, whatever its time
+    """
+    return (str(course_key), getattr(user, 'id', user))
+
+
+# read only methods of the runtime services whose results are memoized within a
+# runtime_services_scope, with the function building the cache key of a call from
+# its arguments (None to use the arguments themselves)
+MEMOIZED_SERVICE_METHODS = {
+    'credit': {'get_credit_state': None},
+    'grades': {'should_override_grade_on_rejected_exam': None},
+    'instructor': {'get_proctoring_escalation_email': None},
+    'learning_sequences': {'get_user_course_outline_details': _outline_details_key},
+}
+
+# results of the memoized calls of the current scope, by service name
+_memoized_results = ContextVar('edx_proctoring_memoized_runtime_results', default=None)
+
+
 def set_runtime_service(name, callback):
     """
     Adds a service provided by the runtime (aka LMS) to our directory
@@ -13,9 +43,89 @@ def set_runtime_service(name, callback):
     _RUNTIME_SERVICES[name] = callback
 
 
-def get_runtime_service(name):
+def get_runtime_service(name, memoize=True):
     """
     Returns a registered runtime service, None if no match is found
+
+    Within a runtime_services_scope, the results of the read only methods of the
+    service are memoized, unless ``memoize`` is False.
     """
 
-    return _RUNTIME_SERVICES.get(name)
+    service = _RUNTIME_SERVICES.get(name)
+    memoized_results = _memoized_results.get()
+    if service is None or not memoize or memoized_results is None or name not in MEMOIZED_SERVICE_METHODS:
+        return service
+    return MemoizedRuntimeService(name, service, memoized_results.setdefault(name, {}))
+
+
+@contextmanager
+def runtime_services_scope():
+    """
+    Context manager memoizing the read only calls to the runtime services until it exits.
+
+    Nested scopes share the memoized results of the outermost one.
+    """
+    if _memoized_results.get() is not None:
+        yield
+        return
+
+    token = _memoized_results.set({})
+    try:
+        yield
+    finally:
+        _memoized_results.reset(token)
+
+
+def memoize_runtime_services(func):
+    """
+    Decorator running the decorated function within a runtime_services_scope
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with runtime_services_scope():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+class MemoizedRuntimeService:
+    """
+    Proxy of a runtime service memoizing the results of its read only methods.
+
+    Calling any other method of the service may change what those return, so it
+    clears the memoized results of the service.
+    """
+
+    def __init__(self, name, service, results):
+        self._name = name
+        self._service = service
+        self._results = results
+
+    def __getattr__(self, attr):
+        value = getattr(self._service, attr)
+        if not callable(value):
+            return value
+        methods = MEMOIZED_SERVICE_METHODS[self._name]
+        if attr in methods:
+            return partial(self._call_memoized, attr, value, methods[attr])
+        return partial(self._call, value)
+
+    def _call_memoized(self, attr, method, get_key, *args, **kwargs):
+        """
+        Returns a copy of the memoized result of the call, calling the method if there is none
+        """
+        key = (attr, get_key(*args, **kwargs) if get_key else (args, tuple(sorted(kwargs.items()))))
+        try:
+            result = self._results[key]
+        except TypeError:
+            # unhashable arguments, the call can't be memoized
+            return method(*args, **kwargs)
+        except KeyError:
+            result = self._results[key] = method(*args, **kwargs)
+        return copy.deepcopy(result)
+
+    def _call(self, method, *args, **kwargs):
+        """
+        Calls a method which isn't memoized, and forgets the memoized results of the service
+        """
+        self._results.clear()
+        return method(*args, **kwargs)
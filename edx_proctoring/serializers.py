@@ -1,5 +1,7 @@
 """Defines serializers used by the Proctoring API."""
 
+from operator import itemgetter
+
 from rest_framework import serializers
 from rest_framework.fields import DateTimeField
 
@@ -113,6 +115,47 @@ class ProctoredExamStudentAttemptSerializer(serializers.ModelSerializer):
         )
 
 
+def _get_attempt_field_builder(field):
+    """
+    Returns the function building the value of a serialized attempt field from a values() row
+    """
+    if field == 'user':
+        lookups = tuple((user_field, f'user__{user_field}') for user_field in UserSerializer.Meta.fields)
+    elif field == 'proctored_exam':
+        lookups = tuple(
+            (exam_field, f'proctored_exam__{exam_field}') for exam_field in ProctoredExamSerializer.Meta.fields
+        )
+    elif field in ('created', 'modified'):
+        # serialized like ModelSerializer does, following the DATETIME_FORMAT setting
+        return lambda row, to_representation=DateTimeField().to_representation: to_representation(row[field])
+    else:
+        return itemgetter(field)
+    return lambda row: {key: row[lookup] for key, lookup in lookups}
+
+
+# values() lookups and value builders of the fields of a serialized attempt, in order
+_ATTEMPT_FIELD_BUILDERS = tuple(
+    (field, _get_attempt_field_builder(field)) for field in ProctoredExamStudentAttemptSerializer.Meta.fields
+)
+_ATTEMPT_VALUES_LOOKUPS = tuple(
+    [field for field in ProctoredExamStudentAttemptSerializer.Meta.fields if field not in ('user', 'proctored_exam')] +
+    [f'user__{field}' for field in UserSerializer.Meta.fields] +
+    [f'proctored_exam__{field}' for field in ProctoredExamSerializer.Meta.fields]
+)
+
+
+def serialize_attempts(queryset):
+    """
+    Returns the attempts of the queryset as the same dicts as ProctoredExamStudentAttemptSerializer
+    produces, built from a single values() query joining their users and exams instead of from
+    model instances and nested serializers.
+    """
+    return [
+        {field: build(row) for field, build in _ATTEMPT_FIELD_BUILDERS}
+        for row in queryset.values(*_ATTEMPT_VALUES_LOOKUPS)
+    ]
+
+
 class ProctoredExamStudentAllowanceSerializer(serializers.ModelSerializer):
     """
     Serializer for the ProctoredExamStudentAllowance Model.
@@ -0,0 +1,327 @@
+"""
+Side effects of exam attempt status transitions.
+
+update_attempt_status persists a transition and dispatches its side effects
+(credit requirement updates, grade overrides, emails and proctoring backend
+calls) through this module. By default they run inline, as part of the
+transition. With ASYNC_ATTEMPT_SIDE_EFFECTS enabled they are instead written to
+an outbox table in the same transaction as the transition, and are run once it
+commits by the process_attempt_side_effects celery task or management command.
+Failed side effects are retried with an exponential backoff. A side effect type
+may also be queued on its own setting, e.g. the proctoring backend calls with
+QUEUE_BACKEND_ATTEMPT_OPERATIONS, and may register a batch runner which runs all
+of its queued side effects at once.
+
+The queued side effects of an attempt run in order per side effect type: a side
+effect is held back while an older one of the same attempt and type is waiting
+to be retried or is running. Side effects of different types do not wait on
+each other, so that e.g. a failing email does not delay the proctoring backend
+calls of the attempt.
+
+Queued side effects are claimed by a worker for a limited time in a short
+transaction, run outside of any transaction, and their outcome is recorded in a
+second short transaction, so that no lock is held while they run.
+
+Since a side effect may be retried, its handler must be idempotent and must only
+take json serializable arguments.
+"""
+
+import logging
+from collections import defaultdict
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+
+import pytz
+from celery import current_app
+
+from django.db import transaction
+
+from edx_proctoring import constants
+from edx_proctoring.instrumentation import span
+from edx_proctoring.models import ProctoredExamStudentAttemptSideEffect
+from edx_proctoring.statuses import AttemptSideEffectStatus
+
+log = logging.getLogger(__name__)
+
+# name of the celery task defined in edx_proctoring.tasks
+PROCESS_ATTEMPT_SIDE_EFFECTS_TASK = 'edx_proctoring.tasks.process_attempt_side_effects_task'
+
+# maximum delay between two runs of a failing side effect
+MAX_RETRY_DELAY = 60 * 60
+
+# number of seconds a worker has to run the side effects it claimed, after which
+# they are run again, e.g. since the worker died
+CLAIM_LEASE = 10 * 60
+
+_handlers = {}
+
+# name of the constant queueing the side effects of a type even when
+# ASYNC_ATTEMPT_SIDE_EFFECTS is disabled, by effect type
+_queue_settings = {}
+
+# function running several queued side effects at once, by effect type
+_batch_runners = {}
+
+
+def attempt_side_effect(effect_type, best_effort=False, queue_setting=None, batch_runner=None):
+    """
+    Decorator registering the handler of a side effect.
+
+    The handler is called with the payload of the side effect as keyword arguments.
+    When run inline, failures of ``best_effort`` side effects are logged instead of
+    being raised to the caller of update_attempt_status.
+
+    When the constant named ``queue_setting`` is enabled, the side effects of this
+    type are queued even when ASYNC_ATTEMPT_SIDE_EFFECTS is disabled.
+
+    ``batch_runner`` runs the queued side effects of this type instead of the handler.
+    It is called with the claimed side effects, oldest first, and returns a dict of
+    their outcomes by id: AttemptSideEffectStatus.done or superseded, or the exception
+    the side effect failed with. The side effects without an outcome are run later.
+    """
+    def decorator(func):
+        _handlers[effect_type] = (func, best_effort)
+        if queue_setting:
+            _queue_settings[effect_type] = queue_setting
+        if batch_runner:
+            _batch_runners[effect_type] = batch_runner
+        return func
+    return decorator
+
+
+def is_attempt_side_effect_queued(effect_type):
+    """
+    Returns whether the side effects of this type are queued rather than run inline
+    """
+    if constants.ASYNC_ATTEMPT_SIDE_EFFECTS:
+        return True
+    queue_setting = _queue_settings.get(effect_type)
+    return bool(queue_setting and getattr(constants, queue_setting))
+
+
+def attempt_side_effects_transaction():
+    """
+    Returns a context manager which, when side effects are queued, wraps a transition
+    and the queueing of its side effects in a single transaction
+    """
+    if any(is_attempt_side_effect_queued(effect_type) for effect_type in _handlers):
+        return transaction.atomic()
+    return nullcontext()
+
+
+def dispatch_attempt_side_effect(attempt_id, transition_key, effect_type, payload):
+    """
+    Runs the side effect with the given payload inline or, when side effects of this
+    type are queued, queues it to run once the current transaction commits.
+
+    ``transition_key`` identifies the transition which triggered the side effect;
+    together with ``effect_type`` it makes sure that the same side effect is never
+    queued twice.
+    """
+    func, best_effort = _handlers[effect_type]
+    if not is_attempt_side_effect_queued(effect_type):
+        try:
+            with span(f'side_effect.{effect_type}'):
+                func(**payload)
+        except Exception:  # pylint: disable=broad-exception-caught
+            if not best_effort:
+                raise
+            log.exception(
+                ('Attempt side effect type=%(effect_type)s for attempt_id=%(attempt_id)s of '
+                 'user_id=%(user_id)s in course_id=%(course_id)s failed'),
+                {
+                    'effect_type': effect_type,
+                    'attempt_id': attempt_id,
+                    'user_id': payload.get('user_id'),
+                    'course_id': payload.get('course_id'),
+                }
+            )
+        return
+
+    ProctoredExamStudentAttemptSideEffect.objects.get_or_create(
+        idempotency_key=f'{transition_key}.{effect_type}',
+        defaults={
+            'attempt_id': attempt_id,
+            'effect_type': effect_type,
+            'payload': payload,
+            'next_attempt_at': datetime.now(pytz.UTC),
+        }
+    )
+    if constants.ATTEMPT_SIDE_EFFECTS_USE_CELERY:
+        transaction.on_commit(_schedule_processing)
+
+
+def _schedule_processing():
+    """
+    Schedules the celery task which runs queued side effects
+    """
+    try:
+        current_app.send_task(PROCESS_ATTEMPT_SIDE_EFFECTS_TASK)
+    except Exception as err:  # pylint: disable=broad-exception-caught
+        # the side effects stay queued and are picked up by the next run
+        log.warning(
+            'Could not schedule processing of queued attempt side effects -- %(err)s',
+            {'err': err}
+        )
+
+
+def _get_retry_delay(retries):
+    """
+    Returns the number of seconds to wait before running a side effect which failed ``retries`` times
+    """
+    return min(constants.ATTEMPT_SIDE_EFFECT_RETRY_DELAY * 2 ** (retries - 1), MAX_RETRY_DELAY)
+
+
+def process_attempt_side_effects(batch_size=100):
+    """
+    Runs the queued side effects which are due, and returns how many of them ran.
+
+    Side effects are claimed before they run, so several workers may process the
+    queue concurrently.
+    """
+    side_effects, lease_until = _claim_side_effects(batch_size)
+    side_effects_by_type = defaultdict(list)
+    for side_effect in side_effects:
+        side_effects_by_type[side_effect.effect_type].append(side_effect)
+
+    outcomes = {}
+    for effect_type, typed_side_effects in side_effects_by_type.items():
+        batch_runner = _batch_runners.get(effect_type)
+        if batch_runner is None:
+            outcomes.update(_run_side_effects(typed_side_effects))
+            continue
+        try:
+            with span(f'side_effect.{effect_type}'):
+                outcomes.update(batch_runner(typed_side_effects))
+        except Exception as err:  # pylint: disable=broad-exception-caught
+            outcomes.update({side_effect.id: err for side_effect in typed_side_effects})
+
+    _record_outcomes(side_effects, outcomes, lease_until)
+    return len(outcomes)
+
+
+def _claim_side_effects(batch_size):
+    """
+    Claims the side effects which are due, until the returned lease expires
+    """
+    now = datetime.now(pytz.UTC)
+    lease_until = now + timedelta(seconds=CLAIM_LEASE)
+    with transaction.atomic():
+        due = list(
+            ProctoredExamStudentAttemptSideEffect.objects.get_due_side_effects(now, batch_size).select_for_update(
+                skip_locked=True
+            )
+        )
+        if not due:
+            return [], lease_until
+
+        # side effects which were locked by another worker, while it claimed them, are
+        # not in the due ones. The later side effects of the same attempts and types wait on them.
+        due_ids = {side_effect.id for side_effect in due}
+        first_skipped_ids = {}
+        skipped = ProctoredExamStudentAttemptSideEffect.objects.filter(
+            attempt_id__in={side_effect.attempt_id for side_effect in due},
+            status__in=[AttemptSideEffectStatus.pending, AttemptSideEffectStatus.running],
+            id__lt=max(due_ids),
+        ).exclude(id__in=due_ids).order_by('id').values_list('id', 'attempt_id', 'effect_type')
+        for side_effect_id, attempt_id, effect_type in skipped:
+            first_skipped_ids.setdefault((attempt_id, effect_type), side_effect_id)
+        claimed = [
+            side_effect for side_effect in due
+            if side_effect.id < first_skipped_ids.get(
+                (side_effect.attempt_id, side_effect.effect_type), side_effect.id + 1
+            )
+        ]
+
+        ProctoredExamStudentAttemptSideEffect.objects.filter(id__in=[side_effect.id for side_effect in claimed]).update(
+            status=AttemptSideEffectStatus.running, next_attempt_at=lease_until, modified=now
+        )
+    for side_effect in claimed:
+        side_effect.status = AttemptSideEffectStatus.running
+        side_effect.next_attempt_at = lease_until
+    return claimed, lease_until
+
+
+def _run_side_effects(side_effects):
+    """
+    Runs the handlers of claimed side effects one at a time, and returns their outcomes
+    """
+    outcomes = {}
+    # attempts and types whose remaining side effects must wait, since an older one failed
+    blocked_keys = set()
+    for side_effect in side_effects:
+        key = (side_effect.attempt_id, side_effect.effect_type)
+        if key in blocked_keys:
+            continue
+        func, _ = _handlers[side_effect.effect_type]
+        try:
+            # roll back the database writes of a failed handler
+            with transaction.atomic(), span(f'side_effect.{side_effect.effect_type}'):
+                func(**side_effect.payload)
+        except Exception as err:  # pylint: disable=broad-exception-caught
+            outcomes[side_effect.id] = err
+            blocked_keys.add(key)
+        else:
+            outcomes[side_effect.id] = AttemptSideEffectStatus.done
+    return outcomes
+
+
+def _record_outcomes(side_effects, outcomes, lease_until):
+    """
+    Records the outcomes of claimed side effects, and releases the ones which did not run.
+
+    The outcome of a side effect whose lease expired, and which was claimed again, is not recorded.
+    """
+    now = datetime.now(pytz.UTC)
+    with transaction.atomic():
+        for side_effect in side_effects:
+            outcome = outcomes.get(side_effect.id)
+            if outcome is None:
+                side_effect.status = AttemptSideEffectStatus.pending
+                side_effect.next_attempt_at = now
+            elif isinstance(outcome, Exception):
+                _record_failure(side_effect, outcome, now)
+            else:
+                side_effect.status = outcome
+            ProctoredExamStudentAttemptSideEffect.objects.filter(
+                id=side_effect.id,
+                status=AttemptSideEffectStatus.running,
+                next_attempt_at=lease_until,
+            ).update(
+                status=side_effect.status,
+                retries=side_effect.retries,
+                next_attempt_at=side_effect.next_attempt_at,
+                last_error=side_effect.last_error,
+                modified=now,
+            )
+
+
+def _record_failure(side_effect, err, now):
+    """
+    Schedules a retry of a failed side effect, or gives up on it
+    """
+    side_effect.retries += 1
+    side_effect.last_error = repr(err)
+    log_data = {
+        'side_effect_id': side_effect.id,
+        'effect_type': side_effect.effect_type,
+        'attempt_id': side_effect.attempt_id,
+        'retries': side_effect.retries,
+    }
+    if side_effect.retries >= constants.ATTEMPT_SIDE_EFFECT_MAX_RETRIES:
+        side_effect.status = AttemptSideEffectStatus.failed
+        log.error(
+            ('Giving up on attempt side effect id=%(side_effect_id)s type=%(effect_type)s '
+             'for attempt_id=%(attempt_id)s after %(retries)s retries'),
+            log_data,
+            exc_info=err
+        )
+    else:
+        side_effect.status = AttemptSideEffectStatus.pending
+        side_effect.next_attempt_at = now + timedelta(seconds=_get_retry_delay(side_effect.retries))
+        log.warning(
+            ('Attempt side effect id=%(side_effect_id)s type=%(effect_type)s for '
+             'attempt_id=%(attempt_id)s failed, retries=%(retries)s'),
+            log_data,
+            exc_info=err
+        )
@@ -328,3 +328,25 @@ class VerificientOnboardingProfileStatus:
         if api_status == cls.no_profile:
             return InstructorDashboardOnboardingAttemptStatus.not_started
         return cls.get_edx_status_from_profile_status(api_status)
+
+
+class AttemptSideEffectStatus:
+    """
+    A class to enumerate the states of a queued side effect of an attempt
+    status transition
+    """
+
+    # the side effect is waiting to be run, or to be retried
+    pending = 'pending'
+
+    # the side effect was claimed by a worker which is running it
+    running = 'running'
+
+    # the side effect ran successfully
+    done = 'done'
+
+    # a later side effect of the same attempt made this one unnecessary
+    superseded = 'superseded'
+
+    # the side effect kept failing and will not be retried
+    failed = 'failed'
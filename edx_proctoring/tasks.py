@@ -0,0 +1,24 @@
+"""
+Celery tasks of edx-proctoring
+"""
+
+from celery import shared_task
+
+from edx_proctoring.api import EXPIRE_EXAM_ATTEMPTS_TASK, expire_exam_attempts
+from edx_proctoring.side_effects import PROCESS_ATTEMPT_SIDE_EFFECTS_TASK, process_attempt_side_effects
+
+
+@shared_task(name=PROCESS_ATTEMPT_SIDE_EFFECTS_TASK, ignore_result=True)
+def process_attempt_side_effects_task(batch_size=100):
+    """
+    Runs the queued side effects of attempt status transitions which are due
+    """
+    process_attempt_side_effects(batch_size=batch_size)
+
+
+@shared_task(name=EXPIRE_EXAM_ATTEMPTS_TASK, ignore_result=True)
+def expire_exam_attempts_task(batch_size=100):
+    """
+    Times out the exam attempts whose time limit has expired, meant to be run periodically
+    """
+    expire_exam_attempts(batch_size=batch_size)
@@ -4,6 +4,8 @@
 """
 All tests for the api.py
 """
+import csv
+import json
 from datetime import datetime, timedelta
 from itertools import product
 from unittest.mock import MagicMock, patch
@@ -14,7 +16,9 @@ from freezegun import freeze_time
 
 from django.conf import settings
 from django.core import mail
-from django.test.utils import override_settings
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
 from django.urls import reverse
 
 from edx_proctoring.api import (
@@ -29,13 +33,18 @@ from edx_proctoring.api import (
     create_exam_attempt,
     create_exam_review_policy,
     does_backend_support_onboarding,
+    expire_exam_attempts,
+    get_active_attempt_heartbeat,
     get_active_exams_for_user,
     get_all_exam_attempts,
     get_all_exams_for_course,
     get_allowances_for_course,
+    get_attempt_status_summaries,
     get_attempt_status_summary,
     get_backend_provider,
     get_current_exam_attempt,
+    get_current_exam_attempts,
+    get_current_exam_attempts_for_users,
     get_enrollments_can_take_proctored_exams,
     get_exam_attempt_by_id,
     get_exam_attempt_data,
@@ -51,6 +60,7 @@ from edx_proctoring.api import (
     get_user_attempts_by_exam_id,
     is_attempt_ready_to_resume,
     is_backend_dashboard_available,
+    iter_exam_violation_report,
     mark_exam_attempt_as_ready,
     mark_exam_attempt_as_ready_to_resume,
     mark_exam_attempt_as_resumed,
@@ -62,12 +72,14 @@ from edx_proctoring.api import (
     start_exam_attempt,
     start_exam_attempt_by_code,
     stop_exam_attempt,
+    stream_exam_violation_report,
     update_attempt_status,
     update_exam,
     update_exam_attempt,
     update_review_policy
 )
 from edx_proctoring.backends.tests.test_backend import TestBackendProvider
+from edx_proctoring.cache import clear_local_caches
 from edx_proctoring.constants import DEFAULT_CONTACT_EMAIL, TIME_MULTIPLIER
 from edx_proctoring.exceptions import (
     AllowanceValueNotAllowedException,
@@ -91,6 +103,7 @@ from edx_proctoring.models import (
     ProctoredExamSoftwareSecureComment,
     ProctoredExamSoftwareSecureReview,
     ProctoredExamStudentAllowance,
+    ProctoredExamStudentAllowanceHistory,
     ProctoredExamStudentAttempt
 )
 from edx_proctoring.runtime import get_runtime_service, set_runtime_service
@@ -857,6 +870,56 @@ class ProctoredExamApiTests(ProctoredExamTestCase):
         self.assertEqual(successes, 0)
         self.assertEqual(failures, 4)
 
+    def test_add_bulk_allowance_updates_existing(self):
+        """
+        Test that bulk allowances update existing allowances and archive their previous values
+        """
+        user_list = self.create_batch_users(3)
+        exam_id = create_exam(
+            course_id=self.course_id,
+            content_id="1st exam",
+            exam_name="1st exam",
+            time_limit_mins=self.default_time_limit,
+            is_practice_exam=False,
+            is_proctored=True
+        )
+        add_allowance_for_user(exam_id, user_list[0].username, self.key, '5')
+
+        # users may be given by username, email or id
+        users = [user_list[0].username, user_list[1].email, user_list[2].id]
+        _, successes, failures = add_bulk_allowances([exam_id], users, self.key, '30')
+        self.assertEqual(successes, 3)
+        self.assertEqual(failures, 0)
+        for user in user_list:
+            allowance = ProctoredExamStudentAllowance.get_allowance_for_user(exam_id, user.id, self.key)
+            self.assertEqual(allowance.value, '30')
+
+        history = ProctoredExamStudentAllowanceHistory.objects.filter(proctored_exam_id=exam_id)
+        self.assertEqual(len(history), 1)
+        self.assertEqual(history[0].user_id, user_list[0].id)
+        self.assertEqual(history[0].value, '5')
+
+    def test_add_bulk_allowance_query_count(self):
+        """
+        Test that the number of queries does not depend on the number of users
+        """
+        exam_id = create_exam(
+            course_id=self.course_id,
+            content_id="1st exam",
+            exam_name="1st exam",
+            time_limit_mins=self.default_time_limit,
+            is_practice_exam=False,
+            is_proctored=True
+        )
+        user_list = self.create_batch_users(10)
+        add_allowance_for_user(exam_id, user_list[0].username, self.key, '5')
+
+        # exam lookup, user lookup, existing allowances, then the archive, update and insert in a savepoint
+        with self.assertNumQueries(8):
+            add_bulk_allowances([exam_id], user_list[:3], self.key, '30')
+        with self.assertNumQueries(8):
+            add_bulk_allowances([exam_id], user_list, self.key, '60')
+
     def test_exam_attempt_with_due_datetime(self):
         """
         Test the exam attempt with due date
@@ -1137,6 +1200,29 @@ class ProctoredExamApiTests(ProctoredExamTestCase):
         self.assertEqual(exam_attempt['user']['id'], self.user_id)
         self.assertEqual(exam_attempt['id'], recent_attempt.id)
 
+    def test_get_current_exam_attempts(self):
+        """
+        Test to get the current attempts of a learner on the exams of a course,
+        and of several learners on an exam
+        """
+        self._create_exam_attempt(self.proctored_exam_id, ProctoredExamStudentAttemptStatus.error)
+        recent_attempt = self._create_unstarted_exam_attempt()
+        timed_attempt = self._create_exam_attempt(self.timed_exam_id)
+        other_user = self.create_batch_users(1)[0]
+
+        attempts = get_current_exam_attempts(self.user_id, self.course_id)
+        self.assertEqual(
+            {exam_id: attempt['id'] for exam_id, attempt in attempts.items()},
+            {self.proctored_exam_id: recent_attempt.id, self.timed_exam_id: timed_attempt.id}
+        )
+        self.assertEqual(
+            attempts[self.proctored_exam_id], get_current_exam_attempt(self.proctored_exam_id, self.user_id)
+        )
+
+        attempts = get_current_exam_attempts_for_users(self.proctored_exam_id, [self.user_id, other_user.id])
+        self.assertEqual(list(attempts), [self.user_id])
+        self.assertEqual(attempts[self.user_id]['id'], recent_attempt.id)
+
     def test_get_user_attempts_by_exam_id(self):
         """
         Test to get all attempts by exam id
@@ -1391,10 +1477,53 @@ class ProctoredExamApiTests(ProctoredExamTestCase):
         )
         add_allowance_for_user(self.proctored_exam_id, self.user.username, self.key, self.value)
         add_allowance_for_user(self.proctored_exam_id, self.user.username, 'new_key', '2')
-        student_active_exams = get_active_exams_for_user(self.user_id, self.course_id)
+        with self.assertNumQueries(2):
+            student_active_exams = get_active_exams_for_user(self.user_id, self.course_id)
         self.assertEqual(len(student_active_exams), 2)
         self.assertEqual(len(student_active_exams[0]['allowances']), 0)
         self.assertEqual(len(student_active_exams[1]['allowances']), 2)
+        self.assertEqual(student_active_exams[1]['allowances'][0]['user']['id'], self.user_id)
+        self.assertEqual(student_active_exams[1]['allowances'][0]['proctored_exam']['id'], self.proctored_exam_id)
+
+    @patch('edx_proctoring.constants.NO_ACTIVE_ATTEMPT_CACHE_TIMEOUT', 30)
+    def test_get_active_exams_for_user_without_active_attempt(self):
+        """
+        Test that users without an active attempt are cached as such until one of their attempts is saved
+        """
+        self.assertEqual(get_active_exams_for_user(self.user_id), [])
+        with self.assertNumQueries(0):
+            self.assertEqual(get_active_exams_for_user(self.user_id), [])
+
+        attempt = self._create_started_exam_attempt()
+        self.assertEqual(len(get_active_exams_for_user(self.user_id)), 1)
+
+        update_attempt_status(attempt.id, ProctoredExamStudentAttemptStatus.submitted)
+        self.assertEqual(get_active_exams_for_user(self.user_id), [])
+        attempt.refresh_from_db()
+        attempt.status = ProctoredExamStudentAttemptStatus.started
+        attempt.save()
+        self.assertEqual(len(get_active_exams_for_user(self.user_id)), 1)
+
+    def test_get_active_attempt_heartbeat(self):
+        """
+        Test the compact summary of the user's active attempt
+        """
+        self.assertIsNone(get_active_attempt_heartbeat(self.user_id))
+
+        started_at = datetime.now(pytz.UTC) - timedelta(minutes=4)
+        attempt = self._create_started_exam_attempt(started_at=started_at)
+        with self.assertNumQueries(1):
+            heartbeat = get_active_attempt_heartbeat(self.user_id)
+
+        self.assertEqual(heartbeat['attempt_id'], attempt.id)
+        self.assertEqual(heartbeat['exam_id'], self.proctored_exam_id)
+        self.assertEqual(heartbeat['course_id'], self.course_id)
+        self.assertEqual(heartbeat['attempt_status'], ProctoredExamStudentAttemptStatus.started)
+        self.assertEqual(heartbeat['expires_at'], started_at + timedelta(minutes=10))
+        self.assertAlmostEqual(heartbeat['time_remaining_seconds'], 360, delta=5)
+        self.assertEqual(heartbeat['low_threshold_sec'], 120)
+        self.assertEqual(heartbeat['critically_low_threshold_sec'], 30)
+        self.assertIsNone(get_active_attempt_heartbeat(self.user_id, course_id='course-v1:other+course+run'))
 
     def test_get_filtered_exam_attempts(self):
         """
@@ -1656,6 +1785,53 @@ class ProctoredExamApiTests(ProctoredExamTestCase):
         self.assertIsNone(get_current_exam_attempt(timed_exam_id, self.user_id))
         self.assertIsNone(get_current_exam_attempt(inactive_exam_id, self.user_id))
 
+    def _decline_with_other_exams(self, user_id, other_exams_count):
+        """
+        Declines an attempt in a course with the given number of other proctored exams,
+        one of which already has a started attempt, and returns the number of queries
+        """
+        course_id = f'a/b/cascade{other_exams_count}'
+        exam_ids = [
+            create_exam(
+                course_id=course_id,
+                content_id=f'exam{index}',
+                exam_name=f'exam {index}',
+                time_limit_mins=self.default_time_limit,
+                is_proctored=True,
+            )
+            for index in range(other_exams_count + 1)
+        ]
+        started_attempt_id = create_exam_attempt(exam_ids[1], user_id)
+        update_attempt_status(started_attempt_id, ProctoredExamStudentAttemptStatus.started)
+        attempt_id = create_exam_attempt(exam_ids[0], user_id)
+
+        with CaptureQueriesContext(connection) as queries:
+            update_attempt_status(attempt_id, ProctoredExamStudentAttemptStatus.declined)
+
+        for exam_id in exam_ids:
+            self.assertEqual(
+                get_current_exam_attempt(exam_id, user_id)['status'],
+                ProctoredExamStudentAttemptStatus.declined
+            )
+        credit_state = get_runtime_service('credit').get_credit_state(user_id, course_id)
+        self.assertEqual(
+            [
+                requirement['status'] for requirement in credit_state['credit_requirement_status']
+                if requirement['course_id'] == course_id
+            ],
+            ['declined'] * len(exam_ids)
+        )
+        return len(queries)
+
+    def test_cascading_queries(self):
+        """
+        Make sure that declining the other exams of a course does not take
+        more queries as the number of exams grows
+        """
+        few_exams_queries = self._decline_with_other_exams(self.user_id, 2)
+        many_exams_queries = self._decline_with_other_exams(self.user_id, 6)
+        self.assertEqual(few_exams_queries, many_exams_queries)
+
     def test_grade_override(self):
         """
         Verify that putting an attempt into the rejected state will override
@@ -2017,6 +2193,82 @@ class ProctoredExamApiTests(ProctoredExamTestCase):
             random_timestamp
         )
 
+    def _create_expired_attempts(self):
+        """
+        Creates an expired started attempt, an expired ready to submit attempt and
+        a started attempt with time left, for three users
+        """
+        users = self.create_batch_users(3)
+        now = datetime.now(pytz.UTC)
+        attempts = [
+            ProctoredExamStudentAttempt.objects.create(
+                proctored_exam_id=self.proctored_exam_id,
+                user=user,
+                attempt_code=f'code{index}',
+                started_at=started_at,
+                status=status,
+                allowed_time_limit_mins=time_limit,
+                taking_as_proctored=True,
+            )
+            for index, (user, started_at, status, time_limit) in enumerate(zip(
+                users,
+                [now - timedelta(minutes=11), now - timedelta(minutes=31), now - timedelta(minutes=11)],
+                [
+                    ProctoredExamStudentAttemptStatus.started,
+                    ProctoredExamStudentAttemptStatus.ready_to_submit,
+                    ProctoredExamStudentAttemptStatus.started,
+                ],
+                [10, 30, 20],
+            ))
+        ]
+        return attempts, now
+
+    def test_expire_exam_attempts(self):
+        """
+        Test that expired attempts are timed out in batches, leaving the other attempts alone
+        """
+        attempts, now = self._create_expired_attempts()
+        self.assertEqual(
+            list(ProctoredExamStudentAttempt.objects.get_expired_attempts(now)),
+            [attempts[1], attempts[0]]
+        )
+
+        with patch('edx_proctoring.api.time.sleep') as mock_sleep:
+            self.assertEqual(expire_exam_attempts(batch_size=1, sleep_time=5), 2)
+        mock_sleep.assert_called_once_with(5)
+
+        for attempt in attempts:
+            attempt.refresh_from_db()
+        self.assertEqual(
+            [attempt.status for attempt in attempts],
+            [
+                ProctoredExamStudentAttemptStatus.submitted,
+                ProctoredExamStudentAttemptStatus.submitted,
+                ProctoredExamStudentAttemptStatus.started,
+            ]
+        )
+        self.assertEqual(attempts[0].completed_at, attempts[0].started_at + timedelta(minutes=10))
+        self.assertEqual(expire_exam_attempts(), 0)
+
+    @patch('edx_proctoring.constants.TIME_OUT_EXPIRED_ATTEMPTS_ON_READ', False)
+    def test_timeout_reported_on_read(self):
+        """
+        Test that reading an expired attempt only reports its timeout when timing out on read is disabled
+        """
+        attempts, _ = self._create_expired_attempts()
+
+        exam_attempt = get_exam_attempt_by_id(attempts[0].id)
+        self.assertEqual(exam_attempt['status'], ProctoredExamStudentAttemptStatus.submitted)
+        self.assertEqual(exam_attempt['completed_at'], attempts[0].started_at + timedelta(minutes=10))
+        attempts[0].refresh_from_db()
+        self.assertEqual(attempts[0].status, ProctoredExamStudentAttemptStatus.started)
+
+        with patch.dict('django.conf.settings.PROCTORING_SETTINGS', {'ALLOW_TIMED_OUT_STATE': True}):
+            exam_attempt = get_exam_attempt_by_id(attempts[0].id)
+        self.assertEqual(exam_attempt['status'], ProctoredExamStudentAttemptStatus.timed_out)
+
+        self.assertEqual(get_exam_attempt_by_id(attempts[2].id)['status'], ProctoredExamStudentAttemptStatus.started)
+
     def test_update_unexisting_attempt(self):
         """
         Tests updating an non-existing attempt
@@ -2403,6 +2655,49 @@ class ProctoredExamApiTests(ProctoredExamTestCase):
 
         self.assertIsNone(summary)
 
+    def test_attempt_status_summaries(self):
+        """
+        Make sure the summaries of several exams are the same as the summary of each exam,
+        and are loaded with the same number of queries whatever the number of exams
+        """
+        set_runtime_service('grades', MockGradesService())
+        exam_attempt = self._create_exam_attempt(self.proctored_exam_id)
+        update_attempt_status(exam_attempt.id, ProctoredExamStudentAttemptStatus.submitted)
+        self._create_exam_attempt(self.practice_exam_id, is_practice_exam=True)
+
+        exam_ids = [self.proctored_exam_id, self.timed_exam_id, self.practice_exam_id, self.onboarding_exam_id]
+        content_ids = [get_exam_by_id(exam_id)['content_id'] for exam_id in exam_ids] + ['foo']
+        expected = {
+            content_id: get_attempt_status_summary(self.user.id, self.course_id, content_id)
+            for content_id in content_ids
+        }
+        self.assertIsNone(expected['foo'])
+        self.assertEqual(expected[content_ids[0]]['status'], ProctoredExamStudentAttemptStatus.submitted)
+
+        cache.clear()
+        clear_local_caches()
+        with CaptureQueriesContext(connection) as one_exam_queries:
+            get_attempt_status_summaries(self.user.id, self.course_id, content_ids[:1])
+        cache.clear()
+        clear_local_caches()
+        with CaptureQueriesContext(connection) as all_exams_queries:
+            summaries = get_attempt_status_summaries(self.user.id, self.course_id, content_ids)
+        self.assertEqual(summaries, expected)
+        self.assertEqual(len(one_exam_queries), len(all_exams_queries))
+
+    def test_attempt_status_summaries_no_perm(self):
+        """
+        The summaries of proctored exams should be None for users who don't have permission,
+        while practice exams are still summarized
+        """
+        practice_content_id = get_exam_by_id(self.practice_exam_id)['content_id']
+        with mock_perm('edx_proctoring.can_take_proctored_exam'):
+            summaries = get_attempt_status_summaries(
+                self.user.id, self.course_id, [self.content_id, practice_content_id]
+            )
+        self.assertIsNone(summaries[self.content_id])
+        self.assertEqual(summaries[practice_content_id]['status'], ProctoredExamStudentAttemptStatus.eligible)
+
     def test_update_exam_attempt(self):
         """
         Make sure we restrict which fields we can update
@@ -2841,6 +3136,77 @@ class ProctoredExamApiTests(ProctoredExamTestCase):
 
         self.assertIsNone(report[0]['review_status'])
 
+    def _create_violation_report_attempts(self):
+        """
+        Creates attempts on two exams, one of them reviewed with comments
+        """
+        reviewed_exam_id = create_exam(
+            course_id=self.course_id,
+            content_id='test_content_1',
+            exam_name='BBBBBB',
+            time_limit_mins=self.default_time_limit
+        )
+        other_exam_id = create_exam(
+            course_id=self.course_id,
+            content_id='test_content_2',
+            exam_name='AAAAAA',
+            time_limit_mins=self.default_time_limit
+        )
+        attempt = ProctoredExamStudentAttempt.objects.get_exam_attempt_by_id(
+            create_exam_attempt(exam_id=reviewed_exam_id, user_id=self.user_id)
+        )
+        create_exam_attempt(exam_id=other_exam_id, user_id=self.user_id)
+        create_exam_attempt(exam_id=other_exam_id, user_id=self.create_batch_users(1)[0].id)
+        review = ProctoredExamSoftwareSecureReview.objects.create(
+            exam=ProctoredExam.get_exam_by_id(reviewed_exam_id),
+            attempt_code=attempt.attempt_code,
+            review_status='Suspicious'
+        )
+        for status, comment in (('Suspicious', 'foo'), ('Suspicious', 'bar'), ('Rules Violation', 'baz')):
+            ProctoredExamSoftwareSecureComment.objects.create(
+                review=review, status=status, comment=comment, start_time=0, stop_time=1, duration=1
+            )
+        return attempt
+
+    def test_iter_exam_violation_report(self):
+        """
+        Test that the report rows are the same whatever the size of the chunks they are read in
+        """
+        self._create_violation_report_attempts()
+        report = get_exam_violation_report(self.course_id)
+        self.assertEqual([row['exam_name'] for row in report], ['AAAAAA', 'AAAAAA', 'BBBBBB'])
+        self.assertEqual(report[2]['Suspicious Comments'], ['foo', 'bar'])
+        self.assertEqual(list(iter_exam_violation_report(self.course_id, chunk_size=1)), report)
+
+    def test_stream_exam_violation_report_csv(self):
+        """
+        Test the CSV export of the exam violation report
+        """
+        attempt = self._create_violation_report_attempts()
+        lines = list(stream_exam_violation_report(self.course_id))
+        rows = list(csv.DictReader(lines))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[2]['attempt_code'], attempt.attempt_code)
+        self.assertEqual(rows[2]['review_status'], 'Suspicious')
+        self.assertEqual(rows[2]['Suspicious Comments'], 'foo; bar')
+        self.assertEqual(rows[2]['Rules Violation Comments'], 'baz')
+        self.assertEqual(rows[0]['Suspicious Comments'], '')
+        self.assertEqual(rows[0]['review_status'], '')
+
+    def test_stream_exam_violation_report_jsonl(self):
+        """
+        Test the JSON lines export of the exam violation report
+        """
+        self._create_violation_report_attempts()
+        rows = [json.loads(line) for line in stream_exam_violation_report(self.course_id, output_format='jsonl')]
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[2]['Suspicious Comments'], ['foo', 'bar'])
+        # attempts on the same exam are listed from the most recent one
+        self.assertEqual(rows[0]['username'], 'student0')
+
+        with self.assertRaises(ValueError):
+            list(stream_exam_violation_report(self.course_id, output_format='xml'))
+
     def test_get_exam_violation_report_with_deleted_exam_attempt(self):
         """
         Tests that get_exam_violation_report does not fail in scenerio
@@ -3518,6 +3884,21 @@ class LastVerifiedOnboardingAttemptsTests(ProctoredExamTestCase):
         self._assert_verified_attempts(all_users[0:5], attempts_dict)
         self._assert_verified_attempts(third_course_verified, attempts_dict)
 
+    def test_single_query(self):
+        all_users = self.create_batch_users(5)
+        self._setup_onboarding_attempts(
+            self.other_onboarding_exam_id,
+            all_users,
+            ProctoredExamStudentAttemptStatus.verified,
+        )
+
+        with self.assertNumQueries(1):
+            attempts_dict = get_last_verified_onboarding_attempts_per_user(
+                all_users,
+                'test',
+            )
+            self._assert_verified_attempts(all_users, attempts_dict)
+
 
 @ddt.ddt
 class GetExamAttemptDataTests(ProctoredExamTestCase):
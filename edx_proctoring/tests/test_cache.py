@@ -0,0 +1,144 @@
+"""
+Tests for cache.py
+"""
+from unittest.mock import Mock, patch
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from edx_proctoring.api import get_exam_by_content_id, get_exam_by_id, update_exam
+from edx_proctoring.cache import LocalLRUCache, get_cached_onboarding_profiles
+from edx_proctoring.models import ProctoredExam
+
+from .test_utils.utils import ProctoredExamTestCase
+
+
+class LocalLRUCacheTests(TestCase):
+    """
+    Tests for the in-process LRU cache
+    """
+
+    def test_get_and_set(self):
+        local_cache = LocalLRUCache(maxsize=2, timeout=60)
+        self.assertIsNone(local_cache.get('foo'))
+        self.assertEqual(local_cache.get('foo', 'default'), 'default')
+        local_cache.set('foo', 'bar')
+        self.assertEqual(local_cache.get('foo'), 'bar')
+        local_cache.delete('foo')
+        self.assertIsNone(local_cache.get('foo'))
+
+    def test_evicts_least_recently_used(self):
+        local_cache = LocalLRUCache(maxsize=2, timeout=60)
+        local_cache.set('a', 1)
+        local_cache.set('b', 2)
+        # touch 'a' so that 'b' becomes the least recently used entry
+        local_cache.get('a')
+        local_cache.set('c', 3)
+        self.assertEqual(len(local_cache), 2)
+        self.assertEqual(local_cache.get('a'), 1)
+        self.assertIsNone(local_cache.get('b'))
+        self.assertEqual(local_cache.get('c'), 3)
+
+    @patch('edx_proctoring.cache.time.monotonic')
+    def test_expiry(self, mock_monotonic):
+        mock_monotonic.return_value = 100
+        local_cache = LocalLRUCache(maxsize=2, timeout=10)
+        local_cache.set('foo', 'bar')
+        mock_monotonic.return_value = 109
+        self.assertEqual(local_cache.get('foo'), 'bar')
+        mock_monotonic.return_value = 110
+        self.assertIsNone(local_cache.get('foo'))
+        self.assertEqual(len(local_cache), 0)
+
+    def test_disabled(self):
+        local_cache = LocalLRUCache(maxsize=2, timeout=0)
+        local_cache.set('foo', 'bar')
+        self.assertIsNone(local_cache.get('foo'))
+
+
+class ExamCacheTests(ProctoredExamTestCase):
+    """
+    Tests for caching of exam lookups in the api
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.exam = ProctoredExam.objects.create(
+            course_id=self.course_id, content_id=self.content_id, exam_name=self.exam_name,
+            time_limit_mins=self.default_time_limit, external_id=self.external_id,
+        )
+
+    def test_get_exam_by_id_is_cached(self):
+        exam = get_exam_by_id(self.exam.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_exam_by_id(self.exam.id), exam)
+            # the same entry also answers lookups by content id
+            self.assertEqual(get_exam_by_content_id(self.course_id, self.content_id), exam)
+
+    def test_get_exam_by_content_id_is_cached(self):
+        exam = get_exam_by_content_id(self.course_id, self.content_id)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_exam_by_content_id(self.course_id, self.content_id), exam)
+            self.assertEqual(get_exam_by_id(self.exam.id), exam)
+
+    def test_cached_exam_is_a_copy(self):
+        get_exam_by_id(self.exam.id)
+        exam = get_exam_by_id(self.exam.id)
+        exam['exam_name'] = 'Changed by a caller'
+        exam['attempt'] = {}
+        cached_exam = get_exam_by_id(self.exam.id)
+        self.assertEqual(cached_exam['exam_name'], self.exam_name)
+        self.assertNotIn('attempt', cached_exam)
+
+    def test_update_exam_invalidates(self):
+        get_exam_by_id(self.exam.id)
+        update_exam(self.exam.id, exam_name='Updated Exam')
+        self.assertEqual(get_exam_by_id(self.exam.id)['exam_name'], 'Updated Exam')
+        self.assertEqual(get_exam_by_content_id(self.course_id, self.content_id)['exam_name'], 'Updated Exam')
+
+    def test_model_save_invalidates(self):
+        get_exam_by_content_id(self.course_id, self.content_id)
+        self.exam.time_limit_mins = 45
+        self.exam.save()
+        self.assertEqual(get_exam_by_id(self.exam.id)['time_limit_mins'], 45)
+        self.assertEqual(get_exam_by_content_id(self.course_id, self.content_id)['time_limit_mins'], 45)
+
+    @patch('edx_proctoring.constants.EXAM_CACHE_TIMEOUT', 0)
+    def test_cache_disabled(self):
+        get_exam_by_id(self.exam.id)
+        with self.assertNumQueries(1):
+            get_exam_by_id(self.exam.id)
+
+
+class OnboardingProfileCacheTests(TestCase):
+    """
+    Tests for the cache of the onboarding profiles returned by backends
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.fetch = Mock(return_value=[{'user_id': 'abc', 'status': 'approved-in-course'}])
+
+    def test_cached_per_course_and_params(self):
+        for _ in range(2):
+            profiles = get_cached_onboarding_profiles('test', 'a/b/c', {'status': ''}, self.fetch)
+        self.assertEqual(profiles, self.fetch.return_value)
+        self.assertEqual(self.fetch.call_count, 1)
+
+        get_cached_onboarding_profiles('test', 'a/b/c', {'user_id': 'abc'}, self.fetch)
+        get_cached_onboarding_profiles('test', 'd/e/f', {'status': ''}, self.fetch)
+        get_cached_onboarding_profiles('other', 'a/b/c', {'status': ''}, self.fetch)
+        self.assertEqual(self.fetch.call_count, 4)
+
+    def test_none_not_cached(self):
+        self.fetch.return_value = None
+        for _ in range(2):
+            self.assertIsNone(get_cached_onboarding_profiles('test', 'a/b/c', {}, self.fetch))
+        self.assertEqual(self.fetch.call_count, 2)
+
+    @patch('edx_proctoring.constants.ONBOARDING_PROFILE_CACHE_TIMEOUT', 0)
+    def test_cache_disabled(self):
+        for _ in range(2):
+            get_cached_onboarding_profiles('test', 'a/b/c', {}, self.fetch)
+        self.assertEqual(self.fetch.call_count, 2)
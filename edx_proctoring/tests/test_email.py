@@ -95,7 +95,7 @@ class ProctoredExamEmailTests(ProctoredExamTestCase):
     @patch('logging.Logger.exception')
     def test_send_email_failure(self, logger_mock):
         """
-        If an email fails to send an error is logged and the attempt is updated
+        If an email fails to send an exception is logged once and the attempt is updated
         """
         exam_attempt = self._create_started_exam_attempt()
         exc_obj = Exception('foo')
@@ -107,13 +107,14 @@ class ProctoredExamEmailTests(ProctoredExamTestCase):
 
         exam_attempt.refresh_from_db()
         self.assertEqual(exam_attempt.status, 'submitted')
-        logger_mock.assert_any_call(
-            ('Exception occurred while trying to send proctoring attempt '
-             'status email for user_id=%(user_id)s in course_id=%(course_id)s -- %(err)s'),
+        logger_mock.assert_called_once_with(
+            ('Attempt side effect type=%(effect_type)s for attempt_id=%(attempt_id)s of '
+             'user_id=%(user_id)s in course_id=%(course_id)s failed'),
             {
+                'effect_type': 'attempt_status_email',
+                'attempt_id': exam_attempt.id,
                 'user_id': self.user_id,
                 'course_id': self.course_id,
-                'err': exc_obj,
             }
         )
 
@@ -0,0 +1,154 @@
+"""
+Tests for the instrumentation of the hot paths
+"""
+from unittest.mock import call, patch
+
+import requests
+import responses
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from edx_proctoring import instrumentation
+from edx_proctoring.api import get_student_view, update_attempt_status
+from edx_proctoring.backends.tests.test_backend import TestBackendProvider
+from edx_proctoring.statuses import ProctoredExamStudentAttemptStatus
+
+from .test_utils.utils import ProctoredExamTestCase
+
+User = get_user_model()
+
+RECORDING_REPORTER = 'edx_proctoring.tests.test_instrumentation.RecordingSpanReporter'
+
+
+class RecordingSpanReporter(instrumentation.SpanReporter):
+    """
+    Span reporter recording the spans it is handed
+    """
+    spans = []
+
+    def report(self, name, duration, query_count):
+        self.spans.append((name, duration, query_count))
+
+    @classmethod
+    def names(cls):
+        return [name for name, _, _ in cls.spans]
+
+
+class FailingSpanReporter(instrumentation.SpanReporter):
+    """
+    Span reporter failing to report spans
+    """
+
+    def report(self, name, duration, query_count):
+        raise Exception('down')  # pylint: disable=broad-exception-raised
+
+
+@patch('edx_proctoring.constants.INSTRUMENTATION_SPAN_REPORTERS', [RECORDING_REPORTER])
+class SpanTests(TestCase):
+    """
+    Tests for measuring and reporting spans
+    """
+
+    def setUp(self):
+        super().setUp()
+        RecordingSpanReporter.spans = []
+
+    def test_no_reporters(self):
+        with patch('edx_proctoring.constants.INSTRUMENTATION_SPAN_REPORTERS', []):
+            self.assertEqual(instrumentation.get_span_reporters(), ())
+            with instrumentation.span('phase'):
+                User.objects.count()
+        self.assertEqual(RecordingSpanReporter.spans, [])
+
+    def test_nested_spans(self):
+        with instrumentation.span('outer'):
+            User.objects.count()
+            with instrumentation.span('inner'):
+                User.objects.count()
+                User.objects.count()
+
+        self.assertEqual(RecordingSpanReporter.names(), ['edx_proctoring.inner', 'edx_proctoring.outer'])
+        inner, outer = RecordingSpanReporter.spans[0], RecordingSpanReporter.spans[1]
+        self.assertEqual((inner[2], outer[2]), (2, 3))
+        self.assertLessEqual(inner[1], outer[1])
+
+    def test_reported_on_error(self):
+        with self.assertRaises(ValueError):
+            with instrumentation.span('phase'):
+                raise ValueError()
+        self.assertEqual(RecordingSpanReporter.names(), ['edx_proctoring.phase'])
+
+    def test_failing_reporter(self):
+        failing_reporter = 'edx_proctoring.tests.test_instrumentation.FailingSpanReporter'
+        with patch('edx_proctoring.constants.INSTRUMENTATION_SPAN_REPORTERS', [failing_reporter, RECORDING_REPORTER]):
+            with patch.object(instrumentation.log, 'exception') as mock_log:
+                with instrumentation.span('phase'):
+                    pass
+        mock_log.assert_called_once()
+        self.assertEqual(RecordingSpanReporter.names(), ['edx_proctoring.phase'])
+
+    def test_instrumented(self):
+        @instrumentation.instrumented('phase')
+        def phase():
+            return User.objects.count()
+
+        self.assertEqual(phase(), 0)
+        self.assertEqual(RecordingSpanReporter.spans[0][0], 'edx_proctoring.phase')
+        self.assertEqual(RecordingSpanReporter.spans[0][2], 1)
+
+    @patch('edx_proctoring.instrumentation.accumulate')
+    @patch('edx_proctoring.instrumentation.function_trace')
+    def test_monitoring_reporter(self, mock_trace, mock_accumulate):
+        monitoring_reporter = 'edx_proctoring.instrumentation.MonitoringSpanReporter'
+        with patch('edx_proctoring.constants.INSTRUMENTATION_SPAN_REPORTERS', [monitoring_reporter]):
+            with instrumentation.span('phase'):
+                User.objects.count()
+        mock_trace.assert_called_once_with('edx_proctoring.phase')
+        self.assertEqual(mock_accumulate.call_args_list[0][0][0], 'edx_proctoring.phase.duration_ms')
+        self.assertEqual(mock_accumulate.call_args_list[1], call('edx_proctoring.phase.queries', 1))
+
+    @responses.activate
+    def test_backend_requests(self):
+        responses.add(responses.GET, 'https://proctoring.example.com/api/', json={})
+        session = TestBackendProvider().configure_http_session(requests.Session())
+        session.get('https://proctoring.example.com/api/')
+        self.assertEqual(RecordingSpanReporter.names(), ['edx_proctoring.backend.http.get'])
+
+
+@patch('edx_proctoring.constants.INSTRUMENTATION_SPAN_REPORTERS', [RECORDING_REPORTER])
+class InstrumentedApiTests(ProctoredExamTestCase):
+    """
+    Tests for the spans of the API functions
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.proctored_exam_id = self._create_proctored_exam()
+        RecordingSpanReporter.spans = []
+
+    def test_update_attempt_status(self):
+        attempt = self._create_started_exam_attempt()
+        update_attempt_status(attempt.id, ProctoredExamStudentAttemptStatus.submitted)
+
+        names = RecordingSpanReporter.names()
+        self.assertEqual(names[-1], 'edx_proctoring.update_attempt_status')
+        for phase in ('update_attempt_status.save', 'side_effect.credit_requirement_status',
+                      'side_effect.attempt_status_email', 'update_attempt_status.emit_event'):
+            self.assertIn(f'edx_proctoring.{phase}', names)
+
+    def test_get_student_view(self):
+        get_student_view(
+            user_id=self.user_id,
+            course_id=self.course_id,
+            content_id=self.content_id,
+            context={
+                'is_proctored': True,
+                'display_name': self.exam_name,
+                'default_time_limit_mins': 90,
+            },
+        )
+        self.assertEqual(
+            RecordingSpanReporter.names(),
+            ['edx_proctoring.get_student_view.get_proctored_exam_view', 'edx_proctoring.get_student_view']
+        )
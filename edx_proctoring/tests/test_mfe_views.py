@@ -11,7 +11,8 @@ from opaque_keys.edx.locator import BlockUsageLocator
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.test.utils import override_settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
 from django.urls import reverse
 from django.utils import timezone
 
@@ -470,6 +471,116 @@ class ProctoredExamActiveAttemptsMFEViewTests(ProctoredExamTestCase):
         self.assertEqual(response.status_code, 403)
 
 
+class ProctoredExamActiveAttemptHeartbeatViewTests(ProctoredExamTestCase):
+    """
+    Tests for the ProctoredExamActiveAttemptHeartbeatView.
+    """
+    def setUp(self):
+        """
+        Initialize
+        """
+        super().setUp()
+        self.proctored_exam_id = self._create_proctored_exam()
+        self.url = reverse('edx_proctoring:proctored_exam.active_attempt.heartbeat')
+
+    def test_get_started_attempt(self):
+        """
+        Tests the heartbeat for a user with a started attempt.
+        """
+        started_attempt = self._create_started_exam_attempt(is_proctored=True)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        response_data = json.loads(response.content.decode('utf-8'))
+
+        self.assertEqual(response_data['attempt_id'], started_attempt.id)
+        self.assertEqual(response_data['exam_id'], self.proctored_exam_id)
+        self.assertEqual(response_data['course_id'], self.course_id)
+        self.assertEqual(response_data['attempt_status'], ProctoredExamStudentAttemptStatus.started)
+        self.assertGreater(response_data['time_remaining_seconds'], 0)
+        self.assertLessEqual(response_data['time_remaining_seconds'], 600)
+        self.assertEqual(response_data['low_threshold_sec'], 120)
+        self.assertEqual(response_data['critically_low_threshold_sec'], 30)
+        self.assertIn('ETag', response)
+
+    def test_get_no_started_attempts(self):
+        """
+        Tests the heartbeat for a user with no started attempts.
+        """
+        self._create_exam_attempt(
+            self.proctored_exam_id,
+            ProctoredExamStudentAttemptStatus.submitted,
+        )
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content.decode('utf-8')), {})
+
+    def test_not_modified(self):
+        """
+        Tests that a poll with a matching ETag gets an empty 304 response
+        until the attempt changes.
+        """
+        started_attempt = self._create_started_exam_attempt(is_proctored=True)
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+        started_attempt.status = ProctoredExamStudentAttemptStatus.ready_to_submit
+        started_attempt.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        response_data = json.loads(response.content.decode('utf-8'))
+        self.assertEqual(response_data['attempt_status'], ProctoredExamStudentAttemptStatus.ready_to_submit)
+
+    def test_single_query(self):
+        """
+        Tests that the heartbeat reads the attempt with a single query.
+        """
+        self._create_started_exam_attempt(is_proctored=True)
+        # warm up anything loaded on the first request, such as the user session
+        self.client.get(self.url)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url)
+        attempt_queries = [
+            query for query in queries.captured_queries
+            if 'proctoring_proctoredexamstudentattempt' in query['sql']
+        ]
+        self.assertEqual(len(attempt_queries), 1)
+
+    def test_staff_get_user_attempt(self):
+        """
+        Test staff can get any user's heartbeat.
+        """
+        started_attempt = self._create_started_exam_attempt(is_proctored=True)
+
+        admin_user = User(username='test_staff', email='staff@test.com', is_staff=True)
+        admin_user.save()
+        self.client.login_user(admin_user)
+        response = self.client.get(self.url + f'?user_id={self.user.id}')
+        response_data = json.loads(response.content.decode('utf-8'))
+
+        self.assertEqual(response_data['attempt_id'], started_attempt.id)
+
+    def test_non_staff_cannot_get_user_attempt(self):
+        """
+        Test non staff cannot get another user's heartbeat.
+        """
+        self._create_started_exam_attempt(is_proctored=True)
+
+        other_user = User(username='nefarious_bob', email='tester_bob@test.com')
+        other_user.save()
+        self.client.login_user(other_user)
+        response = self.client.get(self.url + f'?user_id={self.user.id}')
+        self.assertEqual(response.status_code, 403)
+
+
 class ProctoredSettingsViewTests(ProctoredExamTestCase):
     """
     Tests for the ProctoredSettingsView.
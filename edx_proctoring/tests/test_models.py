@@ -3,15 +3,28 @@
 All tests for the models.py
 """
 
+from datetime import datetime, timedelta
+from importlib import import_module
+
+import pytz
+from freezegun import freeze_time
+
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
+from edx_proctoring.constants import VERIFICATION_DAYS_VALID
 from edx_proctoring.models import (
+    OnboardingVerification,
     ProctoredExam,
     ProctoredExamReviewPolicy,
     ProctoredExamReviewPolicyHistory,
     ProctoredExamStudentAllowance,
     ProctoredExamStudentAllowanceHistory,
-    ProctoredExamStudentAttempt
+    ProctoredExamStudentAttempt,
+    archive_models,
+    current_exam_attempts_scope,
+    forget_current_exam_attempts
 )
 from edx_proctoring.statuses import ProctoredExamStudentAttemptStatus
 
@@ -481,3 +494,382 @@ class ProctoredExamStudentAttemptTests(LoggedInTestCase):
         # pylint: disable=no-member
         attempt_history = ProctoredExamStudentAttempt.history.filter(**filter_query)
         self.assertEqual(len(attempt_history), 3)
+
+
+class FieldTrackingMixinTests(LoggedInTestCase):
+    """
+    Tests for tracking the stored values of model instances
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.proctored_exam = ProctoredExam.objects.create(
+            course_id='test_course',
+            content_id='test_content',
+            exam_name='Test Exam',
+            external_id='123aXqe3',
+            time_limit_mins=90
+        )
+        ProctoredExamStudentAttempt.objects.create(
+            proctored_exam=self.proctored_exam,
+            user=self.user,
+            allowed_time_limit_mins=10,
+            attempt_code='123456',
+            status=ProctoredExamStudentAttemptStatus.created,
+        )
+
+    def _get_attempt(self):
+        return ProctoredExamStudentAttempt.objects.get(attempt_code='123456')
+
+    def test_get_original(self):
+        attempt = self._get_attempt()
+        attempt.status = ProctoredExamStudentAttemptStatus.started
+        with self.assertNumQueries(0):
+            original = attempt.get_original()
+        self.assertEqual(original.status, ProctoredExamStudentAttemptStatus.created)
+        self.assertEqual(original.pk, attempt.pk)
+        self.assertFalse(original._state.adding)  # pylint: disable=protected-access
+
+        attempt.save()
+        self.assertEqual(attempt.get_original().status, ProctoredExamStudentAttemptStatus.started)
+
+        ProctoredExamStudentAttempt.objects.filter(id=attempt.id).update(
+            status=ProctoredExamStudentAttemptStatus.ready_to_submit
+        )
+        attempt.refresh_from_db(fields=['status'])
+        self.assertEqual(attempt.get_original().status, ProctoredExamStudentAttemptStatus.ready_to_submit)
+
+    def test_get_original_with_deferred_fields(self):
+        attempt = ProctoredExamStudentAttempt.objects.only('id', 'status').get(attempt_code='123456')
+        attempt.status = ProctoredExamStudentAttemptStatus.started
+        with self.assertNumQueries(1):
+            original = attempt.get_original()
+        self.assertEqual(original.status, ProctoredExamStudentAttemptStatus.created)
+
+    def test_status_change_does_not_read_attempt_again(self):
+        attempt = self._get_attempt()
+        attempt.status = ProctoredExamStudentAttemptStatus.started
+        with CaptureQueriesContext(connection) as queries:
+            attempt.save()
+        self.assertFalse([
+            query for query in queries
+            if query['sql'].startswith('SELECT') and 'FROM "proctoring_proctoredexamstudentattempt"' in query['sql']
+        ])
+        # the previous status is archived all the same
+        history = ProctoredExamStudentAttempt.history.filter(id=attempt.id)  # pylint: disable=no-member
+        self.assertEqual(
+            list(history.order_by('history_id').values_list('status', flat=True)),
+            [ProctoredExamStudentAttemptStatus.created, ProctoredExamStudentAttemptStatus.started]
+        )
+
+    def test_allowance_change_archives_stored_value(self):
+        allowance = ProctoredExamStudentAllowance.objects.create(
+            user=self.user, proctored_exam=self.proctored_exam, key='additional_time_granted', value='10'
+        )
+        allowance.value = '20'
+        allowance.save()
+        allowance.value = '30'
+        allowance.save()
+        self.assertEqual(
+            list(ProctoredExamStudentAllowanceHistory.objects.order_by('id').values_list('value', flat=True)),
+            ['10', '20']
+        )
+
+
+class ArchiveModelsTests(LoggedInTestCase):
+    """
+    Tests for archiving model instances to their history tables in bulk
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.proctored_exam = ProctoredExam.objects.create(
+            course_id='test_course',
+            content_id='test_content',
+            exam_name='Test Exam',
+            external_id='123aXqe3',
+            time_limit_mins=90
+        )
+        self.users = [User.objects.create(username=f'student{i}', email=f'student{i}@test.com') for i in range(3)]
+        for user in self.users:
+            ProctoredExamStudentAllowance.objects.create(
+                user=user, proctored_exam=self.proctored_exam, key='additional_time_granted', value='10'
+            )
+
+    def _history(self):
+        return list(
+            ProctoredExamStudentAllowanceHistory.objects.order_by('user_id').values_list(
+                'allowance_id', 'user_id', 'value'
+            )
+        )
+
+    def _get_statements(self, queries):
+        """
+        Returns the first word of the statements run, leaving out savepoints
+        """
+        return [query['sql'].split()[0] for query in queries if 'SAVEPOINT' not in query['sql']]
+
+    def test_multi_row_update(self):
+        allowances = ProctoredExamStudentAllowance.objects.filter(proctored_exam=self.proctored_exam)
+        with CaptureQueriesContext(connection) as queries:
+            updated = allowances.update(value='20')
+        self.assertEqual(updated, 3)
+        # the updated rows are archived with a single read and a single insert
+        self.assertEqual(self._get_statements(queries), ['SELECT', 'UPDATE', 'SELECT', 'INSERT'])
+        self.assertEqual(self._history(), [
+            (allowance.id, allowance.user_id, '20') for allowance in allowances.order_by('user_id')
+        ])
+
+    def test_update_without_rows(self):
+        with CaptureQueriesContext(connection) as queries:
+            updated = ProctoredExamStudentAllowance.objects.filter(user_id=0).update(value='20')
+        self.assertEqual(updated, 0)
+        self.assertEqual(self._get_statements(queries), ['SELECT'])
+        self.assertEqual(self._history(), [])
+
+    def test_archive_models(self):
+        allowances = ProctoredExamStudentAllowance.objects.filter(proctored_exam=self.proctored_exam)
+        expected = [(allowance.id, allowance.user_id, '10') for allowance in allowances.order_by('user_id')]
+
+        with self.assertNumQueries(2):
+            archive_models(ProctoredExamStudentAllowanceHistory, allowances, id='allowance_id')
+        self.assertEqual(self._history(), expected)
+
+        ProctoredExamStudentAllowanceHistory.objects.all().delete()
+        instances = list(allowances)
+        with self.assertNumQueries(1):
+            archive_models(ProctoredExamStudentAllowanceHistory, instances, id='allowance_id')
+        self.assertEqual(self._history(), expected)
+
+
+class CurrentExamAttemptsTests(LoggedInTestCase):
+    """
+    Tests for loading the current attempts of learners on exams
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.exams = [
+            ProctoredExam.objects.create(
+                course_id='test_course',
+                content_id=f'test_content{index}',
+                exam_name=f'Test Exam {index}',
+                external_id=f'123aXqe{index}',
+                time_limit_mins=90
+            )
+            for index in range(3)
+        ]
+        self.other_user = User.objects.create(username='student1', email='student1@test.com')
+        self.old_attempt = self._create_attempt(self.exams[0], self.user)
+        self.attempt = self._create_attempt(self.exams[0], self.user)
+        self.other_attempt = self._create_attempt(self.exams[1], self.user)
+        self.other_user_attempt = self._create_attempt(self.exams[0], self.other_user)
+
+    def _create_attempt(self, exam, user):
+        return ProctoredExamStudentAttempt.objects.create(
+            proctored_exam=exam,
+            user=user,
+            attempt_code=f'{exam.id}-{user.id}-{ProctoredExamStudentAttempt.objects.count()}',
+            external_id='123aXqe3',
+        )
+
+    def test_current_attempts_for_user(self):
+        with self.assertNumQueries(1):
+            attempts = ProctoredExamStudentAttempt.objects.get_current_exam_attempts_for_user(
+                self.user.id, course_id='test_course'
+            )
+        self.assertEqual(attempts, {self.exams[0].id: self.attempt, self.exams[1].id: self.other_attempt})
+
+        attempts = ProctoredExamStudentAttempt.objects.get_current_exam_attempts_for_user(
+            self.user.id, exam_ids=[self.exams[1].id, self.exams[2].id]
+        )
+        self.assertEqual(attempts, {self.exams[1].id: self.other_attempt})
+
+    def test_current_attempts_for_users(self):
+        with self.assertNumQueries(1):
+            attempts = ProctoredExamStudentAttempt.objects.get_current_exam_attempts_for_users(
+                self.exams[0].id, [self.user.id, self.other_user.id]
+            )
+        self.assertEqual(attempts, {self.user.id: self.attempt, self.other_user.id: self.other_user_attempt})
+
+    def test_identity_map(self):
+        manager = ProctoredExamStudentAttempt.objects
+        with current_exam_attempts_scope():
+            manager.get_current_exam_attempts_for_user(self.user.id, exam_ids=[exam.id for exam in self.exams])
+            with self.assertNumQueries(0):
+                self.assertIs(manager.get_current_exam_attempt(self.exams[0].id, self.user.id).id, self.attempt.id)
+                self.assertIsNone(manager.get_current_exam_attempt(self.exams[2].id, self.user.id))
+
+            # attempts looked up one at a time are remembered as well
+            with self.assertNumQueries(1):
+                manager.get_current_exam_attempt(self.exams[0].id, self.other_user.id)
+                manager.get_current_exam_attempt(self.exams[0].id, self.other_user.id)
+
+            # a new attempt becomes the current one
+            new_attempt = self._create_attempt(self.exams[2], self.user)
+            self.assertEqual(manager.get_current_exam_attempt(self.exams[2].id, self.user.id), new_attempt)
+
+            forget_current_exam_attempts()
+            with self.assertNumQueries(1):
+                manager.get_current_exam_attempt(self.exams[0].id, self.user.id)
+
+        # outside of a scope, attempts are always read from the database
+        with self.assertNumQueries(2):
+            manager.get_current_exam_attempt(self.exams[0].id, self.user.id)
+            manager.get_current_exam_attempt(self.exams[0].id, self.user.id)
+
+
+class OnboardingVerificationTests(LoggedInTestCase):
+    """
+    Tests that the onboarding verifications follow the verified onboarding attempts of learners
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.onboarding_exams = [
+            ProctoredExam.objects.create(
+                course_id=f'test_course{index}',
+                content_id='test_onboarding',
+                exam_name='Test Onboarding Exam',
+                external_id=f'123aXqe{index}',
+                time_limit_mins=90,
+                is_practice_exam=True,
+                backend='test',
+            )
+            for index in range(2)
+        ]
+
+    def _create_attempt(self, exam, status=ProctoredExamStudentAttemptStatus.created, taking_as_proctored=True):
+        return ProctoredExamStudentAttempt.objects.create(
+            proctored_exam=exam,
+            user=self.user,
+            attempt_code=f'{exam.id}-{ProctoredExamStudentAttempt.objects.count()}',
+            taking_as_proctored=taking_as_proctored,
+            status=status,
+        )
+
+    def _get_verified_attempt(self):
+        verification = OnboardingVerification.objects.get_unexpired_verifications([self.user], 'test').first()
+        return verification.verified_attempt if verification else None
+
+    def test_verified_attempt(self):
+        attempt = self._create_attempt(self.onboarding_exams[0])
+        self.assertIsNone(self._get_verified_attempt())
+
+        attempt.status = ProctoredExamStudentAttemptStatus.verified
+        attempt.save()
+        verification = OnboardingVerification.objects.get(user=self.user, backend='test')
+        self.assertEqual(verification.verified_attempt, attempt)
+        self.assertEqual(verification.verified_at, attempt.modified)
+        self.assertEqual(verification.expires_at, attempt.modified + timedelta(days=VERIFICATION_DAYS_VALID))
+
+    def test_last_verified_attempt(self):
+        first_attempt = self._create_attempt(self.onboarding_exams[0], ProctoredExamStudentAttemptStatus.verified)
+        last_attempt = self._create_attempt(self.onboarding_exams[1], ProctoredExamStudentAttemptStatus.verified)
+        self.assertEqual(self._get_verified_attempt(), last_attempt)
+
+        # the verification follows the attempts which stop being verified, or are deleted
+        last_attempt.status = ProctoredExamStudentAttemptStatus.rejected
+        last_attempt.save()
+        self.assertEqual(self._get_verified_attempt(), first_attempt)
+
+        first_attempt.delete()
+        self.assertIsNone(self._get_verified_attempt())
+        self.assertFalse(OnboardingVerification.objects.exists())
+
+    def test_not_onboarding_attempts(self):
+        self._create_attempt(self.onboarding_exams[0], ProctoredExamStudentAttemptStatus.verified, False)
+        exam = ProctoredExam.objects.create(
+            course_id='test_course', content_id='test_exam', exam_name='Test Exam', time_limit_mins=90, backend='test'
+        )
+        self._create_attempt(exam, ProctoredExamStudentAttemptStatus.verified)
+        self.assertFalse(OnboardingVerification.objects.exists())
+
+    def test_expired_verification(self):
+        with freeze_time(datetime.now(pytz.UTC) - timedelta(days=VERIFICATION_DAYS_VALID + 1)):
+            self._create_attempt(self.onboarding_exams[0], ProctoredExamStudentAttemptStatus.verified)
+        self.assertTrue(OnboardingVerification.objects.exists())
+        self.assertIsNone(self._get_verified_attempt())
+
+    def test_migration_backfill(self):
+        attempt = self._create_attempt(self.onboarding_exams[0], ProctoredExamStudentAttemptStatus.verified)
+        self._create_attempt(self.onboarding_exams[1], ProctoredExamStudentAttemptStatus.rejected)
+        OnboardingVerification.objects.all().delete()
+
+        migration = import_module('edx_proctoring.migrations.0029_onboarding_verification')
+        migration.backfill_onboarding_verifications(None, None)
+        self.assertEqual(self._get_verified_attempt(), attempt)
+        self.assertEqual(OnboardingVerification.objects.count(), 1)
+
+
+class QueryIndexTests(LoggedInTestCase):
+    """
+    Tests that the hot attempt and allowance queries use the matching composite indexes
+    """
+
+    def setUp(self):
+        super().setUp()
+        if connection.vendor not in ('sqlite', 'mysql'):
+            self.skipTest('The query plans are only checked on SQLite and MySQL')
+        self.proctored_exam = ProctoredExam.objects.create(
+            course_id='test_course',
+            content_id='test_content',
+            exam_name='Test Exam',
+            external_id='123aXqe3',
+            time_limit_mins=90
+        )
+
+    def assertUsesIndex(self, queryset, index_name):
+        """
+        Asserts that the database plans to run the query with the given index
+        """
+        self.assertIn(index_name, queryset.explain())
+
+    def test_current_attempt(self):
+        self.assertUsesIndex(
+            ProctoredExamStudentAttempt.objects.filter(
+                proctored_exam=self.proctored_exam, user=self.user
+            ).order_by('-created'),
+            'proctoring_att_user_exam_idx'
+        )
+        self.assertUsesIndex(
+            ProctoredExamStudentAttempt.objects.get_user_attempts_by_exam_id(self.user.id, self.proctored_exam.id),
+            'proctoring_att_user_exam_idx'
+        )
+
+    def test_active_attempts(self):
+        self.assertUsesIndex(
+            ProctoredExamStudentAttempt.objects.get_active_student_attempts(self.user.id),
+            'proctoring_att_user_status_idx'
+        )
+
+    def test_onboarding_attempts(self):
+        self.assertUsesIndex(
+            ProctoredExamStudentAttempt.objects.get_last_verified_proctored_onboarding_attempts([self.user], 'test'),
+            'proctoring_att_user_status_idx'
+        )
+
+    def test_onboarding_verifications(self):
+        self.assertUsesIndex(
+            OnboardingVerification.objects.get_unexpired_verifications([self.user], 'test'),
+            'proctoring_onboardingverification_user_id_backend'
+        )
+
+    def test_expired_attempts(self):
+        ProctoredExamStudentAttempt.objects.create(
+            proctored_exam=self.proctored_exam,
+            user=self.user,
+            started_at=datetime.now(pytz.UTC),
+            status=ProctoredExamStudentAttemptStatus.started,
+            allowed_time_limit_mins=10,
+        )
+        self.assertUsesIndex(
+            ProctoredExamStudentAttempt.objects.get_expired_attempts(datetime.now(pytz.UTC)),
+            'proctoring_attempt_expiry_idx'
+        )
+
+    def test_allowances_of_users(self):
+        self.assertUsesIndex(
+            ProctoredExamStudentAllowance.objects.filter(proctored_exam=self.proctored_exam, user_id__in=[1, 2]),
+            'proctoring_allow_exam_user_idx'
+        )
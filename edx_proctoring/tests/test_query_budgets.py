@@ -0,0 +1,223 @@
+"""
+Query budgets of the public API functions and views which are the hottest or
+the most prone to N+1 regressions.
+
+Every scenario is measured on a course seeded with a realistic number of
+learners, and fails when it runs more queries than its budget. Read scenarios
+are measured twice, once more after growing the course, to check that their
+number of queries does not depend on its size. Wall times are logged, to
+compare runs, but not asserted on.
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from edx_proctoring.api import (
+    add_bulk_allowances,
+    get_all_exam_attempts,
+    get_exam_by_id,
+    get_exam_violation_report,
+    get_student_view,
+    update_attempt_status
+)
+from edx_proctoring.models import (
+    ProctoredExam,
+    ProctoredExamSoftwareSecureComment,
+    ProctoredExamSoftwareSecureReview,
+    ProctoredExamStudentAllowance,
+    ProctoredExamStudentAttempt
+)
+from edx_proctoring.runtime import set_runtime_service
+from edx_proctoring.serializers import ProctoredExamStudentAttemptSerializer
+from edx_proctoring.statuses import ProctoredExamStudentAttemptStatus, ReviewStatus
+from edx_proctoring.tests.test_utils.factories import (
+    ProctoredExamFactory,
+    ProctoredExamSoftwareSecureCommentFactory,
+    ProctoredExamSoftwareSecureReviewFactory,
+    ProctoredExamStudentAllowanceFactory,
+    ProctoredExamStudentAttemptFactory,
+    UserFactory
+)
+
+from .test_services import MockCertificateService, MockEnrollmentsService, MockGradesService
+from .test_utils.utils import ProctoredExamTestCase, User
+
+log = logging.getLogger(__name__)
+
+# number of learners in the seeded course, then after it grew
+LEARNERS = 200
+MORE_LEARNERS = 400
+
+# maximum number of queries of each scenario, to be lowered whenever one of them is optimized
+QUERY_BUDGETS = {
+    'get_student_view': 4,
+    'update_attempt_status': 14,
+    'get_exam_violation_report': 3,
+    'grouped_attempts_view': 5,
+    'onboarding_status_by_course_view': 5,
+    'add_bulk_allowances': 7,
+    'get_all_exam_attempts': 1,
+}
+
+
+class QueryBudgetTests(ProctoredExamTestCase):
+    """
+    Query budgets of the public API functions and views
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user.is_staff = True
+        self.user.save()
+        self.proctored_exam_id = self._create_proctored_exam()
+        self.onboarding_exam_id = self._create_onboarding_exam()
+        self.learners = []
+
+    def _seed(self, learners):
+        """
+        Adds learners to the course until it has ``learners`` of them, each with an allowance,
+        a reviewed attempt of the proctored exam and a verified attempt of the onboarding exam
+        """
+        users = User.objects.bulk_create(
+            UserFactory.build_batch(learners - len(self.learners))
+        )
+        self.learners.extend(users)
+        exam = ProctoredExam.objects.get(id=self.proctored_exam_id)
+        onboarding_exam = ProctoredExam.objects.get(id=self.onboarding_exam_id)
+
+        attempts = ProctoredExamStudentAttempt.objects.bulk_create(
+            ProctoredExamStudentAttemptFactory.build(user=user, proctored_exam=exam) for user in users
+        )
+        ProctoredExamStudentAttempt.objects.bulk_create(
+            ProctoredExamStudentAttemptFactory.build(
+                user=user, proctored_exam=onboarding_exam, status=ProctoredExamStudentAttemptStatus.verified
+            )
+            for user in users
+        )
+        ProctoredExamStudentAllowance.objects.bulk_create(
+            ProctoredExamStudentAllowanceFactory.build(user=user, proctored_exam=exam) for user in users
+        )
+        reviews = ProctoredExamSoftwareSecureReview.objects.bulk_create(
+            ProctoredExamSoftwareSecureReviewFactory.build(
+                attempt_code=attempt.attempt_code, exam=exam, student=attempt.user, review_status=ReviewStatus.passed
+            )
+            for attempt in attempts
+        )
+        ProctoredExamSoftwareSecureComment.objects.bulk_create(
+            ProctoredExamSoftwareSecureCommentFactory.build(review=review) for review in reviews
+        )
+        set_runtime_service('enrollments', MockEnrollmentsService(
+            [{'user': user, 'mode': 'verified'} for user in self.learners]
+        ))
+        set_runtime_service('certificates', MockCertificateService())
+        set_runtime_service('grades', MockGradesService())
+
+    @contextmanager
+    def assertQueryBudget(self, scenario):
+        """
+        Fails if the block runs more queries than the budget of the scenario, and logs its wall time
+        """
+        start = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            yield queries
+        elapsed = time.perf_counter() - start
+        log.info('%s ran %d queries in %.3fs', scenario, len(queries), elapsed)
+        self.assertLessEqual(
+            len(queries), QUERY_BUDGETS[scenario],
+            f'{scenario} ran {len(queries)} queries, over its budget of {QUERY_BUDGETS[scenario]}'
+        )
+
+    def _assertReadBudget(self, scenario, read):
+        """
+        Checks the budget of a read scenario, and that its number of queries does not grow with the course
+        """
+        self._seed(LEARNERS)
+        # warm up the caches, so that both measures are of the steady state
+        read()
+        with self.assertQueryBudget(scenario) as queries:
+            read()
+        self._seed(MORE_LEARNERS)
+        with self.assertQueryBudget(scenario) as more_queries:
+            read()
+        self.assertEqual(len(queries), len(more_queries))
+
+    def test_get_student_view(self):
+        exam = get_exam_by_id(self.proctored_exam_id)
+
+        def render():
+            self.assertIsNotNone(get_student_view(
+                user_id=self.user_id,
+                course_id=exam['course_id'],
+                content_id=exam['content_id'],
+                context={
+                    'is_proctored': True,
+                    'display_name': self.exam_name,
+                    'default_time_limit_mins': 90,
+                },
+            ))
+        self._assertReadBudget('get_student_view', render)
+
+    def test_update_attempt_status(self):
+        self._seed(LEARNERS)
+        attempt = self._create_started_exam_attempt()
+        with self.assertQueryBudget('update_attempt_status'):
+            update_attempt_status(attempt.id, ProctoredExamStudentAttemptStatus.submitted)
+
+    def test_get_exam_violation_report(self):
+        def report():
+            self.assertEqual(len(get_exam_violation_report(self.course_id)), len(self.learners) * 2)
+        self._assertReadBudget('get_exam_violation_report', report)
+
+    def test_grouped_attempts_view(self):
+        url = reverse('edx_proctoring:proctored_exam.attempts.grouped.course', kwargs={'course_id': self.course_id})
+
+        def get():
+            self.assertEqual(self.client.get(url).status_code, 200)
+        self._assertReadBudget('grouped_attempts_view', get)
+
+    def test_onboarding_status_by_course_view(self):
+        url = reverse('edx_proctoring:user_onboarding.status.course', kwargs={'course_id': self.course_id})
+
+        def get():
+            self.assertEqual(self.client.get(url).status_code, 200)
+        self._assertReadBudget('onboarding_status_by_course_view', get)
+
+    def test_add_bulk_allowances(self):
+        self._seed(LEARNERS)
+        exam_ids = [self.proctored_exam_id, ProctoredExamFactory.create().id]
+        user_ids = [user.id for user in self.learners[:50]]
+        with self.assertQueryBudget('add_bulk_allowances'):
+            add_bulk_allowances(
+                exam_ids, user_ids, ProctoredExamStudentAllowance.ADDITIONAL_TIME_GRANTED[0], '15'
+            )
+
+    def test_get_all_exam_attempts(self):
+        def get():
+            self.assertEqual(len(get_all_exam_attempts(self.course_id)), len(self.learners) * 2)
+        self._assertReadBudget('get_all_exam_attempts', get)
+
+    def test_attempt_serialization_cost(self):
+        """
+        Logs the cost of serializing 10k attempts from values() rows and with the serializer
+        """
+        self._seed(MORE_LEARNERS)
+        attempts = ProctoredExamStudentAttempt.objects.get_all_exam_attempts(self.course_id)
+
+        start = time.perf_counter()
+        serialized = get_all_exam_attempts(self.course_id)
+        values_cost = (time.perf_counter() - start) * 10000 / len(serialized)
+
+        start = time.perf_counter()
+        expected = [ProctoredExamStudentAttemptSerializer(attempt).data for attempt in attempts]
+        serializer_cost = (time.perf_counter() - start) * 10000 / len(expected)
+
+        log.info(
+            'Serializing 10k attempts costs %.3fs from values() rows, %.3fs with the serializer',
+            values_cost, serializer_cost
+        )
+        self.assertEqual(serialized, expected)
@@ -0,0 +1,102 @@
+"""
+Tests for the runtime services directory
+"""
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase
+
+from edx_proctoring.api import get_attempt_status_summary
+from edx_proctoring.runtime import (
+    get_runtime_service,
+    memoize_runtime_services,
+    runtime_services_scope,
+    set_runtime_service
+)
+
+from .test_services import MockCreditService
+from .test_utils.utils import ProctoredExamTestCase
+
+
+class RuntimeServicesScopeTests(TestCase):
+    """
+    Tests for memoizing calls to the runtime services
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.credit_service = MockCreditService()
+        self.credit_service.get_credit_state = MagicMock(wraps=self.credit_service.get_credit_state)
+        set_runtime_service('credit', self.credit_service)
+        self.addCleanup(set_runtime_service, 'credit', MockCreditService())
+
+    def _get_credit_state(self, *args, **kwargs):
+        return get_runtime_service('credit').get_credit_state(*args, **kwargs)
+
+    def test_not_memoized_outside_scope(self):
+        self.assertIs(get_runtime_service('credit'), self.credit_service)
+        self._get_credit_state(1, 'a/b/c')
+        self._get_credit_state(1, 'a/b/c')
+        self.assertEqual(self.credit_service.get_credit_state.call_count, 2)
+
+    def test_memoized_within_scope(self):
+        with runtime_services_scope():
+            credit_state = self._get_credit_state(1, 'a/b/c')
+            credit_state['course_name'] = 'changed'
+            # callers are handed a copy of the memoized result
+            self.assertEqual(self._get_credit_state(1, 'a/b/c')['course_name'], 'edx demo')
+            self._get_credit_state(1, 'a/b/c', return_course_info=True)
+            self._get_credit_state(2, 'a/b/c')
+        self.assertEqual(self.credit_service.get_credit_state.call_count, 3)
+
+        with runtime_services_scope():
+            self._get_credit_state(1, 'a/b/c')
+        self.assertEqual(self.credit_service.get_credit_state.call_count, 4)
+
+    def test_opt_out(self):
+        with runtime_services_scope():
+            self._get_credit_state(1, 'a/b/c')
+            get_runtime_service('credit', memoize=False).get_credit_state(1, 'a/b/c')
+        self.assertEqual(self.credit_service.get_credit_state.call_count, 2)
+
+    def test_write_forgets_memoized_results(self):
+        with runtime_services_scope():
+            self._get_credit_state(1, 'a/b/c')
+            get_runtime_service('credit').set_credit_requirement_status(
+                1, 'a/b/c', 'proctored_exam', 'content', status='declined'
+            )
+            credit_state = self._get_credit_state(1, 'a/b/c')
+        self.assertEqual(credit_state['credit_requirement_status'][0]['status'], 'declined')
+        self.assertEqual(self.credit_service.get_credit_state.call_count, 2)
+
+    def test_nested_scopes(self):
+        @memoize_runtime_services
+        def get_credit_state():
+            return self._get_credit_state(1, 'a/b/c')
+
+        with runtime_services_scope():
+            get_credit_state()
+            get_credit_state()
+        self.assertEqual(self.credit_service.get_credit_state.call_count, 1)
+
+    def test_not_memoized_service(self):
+        service = MagicMock()
+        set_runtime_service('enrollments', service)
+        self.addCleanup(set_runtime_service, 'enrollments', None)
+        with runtime_services_scope():
+            self.assertIs(get_runtime_service('enrollments'), service)
+
+
+class MemoizedApiTests(ProctoredExamTestCase):
+    """
+    Tests for the API functions running within a runtime services scope
+    """
+
+    def test_attempt_status_summaries_of_a_request(self):
+        exam_id = self._create_proctored_exam()
+        self._create_exam_attempt(exam_id)
+        credit_service = get_runtime_service('credit')
+        with patch.object(credit_service, 'get_credit_state', wraps=credit_service.get_credit_state) as mock_get:
+            with runtime_services_scope():
+                for _ in range(3):
+                    get_attempt_status_summary(self.user_id, self.course_id, self.content_id)
+        self.assertEqual(mock_get.call_count, 1)
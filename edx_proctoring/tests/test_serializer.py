@@ -2,9 +2,26 @@
 Tests for the custom StrictBooleanField serializer used by the ProctoredExamSerializer
 """
 
+import json
 import unittest
+from datetime import datetime
 
-from edx_proctoring.serializers import ProctoredExamSerializer
+import pytz
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from edx_proctoring.api import create_exam_review_policy
+from edx_proctoring.models import ProctoredExam, ProctoredExamReviewPolicy, ProctoredExamStudentAttempt
+from edx_proctoring.serializers import (
+    ProctoredExamSerializer,
+    ProctoredExamStudentAttemptSerializer,
+    serialize_attempts
+)
+from edx_proctoring.statuses import ProctoredExamStudentAttemptStatus
+
+from .test_utils.utils import ProctoredExamTestCase
 
 
 class TestProctoredExamSerializer(unittest.TestCase):
@@ -32,3 +49,40 @@ class TestProctoredExamSerializer(unittest.TestCase):
         self.assertFalse(serializer.is_valid())
         self.assertIn('is_proctored', serializer.errors)
         self.assertIn('is_practice_exam', serializer.errors)
+
+
+class TestSerializeAttempts(ProctoredExamTestCase):
+    """
+    Tests for serialize_attempts
+    """
+    def setUp(self):
+        super().setUp()
+        self.proctored_exam_id = self._create_proctored_exam()
+
+    def test_same_as_serializer(self):
+        """
+        The attempts are serialized exactly like ProctoredExamStudentAttemptSerializer does, in one query
+        """
+        ProctoredExam.objects.filter(id=self.proctored_exam_id).update(
+            due_date=datetime(2030, 1, 1, tzinfo=pytz.UTC)
+        )
+        create_exam_review_policy(self.proctored_exam_id, self.user_id, 'policy')
+        started_attempt = self._create_started_exam_attempt()
+        started_attempt.review_policy_id = ProctoredExamReviewPolicy.objects.get().id
+        started_attempt.save()
+        self._create_exam_attempt(
+            self._create_practice_exam(), status=ProctoredExamStudentAttemptStatus.verified, is_practice_exam=True
+        )
+        ProctoredExamStudentAttempt.objects.filter(status=ProctoredExamStudentAttemptStatus.verified).update(
+            completed_at=datetime.now(pytz.UTC), time_remaining_seconds=30, is_resumable=True
+        )
+        attempts = ProctoredExamStudentAttempt.objects.order_by('-created')
+
+        with CaptureQueriesContext(connection) as queries:
+            serialized = serialize_attempts(attempts)
+        self.assertEqual(len(queries), 1)
+
+        expected = [ProctoredExamStudentAttemptSerializer(attempt).data for attempt in attempts]
+        self.assertEqual(len(serialized), 2)
+        self.assertEqual(serialized, expected)
+        self.assertEqual(json.dumps(serialized, cls=DjangoJSONEncoder), json.dumps(expected, cls=DjangoJSONEncoder))
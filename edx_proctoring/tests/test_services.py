@@ -13,6 +13,7 @@ import pytz
 from edx_proctoring import api as edx_proctoring_api
 from edx_proctoring.exceptions import UserNotFoundException
 from edx_proctoring.services import ProctoringService
+from mock_apps.models import CourseEnrollment
 
 
 class MockCreditService:
@@ -343,6 +344,18 @@ class MockEnrollmentsService:
         return self.enrollments
 
 
+class MockQuerySetEnrollmentsService:
+    """Mock Enrollments service returning querysets of enrollments, like the LMS does"""
+
+    def get_active_enrollments_by_course(self, course_id):
+        """Returns the enrollments in the course"""
+        return CourseEnrollment.objects.filter(course_id=course_id).select_related('user')
+
+    def get_enrollments_can_take_proctored_exams(self, course_id, text_search=None):
+        """Returns the enrollments in the course"""
+        return self.get_active_enrollments_by_course(course_id)
+
+
 class MockUserCourseOutlineDetailsData:
     """Mock Outline Deatils"""
     def __init__(self, outline, schedule):
@@ -0,0 +1,216 @@
+"""
+Tests for the side effects of attempt status transitions
+"""
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytz
+
+from django.core import mail
+from django.core.management import call_command
+
+from edx_proctoring.api import update_attempt_status
+from edx_proctoring.models import ProctoredExamStudentAttemptSideEffect
+from edx_proctoring.runtime import get_runtime_service, set_runtime_service
+from edx_proctoring.side_effects import (
+    PROCESS_ATTEMPT_SIDE_EFFECTS_TASK,
+    _claim_side_effects,
+    _handlers,
+    _record_outcomes,
+    attempt_side_effect,
+    dispatch_attempt_side_effect,
+    process_attempt_side_effects
+)
+from edx_proctoring.statuses import AttemptSideEffectStatus, ProctoredExamStudentAttemptStatus
+from edx_proctoring.tasks import process_attempt_side_effects_task
+
+from .test_services import MockCertificateService, MockGradesService
+from .test_utils.utils import ProctoredExamTestCase
+
+calls = []
+
+
+@attempt_side_effect('test_side_effect')
+def _test_side_effect(value, fail=False):
+    """
+    Side effect recording its calls, used by the tests
+    """
+    if fail:
+        raise ValueError(value)
+    calls.append(value)
+
+
+@attempt_side_effect('other_test_side_effect')
+def _other_test_side_effect(value):
+    """
+    Side effect of another type recording its calls, used by the tests
+    """
+    calls.append(value)
+
+
+@patch('django.urls.reverse', MagicMock)
+@patch('edx_proctoring.constants.ASYNC_ATTEMPT_SIDE_EFFECTS', True)
+@patch('edx_proctoring.constants.ATTEMPT_SIDE_EFFECTS_USE_CELERY', False)
+class AsyncAttemptSideEffectsTests(ProctoredExamTestCase):
+    """
+    Tests for queueing and running attempt side effects asynchronously
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.proctored_exam_id = self._create_proctored_exam()
+        set_runtime_service('grades', MockGradesService())
+        set_runtime_service('certificates', MockCertificateService())
+        del calls[:]
+
+    def tearDown(self):
+        super().tearDown()
+        set_runtime_service('grades', None)
+        set_runtime_service('certificates', None)
+
+    def _get_credit_requirement_statuses(self):
+        credit_state = get_runtime_service('credit').get_credit_state(self.user_id, self.course_id)
+        return [requirement['status'] for requirement in credit_state['credit_requirement_status']]
+
+    def test_side_effects_are_queued(self):
+        attempt = self._create_started_exam_attempt()
+        update_attempt_status(attempt.id, ProctoredExamStudentAttemptStatus.submitted)
+
+        # the transition is persisted, but none of its side effects have run yet
+        attempt.refresh_from_db()
+        self.assertEqual(attempt.status, ProctoredExamStudentAttemptStatus.submitted)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(self._get_credit_requirement_statuses(), [])
+        queued = ProctoredExamStudentAttemptSideEffect.objects.order_by('id')
+        self.assertEqual(
+            [side_effect.effect_type for side_effect in queued],
+            ['credit_requirement_status', 'attempt_status_email', 'backend_attempt_update']
+        )
+
+        self.assertEqual(process_attempt_side_effects(), 3)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(self._get_credit_requirement_statuses(), ['submitted'])
+        self.assertFalse(
+            ProctoredExamStudentAttemptSideEffect.objects.exclude(status=AttemptSideEffectStatus.done).exists()
+        )
+        self.assertEqual(process_attempt_side_effects(), 0)
+
+    def test_side_effect_queued_once(self):
+        for _ in range(2):
+            dispatch_attempt_side_effect(1, 'transition', 'test_side_effect', {'value': 'a'})
+        self.assertEqual(ProctoredExamStudentAttemptSideEffect.objects.count(), 1)
+        process_attempt_side_effects()
+        self.assertEqual(calls, ['a'])
+
+    @patch('edx_proctoring.constants.ATTEMPT_SIDE_EFFECT_MAX_RETRIES', 2)
+    @patch('edx_proctoring.constants.ATTEMPT_SIDE_EFFECT_RETRY_DELAY', 10)
+    def test_failed_side_effect_is_retried(self):
+        dispatch_attempt_side_effect(1, 'transition', 'test_side_effect', {'value': 'a', 'fail': True})
+        side_effect = ProctoredExamStudentAttemptSideEffect.objects.get()
+
+        before = datetime.now(pytz.UTC)
+        self.assertEqual(process_attempt_side_effects(), 1)
+        side_effect.refresh_from_db()
+        self.assertEqual(side_effect.status, AttemptSideEffectStatus.pending)
+        self.assertEqual(side_effect.retries, 1)
+        self.assertIn('ValueError', side_effect.last_error)
+        self.assertGreaterEqual(side_effect.next_attempt_at, before + timedelta(seconds=10))
+
+        # not due yet
+        self.assertEqual(process_attempt_side_effects(), 0)
+
+        ProctoredExamStudentAttemptSideEffect.objects.update(next_attempt_at=before)
+        process_attempt_side_effects()
+        side_effect.refresh_from_db()
+        self.assertEqual(side_effect.status, AttemptSideEffectStatus.failed)
+        self.assertEqual(side_effect.retries, 2)
+
+    def test_side_effects_of_an_attempt_run_in_order(self):
+        dispatch_attempt_side_effect(1, 'first', 'test_side_effect', {'value': 'a', 'fail': True})
+        dispatch_attempt_side_effect(1, 'second', 'test_side_effect', {'value': 'b'})
+        dispatch_attempt_side_effect(2, 'other', 'test_side_effect', {'value': 'c'})
+
+        process_attempt_side_effects()
+        # the side effect of the second transition waits on the failed side effect of the first
+        self.assertEqual(calls, ['c'])
+
+        ProctoredExamStudentAttemptSideEffect.objects.filter(idempotency_key='first.test_side_effect').update(
+            payload={'value': 'a'}, next_attempt_at=datetime.now(pytz.UTC)
+        )
+        process_attempt_side_effects()
+        self.assertEqual(calls, ['c', 'a', 'b'])
+
+    def test_side_effects_of_other_types_do_not_wait(self):
+        dispatch_attempt_side_effect(1, 'first', 'test_side_effect', {'value': 'a', 'fail': True})
+        dispatch_attempt_side_effect(1, 'first', 'other_test_side_effect', {'value': 'b'})
+        dispatch_attempt_side_effect(1, 'second', 'other_test_side_effect', {'value': 'c'})
+
+        process_attempt_side_effects()
+        self.assertEqual(calls, ['b', 'c'])
+        # nor do they wait on the retry of the failed side effect
+        dispatch_attempt_side_effect(1, 'third', 'other_test_side_effect', {'value': 'd'})
+        process_attempt_side_effects()
+        self.assertEqual(calls, ['b', 'c', 'd'])
+
+    def test_claimed_side_effect_runs_again_once_its_claim_expires(self):
+        dispatch_attempt_side_effect(1, 'transition', 'test_side_effect', {'value': 'a'})
+        # another worker claims the side effect, and dies while running it
+        claimed, lease_until = _claim_side_effects(10)
+        self.assertEqual(
+            ProctoredExamStudentAttemptSideEffect.objects.get().status, AttemptSideEffectStatus.running
+        )
+        self.assertEqual(process_attempt_side_effects(), 0)
+        self.assertEqual(calls, [])
+
+        ProctoredExamStudentAttemptSideEffect.objects.update(next_attempt_at=datetime.now(pytz.UTC))
+        self.assertEqual(process_attempt_side_effects(), 1)
+        self.assertEqual(calls, ['a'])
+
+        # the outcome recorded by the worker whose claim expired is ignored
+        _record_outcomes(claimed, {claimed[0].id: ValueError('a')}, lease_until)
+        side_effect = ProctoredExamStudentAttemptSideEffect.objects.get()
+        self.assertEqual(side_effect.status, AttemptSideEffectStatus.done)
+        self.assertEqual(side_effect.retries, 0)
+
+    @patch('edx_proctoring.side_effects.current_app.send_task')
+    def test_celery_task_scheduled_on_commit(self, mock_send_task):
+        with patch('edx_proctoring.constants.ATTEMPT_SIDE_EFFECTS_USE_CELERY', True):
+            with self.captureOnCommitCallbacks(execute=True):
+                dispatch_attempt_side_effect(1, 'transition', 'test_side_effect', {'value': 'a'})
+        mock_send_task.assert_called_once_with(PROCESS_ATTEMPT_SIDE_EFFECTS_TASK)
+
+    def test_celery_task(self):
+        dispatch_attempt_side_effect(1, 'transition', 'test_side_effect', {'value': 'a'})
+        process_attempt_side_effects_task.apply()
+        self.assertEqual(calls, ['a'])
+
+    def test_management_command(self):
+        dispatch_attempt_side_effect(1, 'transition', 'test_side_effect', {'value': 'a'})
+        call_command('process_attempt_side_effects', batch_size=10)
+        self.assertEqual(calls, ['a'])
+
+
+class InlineAttemptSideEffectsTests(ProctoredExamTestCase):
+    """
+    Tests for running attempt side effects inline
+    """
+
+    def setUp(self):
+        super().setUp()
+        del calls[:]
+
+    def test_side_effect_runs_inline(self):
+        dispatch_attempt_side_effect(1, 'transition', 'test_side_effect', {'value': 'a'})
+        self.assertEqual(calls, ['a'])
+        self.assertFalse(ProctoredExamStudentAttemptSideEffect.objects.exists())
+
+    def test_failure_is_raised(self):
+        with self.assertRaises(ValueError):
+            dispatch_attempt_side_effect(1, 'transition', 'test_side_effect', {'value': 'a', 'fail': True})
+
+    @patch.dict(_handlers, {'test_side_effect': (_test_side_effect, True)})
+    def test_best_effort_failure_is_logged(self):
+        with self.assertLogs('edx_proctoring.side_effects', level='ERROR') as logs:
+            dispatch_attempt_side_effect(1, 'transition', 'test_side_effect', {'value': 'a', 'fail': True})
+        self.assertIn('type=test_side_effect for attempt_id=1', logs.output[0])
+        self.assertIsNotNone(logs.records[0].exc_info)
@@ -1,11 +1,17 @@
 from factory import Sequence, SubFactory
 from factory.django import DjangoModelFactory
 
+from django.contrib.auth import get_user_model
+
 from edx_proctoring.models import (
+    ProctoredExam,
     ProctoredExamSoftwareSecureComment,
     ProctoredExamSoftwareSecureReview,
-    ProctoredExamSoftwareSecureReviewHistory
+    ProctoredExamSoftwareSecureReviewHistory,
+    ProctoredExamStudentAllowance,
+    ProctoredExamStudentAttempt
 )
+from edx_proctoring.statuses import ProctoredExamStudentAttemptStatus
 
 
 class ProctoredExamSoftwareSecureReviewFactory(DjangoModelFactory):
@@ -33,3 +39,48 @@ class ProctoredExamSoftwareSecureCommentFactory(DjangoModelFactory):
     start_time = 100
     stop_time = 150
     duration = 150
+
+
+class UserFactory(DjangoModelFactory):
+    class Meta:
+        model = get_user_model()
+
+    username = Sequence(lambda n: 'learner%d' % n)
+    email = Sequence(lambda n: 'learner%d@example.com' % n)
+
+
+class ProctoredExamFactory(DjangoModelFactory):
+    class Meta:
+        model = ProctoredExam
+
+    course_id = 'a/b/c'
+    content_id = Sequence(lambda n: 'block-v1:test+course+1+type@sequential+block@exam%d' % n)
+    exam_name = Sequence(lambda n: 'Exam %d' % n)
+    external_id = Sequence(lambda n: 'exam_external_id_%d' % n)
+    time_limit_mins = 90
+    is_proctored = True
+    is_active = True
+    backend = 'test'
+
+
+class ProctoredExamStudentAttemptFactory(DjangoModelFactory):
+    class Meta:
+        model = ProctoredExamStudentAttempt
+
+    user = SubFactory(UserFactory)
+    proctored_exam = SubFactory(ProctoredExamFactory)
+    attempt_code = Sequence(lambda n: 'attempt_code_%d' % n)
+    external_id = Sequence(lambda n: 'attempt_external_id_%d' % n)
+    taking_as_proctored = True
+    status = ProctoredExamStudentAttemptStatus.submitted
+    allowed_time_limit_mins = 90
+
+
+class ProctoredExamStudentAllowanceFactory(DjangoModelFactory):
+    class Meta:
+        model = ProctoredExamStudentAllowance
+
+    user = SubFactory(UserFactory)
+    proctored_exam = SubFactory(ProctoredExamFactory)
+    key = ProctoredExamStudentAllowance.ADDITIONAL_TIME_GRANTED[0]
+    value = '30'
@@ -14,11 +14,13 @@ from eventtracking.tracker import TRACKERS, Tracker
 
 from django.conf import settings
 from django.contrib.auth import get_user_model, login
+from django.core.cache import cache
 from django.http import HttpRequest
 from django.test import TestCase
 from django.test.client import Client
 
 from edx_proctoring.api import create_exam, create_exam_review_policy, is_attempt_in_resume_process
+from edx_proctoring.cache import clear_local_caches
 from edx_proctoring.models import ProctoredExamStudentAttempt
 from edx_proctoring.runtime import set_runtime_service
 from edx_proctoring.statuses import ProctoredExamStudentAttemptStatus
@@ -73,6 +75,9 @@ class LoggedInTestCase(TestCase):
         Setup for tests
         """
         super().setUp()
+        # database rows are rolled back between tests, so cached copies of them must go too
+        cache.clear()
+        clear_local_caches()
         self.client = TestClient()
         self.user = User(username='tester', email='tester@test.com')
         self.user.save()
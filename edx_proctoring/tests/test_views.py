@@ -14,8 +14,9 @@ from httmock import HTTMock
 from opaque_keys.edx.locator import BlockUsageLocator
 
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test.client import Client
-from django.test.utils import override_settings
+from django.test.utils import CaptureQueriesContext, override_settings
 from django.urls import NoReverseMatch, reverse
 from django.utils import timezone
 
@@ -68,7 +69,7 @@ from edx_proctoring.tests.test_utils.factories import (
 from edx_proctoring.urls import urlpatterns
 from edx_proctoring.utils import obscured_user_id, resolve_exam_url_for_learning_mfe
 from edx_proctoring.views import require_course_or_global_staff, require_staff
-from mock_apps.models import Profile
+from mock_apps.models import CourseEnrollment, Profile
 
 from .test_services import (
     MockCertificateService,
@@ -78,6 +79,7 @@ from .test_services import (
     MockGradesService,
     MockInstructorService,
     MockLearningSequencesService,
+    MockQuerySetEnrollmentsService,
     MockScheduleItemData
 )
 from .test_utils.utils import LoggedInTestCase, ProctoredExamTestCase
@@ -1437,6 +1439,25 @@ class TestStudentOnboardingStatusView(ProctoredExamTestCase):
         self.assertEqual(response_data['expiration_date'], None)
         mock_logger.assert_called()
 
+    @patch('edx_proctoring.api.constants.ONBOARDING_PROFILE_API', True)
+    @patch.object(TestBackendProvider, 'get_onboarding_profile_info')
+    def test_onboarding_with_api_endpoint_cached(self, mocked_onboarding_api):
+        mocked_onboarding_api.return_value = {
+            'user_id': '123abc',
+            'status': VerificientOnboardingProfileStatus.approved,
+            'expiration_date': '2051-05-21'
+        }
+        url = reverse('edx_proctoring:user_onboarding.status') + f'?course_id={self.onboarding_exam.course_id}'
+
+        for _ in range(2):
+            response = self.client.get(url)
+            self.assertEqual(json.loads(response.content.decode('utf-8'))['expiration_date'], '2051-05-21')
+        mocked_onboarding_api.assert_called_once()
+
+        with patch('edx_proctoring.constants.ONBOARDING_PROFILE_CACHE_TIMEOUT', 0):
+            self.client.get(url)
+        self.assertEqual(mocked_onboarding_api.call_count, 2)
+
     def test_multiple_onboarding_exams_mixed_favor_to_be_released(self):
         """
         If there are multiple onboarding exams, and some are to be released and some are past due, the
@@ -2100,6 +2121,81 @@ class TestStudentOnboardingStatusByCourseView(ProctoredExamTestCase):
         }
         self.assertEqual(response_data, expected_data)
 
+    @patch('edx_proctoring.views.ATTEMPTS_PER_PAGE', 2)
+    def test_status_filter_and_pagination_in_database(self):
+        learners = [self.user, self.learner_1, self.learner_2]
+        for i in range(3):
+            learner = User(username=f'onboarding_learner{i}', email=f'onboarding_learner{i}@test.com')
+            learner.save()
+            learners.append(learner)
+        set_runtime_service('enrollments', MockEnrollmentsService([
+            {'user': learner, 'mode': 'verified'} for learner in learners
+        ]))
+        # every other learner starts onboarding
+        for learner in learners[::2]:
+            create_exam_attempt(self.onboarding_exam.id, learner.id, True)
+
+        url = reverse(
+            'edx_proctoring:user_onboarding.status.course',
+            kwargs={'course_id': self.onboarding_exam.course_id}
+        )
+        # warm up anything cached between requests, e.g. waffle switches
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as first_page:
+            response = self.client.get(url, {'statuses': InstructorDashboardOnboardingAttemptStatus.setup_started})
+        response_data = json.loads(response.content.decode('utf-8'))
+        self.assertEqual(response_data['count'], 3)
+        self.assertEqual(response_data['num_pages'], 2)
+        self.assertEqual(
+            [result['username'] for result in response_data['results']],
+            [learners[0].username, learners[2].username]
+        )
+
+        with CaptureQueriesContext(connection) as last_page:
+            response = self.client.get(url, {
+                'statuses': InstructorDashboardOnboardingAttemptStatus.setup_started,
+                'page': 2,
+            })
+        response_data = json.loads(response.content.decode('utf-8'))
+        self.assertEqual([result['username'] for result in response_data['results']], [learners[4].username])
+        self.assertEqual(
+            response_data['results'][0]['status'], InstructorDashboardOnboardingAttemptStatus.setup_started
+        )
+
+        # the number of queries does not depend on the number of learners
+        self.assertEqual(len(first_page.captured_queries), len(last_page.captured_queries))
+
+    @patch('edx_proctoring.views.ATTEMPTS_PER_PAGE', 2)
+    def test_enrollments_queryset(self):
+        learners = [self.user, self.learner_1, self.learner_2]
+        for learner, mode in zip(learners, self.enrollment_modes):
+            CourseEnrollment.objects.create(user=learner, course_id=self.onboarding_exam.course_id, mode=mode)
+        CourseEnrollment.objects.create(user=self.learner_1, course_id='x/y/z', mode='audit')
+        set_runtime_service('enrollments', MockQuerySetEnrollmentsService())
+        create_exam_attempt(self.onboarding_exam.id, self.learner_2.id, True)
+
+        url = reverse(
+            'edx_proctoring:user_onboarding.status.course',
+            kwargs={'course_id': self.onboarding_exam.course_id}
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'page': 2})
+        response_data = json.loads(response.content.decode('utf-8'))
+        self.assertEqual(response_data['count'], 3)
+        self.assertEqual(response_data['results'], [
+            {
+                'username': self.learner_2.username,
+                'enrollment_mode': self.enrollment_modes[2],
+                'status': InstructorDashboardOnboardingAttemptStatus.setup_started,
+                'modified': response_data['results'][0]['modified'],
+            },
+        ])
+        # the enrolled learners are selected with a subquery rather than a list of their ids
+        user_queries = [query['sql'] for query in queries.captured_queries if 'onboarding_status' in query['sql']]
+        self.assertTrue(user_queries)
+        for sql in user_queries:
+            self.assertIn('mock_apps_courseenrollment', sql)
+
     def test_not_staff_or_course_staff(self):
         self.user.is_staff = False
         self.user.save()
@@ -2401,6 +2497,46 @@ class TestStudentOnboardingStatusByCourseView(ProctoredExamTestCase):
         response_data = json.loads(response.content.decode('utf-8'))
         self.assertEqual(response_data, expected_data)
 
+    @patch('edx_proctoring.views.waffle.switch_is_active')
+    @patch.object(TestBackendProvider, 'get_onboarding_profile_info')
+    def test_instructor_onboarding_profile_pages_cached(self, mocked_onboarding_api, mocked_switch_is_active):
+        """
+        All the pages of onboarding profiles are requested, then served from the cache
+        """
+        mocked_switch_is_active.return_value = True
+        learners = [self.user, self.learner_1, self.learner_2]
+
+        def get_page(course_id, page, page_size, status):  # pylint: disable=unused-argument
+            return {
+                'num_pages': 3,
+                'results': [
+                    {
+                        'user_id': obscured_user_id(learners[page - 1].id, self.onboarding_exam.backend),
+                        'status': VerificientOnboardingProfileStatus.approved,
+                        'expiration_date': '2051-05-21'
+                    },
+                ],
+            }
+        mocked_onboarding_api.side_effect = get_page
+
+        url = reverse(
+            'edx_proctoring:user_onboarding.status.course',
+            kwargs={'course_id': self.onboarding_exam.course_id},
+        )
+        for _ in range(2):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            response_data = json.loads(response.content.decode('utf-8'))
+            self.assertEqual(
+                [result['status'] for result in response_data['results']],
+                [ProctoredExamStudentAttemptStatus.verified] * 3
+            )
+        self.assertEqual(mocked_onboarding_api.call_count, 3)
+
+        # other filters are requested again
+        self.client.get(url, {'statuses': 'verified'})
+        self.assertEqual(mocked_onboarding_api.call_count, 6)
+
 
 @ddt.ddt
 class TestStudentProctoredExamAttempt(LoggedInTestCase):
@@ -3697,6 +3833,47 @@ class TestStudentProctoredExamAttempt(LoggedInTestCase):
         self.assertEqual(fourth_attempt['all_attempts'][0]['id'], attempt_2)
         self.assertEqual(fourth_attempt['all_attempts'][1]['id'], attempt_1)
 
+    def test_grouped_exam_attempts_query_count(self):
+        """
+        Test that the number of queries does not grow with the number of attempts on the page
+        """
+        proctored_exam = ProctoredExam.objects.create(
+            course_id='a/b/c',
+            content_id='test_content',
+            exam_name='Test Exam',
+            external_id='123aXqe3',
+            time_limit_mins=90
+        )
+        url = reverse(
+            'edx_proctoring:proctored_exam.attempts.grouped.course',
+            kwargs={'course_id': proctored_exam.course_id},
+        )
+
+        def create_attempts(start, end):
+            for i in range(start, end):
+                user = User.objects.create(username=f'student{i}', email=f'student{i}@test.com')
+                for attempt in range(2):
+                    ProctoredExamStudentAttempt.create_exam_attempt(
+                        proctored_exam.id, user.id,
+                        f'test_attempt_code{i}_{attempt}', True, False, f'test_external_id{i}_{attempt}'
+                    )
+
+        create_attempts(0, 2)
+        with CaptureQueriesContext(connection) as few_attempts:
+            response = self.client.get(url)
+        self.assertEqual(len(json.loads(response.content.decode('utf-8'))['proctored_exam_attempts']), 2)
+
+        create_attempts(2, 20)
+        with CaptureQueriesContext(connection) as many_attempts:
+            response = self.client.get(url)
+        response_data = json.loads(response.content.decode('utf-8'))
+        self.assertEqual(len(response_data['proctored_exam_attempts']), 20)
+        for attempt in response_data['proctored_exam_attempts']:
+            self.assertEqual(len(attempt['all_attempts']), 2)
+            self.assertEqual(attempt['all_attempts'][0]['id'], attempt['id'])
+
+        self.assertEqual(len(few_attempts.captured_queries), len(many_attempts.captured_queries))
+
     def test_stop_others_attempt(self):
         """
         Start an exam (create an exam attempt)
@@ -5730,6 +5907,91 @@ class GroupedExamAllowancesByStudent(LoggedInTestCase):
         self.assertEqual(len(response_data), 3)
 
 
+class TestPagedExamAllowancesByStudent(LoggedInTestCase):
+    """
+    Tests for the PagedExamAllowancesByStudent view
+    """
+    def setUp(self):
+        super().setUp()
+        self.user.is_staff = True
+        self.user.save()
+        set_runtime_service('instructor', MockInstructorService(is_user_course_staff=True))
+
+        self.students = self.create_batch_users(30)
+        exams = [
+            ProctoredExam.objects.create(
+                course_id='a/b/c', content_id=f'test_content{i}', exam_name=f'Test Exam{i}', time_limit_mins=90
+            )
+            for i in range(2)
+        ]
+        other_exam = ProctoredExam.objects.create(
+            course_id='a/b/d', content_id='test_content', exam_name='Other Exam', time_limit_mins=90
+        )
+        for student in self.students:
+            for exam in exams:
+                ProctoredExamStudentAllowance.objects.create(
+                    user=student, proctored_exam=exam, key='additional_time_granted', value='30'
+                )
+        ProctoredExamStudentAllowance.objects.create(
+            user=self.user, proctored_exam=other_exam, key='additional_time_granted', value='30'
+        )
+        self.url = reverse(
+            'edx_proctoring:proctored_exam.allowance.grouped.course.paged', kwargs={'course_id': 'a/b/c'}
+        )
+
+    def test_get_paged_allowances(self):
+        """
+        Students are paged by username, with all their allowances in the course
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        response_data = json.loads(response.content.decode('utf-8'))
+        usernames = sorted(student.username for student in self.students)
+        self.assertEqual([result['username'] for result in response_data['results']], usernames[:25])
+        self.assertEqual(
+            response_data['results'][0]['allowances'],
+            json.loads(json.dumps([
+                ProctoredExamStudentAllowanceSerializer(allowance).data
+                for allowance in ProctoredExamStudentAllowance.objects.filter(
+                    user__username=usernames[0]
+                ).order_by('id')
+            ]))
+        )
+        self.assertEqual(response_data['next'], f'{self.url}?cursor={usernames[24]}')
+
+        with CaptureQueriesContext(connection) as next_queries:
+            response = self.client.get(response_data['next'])
+        response_data = json.loads(response.content.decode('utf-8'))
+        self.assertEqual([result['username'] for result in response_data['results']], usernames[25:])
+        for result in response_data['results']:
+            self.assertEqual(len(result['allowances']), 2)
+        self.assertIsNone(response_data['next'])
+        self.assertEqual(len(queries), len(next_queries))
+
+    def test_search(self):
+        """
+        Only the students whose username starts with the search string are returned
+        """
+        response = self.client.get(self.url, {'search': 'student1'})
+        response_data = json.loads(response.content.decode('utf-8'))
+        self.assertEqual(
+            [result['username'] for result in response_data['results']],
+            sorted(student.username for student in self.students if student.username.startswith('student1'))
+        )
+        self.assertIsNone(response_data['next'])
+
+    def test_non_staff(self):
+        """
+        Only staff can get the allowances of a course
+        """
+        self.user.is_staff = False
+        self.user.save()
+        set_runtime_service('instructor', MockInstructorService(is_user_course_staff=False))
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+
+
 class TestActiveExamsForUserView(LoggedInTestCase):
     """
     Tests for the ActiveExamsForUserView
@@ -85,6 +85,11 @@ urlpatterns = [
         views.GroupedExamAllowancesByStudent.as_view(),
         name='proctored_exam.allowance.grouped.course'
     ),
+    re_path(
+        fr'edx_proctoring/v1/proctored_exam/{settings.COURSE_ID_PATTERN}/grouped/allowance/paged$',
+        views.PagedExamAllowancesByStudent.as_view(),
+        name='proctored_exam.allowance.grouped.course.paged'
+    ),
     path('edx_proctoring/v1/proctored_exam/active_exams_for_user', views.ActiveExamsForUserView.as_view(),
          name='proctored_exam.active_exams_for_user'
          ),
@@ -116,6 +121,11 @@ urlpatterns = [
         views.ProctoredExamAttemptView.as_view(),
         name='proctored_exam.exam_attempts'
     ),
+    path(
+        'edx_proctoring/v1/proctored_exam/active_attempt/heartbeat',
+        views.ProctoredExamActiveAttemptHeartbeatView.as_view(),
+        name='proctored_exam.active_attempt.heartbeat'
+    ),
     re_path(
         'edx_proctoring/v1/proctored_exam/active_attempt',
         views.ProctoredExamActiveAttemptView.as_view(),
@@ -3,10 +3,14 @@ Proctored Exams HTTP-based API endpoints
 """
 
 import codecs
+import hashlib
 import json
 import logging
+from collections import defaultdict
+from datetime import datetime
 from urllib.parse import urlencode
 
+import pytz
 import waffle  # pylint: disable=invalid-django-waffle-import
 from crum import get_current_request
 from edx_django_utils.monitoring import set_custom_attribute
@@ -20,9 +24,11 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ObjectDoesNotExist
 from django.core.paginator import Paginator
+from django.db.models import Case, CharField, DateTimeField, F, OuterRef, Q, QuerySet, Subquery, Value, When
 from django.shortcuts import redirect
 from django.urls import reverse
 from django.utils.decorators import method_decorator
+from django.utils.http import parse_etags, quote_etag
 from django.utils.translation import gettext as _
 
 from edx_proctoring import constants
@@ -32,6 +38,7 @@ from edx_proctoring.api import (
     check_prerequisites,
     create_exam,
     create_exam_attempt,
+    get_active_attempt_heartbeat,
     get_active_exams_for_user,
     get_all_exams_for_course,
     get_allowances_for_course,
@@ -43,13 +50,11 @@ from edx_proctoring.api import (
     get_exam_attempt_data,
     get_exam_by_content_id,
     get_exam_by_id,
-    get_last_verified_onboarding_attempts_per_user,
     get_onboarding_attempt_data_for_learner,
     get_onboarding_exam_link,
     get_proctoring_settings_by_exam_id,
     get_review_policy_by_exam_id,
     get_total_allowed_time_for_exam,
-    get_user_attempts_by_exam_id,
     is_exam_passed_due,
     mark_exam_attempt_as_ready,
     mark_exam_attempt_as_ready_to_resume,
@@ -62,6 +67,7 @@ from edx_proctoring.api import (
     update_exam,
     update_exam_attempt
 )
+from edx_proctoring.cache import get_cached_onboarding_profiles
 from edx_proctoring.constants import (
     ONBOARDING_PROFILE_INSTRUCTOR_DASHBOARD_API,
     PING_FAILURE_PASSTHROUGH_TEMPLATE,
@@ -77,21 +83,25 @@ from edx_proctoring.exceptions import (
     ProctoredExamReviewPolicyNotFoundException,
     StudentExamAttemptDoesNotExistsException
 )
+from edx_proctoring.instrumentation import instrumented
 from edx_proctoring.models import (
+    OnboardingVerification,
     ProctoredExam,
     ProctoredExamSoftwareSecureComment,
     ProctoredExamSoftwareSecureReview,
     ProctoredExamSoftwareSecureReviewHistory,
     ProctoredExamStudentAllowance,
     ProctoredExamStudentAllowanceHistory,
-    ProctoredExamStudentAttempt
+    ProctoredExamStudentAttempt,
+    current_exam_attempts_scope
 )
-from edx_proctoring.runtime import get_runtime_service
+from edx_proctoring.runtime import get_runtime_service, runtime_services_scope
 from edx_proctoring.serializers import (
     ProctoredExamRegistrationSerializer,
     ProctoredExamSerializer,
     ProctoredExamStudentAllowanceSerializer,
-    ProctoredExamStudentAttemptSerializer
+    ProctoredExamStudentAttemptSerializer,
+    serialize_attempts
 )
 from edx_proctoring.statuses import (
     InstructorDashboardOnboardingAttemptStatus,
@@ -117,6 +127,8 @@ User = get_user_model()
 
 ATTEMPTS_PER_PAGE = 25
 
+ALLOWANCE_USERS_PER_PAGE = 25
+
 LOG = logging.getLogger("edx_proctoring_views")
 
 
@@ -185,8 +197,17 @@ def handle_proctored_exception(exc, name=None):  # pylint: disable=inconsistent-
 
 class ProctoredAPIView(AuthenticatedAPIView):
     """
-    Overrides AuthenticatedAPIView to handle proctoring exceptions
+    Overrides AuthenticatedAPIView to handle proctoring exceptions, and to memoize
+    the read only calls to the runtime services and the current attempts of
+    learners for the lifetime of the request
     """
+    def dispatch(self, request, *args, **kwargs):
+        """
+        Handles the request within a runtime services scope
+        """
+        with runtime_services_scope(), current_exam_attempts_scope():
+            return super().dispatch(request, *args, **kwargs)
+
     def handle_exception(self, exc):
         """
         Converts proctoring exceptions into standard restframework responses
@@ -238,6 +259,76 @@ class ProctoredExamActiveAttemptView(ProctoredAPIView):
         return Response(data=active_attempt_data)
 
 
+class ProctoredExamActiveAttemptHeartbeatView(ProctoredAPIView):
+    """
+    Lightweight endpoint polled by the exam timer.
+
+    path: /edx_proctoring/v1/proctored_exam/active_attempt/heartbeat
+
+    Supports:
+        HTTP GET:
+            Status, remaining time and warning thresholds of the active attempt.
+
+    The response carries an ETag derived from the attempt state (not from the
+    clock), so a poll sending a matching If-None-Match header gets an empty 304
+    response when nothing about the attempt has changed. Clients should keep
+    counting down from ``expires_at`` in that case.
+
+    **Expected Response**
+        HTTP GET:
+            {
+                "attempt_id": 1,
+                "exam_id": 1,
+                "course_id": "course-v1:edX+DemoX+Demo_Course",
+                "attempt_status": "started",
+                "modified": "2025-01-01T10:00:00Z",
+                "expires_at": "2025-01-01T11:00:00Z",
+                "time_remaining_seconds": 3540.0,
+                "low_threshold_sec": 720,
+                "critically_low_threshold_sec": 180
+            }
+            or {} when the user has no active attempt
+    """
+    def get(self, request):
+        """
+        HTTP GET handler. Returns the active attempt heartbeat
+        """
+        user_id = request.user.id
+        requested_user_id = request.GET.get('user_id', None)
+        if requested_user_id:
+            if request.user.is_staff:
+                user_id = int(requested_user_id)
+            else:
+                return Response(
+                    status=status.HTTP_403_FORBIDDEN,
+                    data={'detail': 'Must be a Staff User to Perform this request.'}
+                )
+
+        heartbeat = get_active_attempt_heartbeat(user_id) or {}
+        etag = quote_etag(self._get_etag(heartbeat))
+
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match and (etag in parse_etags(if_none_match) or if_none_match.strip() == '*'):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data=heartbeat)
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    @staticmethod
+    def _get_etag(heartbeat):
+        """
+        Fingerprint of the fields that only change when the attempt itself changes
+        """
+        if not heartbeat:
+            return 'none'
+        state = '|'.join(
+            str(heartbeat[key]) for key in ('attempt_id', 'attempt_status', 'modified', 'expires_at')
+        )
+        return hashlib.md5(state.encode('utf-8')).hexdigest()
+
+
 class ProctoredExamAttemptView(ProctoredAPIView):
     """
     Endpoint for getting timed or proctored exam and its attempt data.
@@ -751,7 +842,12 @@ class StudentOnboardingStatusView(ProctoredAPIView):
         if constants.ONBOARDING_PROFILE_API:
             try:
                 obs_user_id = obscured_user_id(user.id, onboarding_exam.backend)
-                onboarding_profile_data = backend.get_onboarding_profile_info(course_id, user_id=obs_user_id)
+                onboarding_profile_data = get_cached_onboarding_profiles(
+                    onboarding_exam.backend,
+                    course_id,
+                    {'user_id': obs_user_id},
+                    lambda: backend.get_onboarding_profile_info(course_id, user_id=obs_user_id),
+                )
             except BackendProviderOnboardingProfilesException as exc:
                 # if backend raises exception, log message and return data from onboarding exam attempt
                 LOG.warning(
@@ -880,191 +976,227 @@ class StudentOnboardingStatusByCourseView(ProctoredAPIView):
         status_filters = request.GET.get('statuses')
 
         enrollments = get_enrollments_can_take_proctored_exams(course_id, text_search)
-        users = []
-        enrollment_modes_by_user_id = {}
-        for enrollment in enrollments:
-            users.append(enrollment.user)
-            enrollment_modes_by_user_id[enrollment.user.id] = enrollment.mode
+        enrollments_are_queryset = isinstance(enrollments, QuerySet)
 
-        onboarding_data = []
         use_onboarding_profile_api = waffle.switch_is_active(ONBOARDING_PROFILE_INSTRUCTOR_DASHBOARD_API)
 
         # add custom attribute to better track performance of this endpoint against the
         # number of proctoring eligible enrollments in the given course
-        set_custom_attribute('num_proctoring_eligible_enrollments', len(enrollments))
+        set_custom_attribute(
+            'num_proctoring_eligible_enrollments',
+            enrollments.count() if enrollments_are_queryset else len(enrollments)
+        )
         set_custom_attribute('onboarding_profile_api_enabled', use_onboarding_profile_api)
 
-        if use_onboarding_profile_api:
-            backend = get_backend_provider(name=onboarding_exam.backend)
+        query_params = self._get_query_params(text_search, status_filters)
 
-            onboarding_profile_info, api_response_error = self._get_onboarding_info(
-                backend,
+        if not use_onboarding_profile_api:
+            # statuses are computed, filtered and paginated in the database. When the enrollments
+            # service returns a queryset, the enrolled learners are selected with a subquery, so
+            # that only the learners of the page and their enrollment modes are loaded
+            if enrollments_are_queryset:
+                user_ids = enrollments.values('user_id')
+            else:
+                user_ids = [enrollment.user.id for enrollment in enrollments]
+            onboarding_statuses = self._get_onboarding_status_queryset(
                 course_id,
-                status_filters
+                onboarding_exam.backend,
+                user_ids,
+                status_filters.split(',') if status_filters else None,
             )
-
-            if api_response_error:
-                # if backend raises exception, log message and return data from onboarding exam attempt
-                LOG.warning(
-                    'Failed to use backend onboarding status API endpoint for course_id=%(course_id)s'
-                    'with query parameters text_search: %(text_search_filter)s, status: %(status_filters)s'
-                    'because backend failed to respond. Onboarding status'
-                    'will be determined by the users\'s onboarding attempts. '
-                    'Status: %(status)s, Response: %(response)s.',
-                    {
-                        'course_id': course_id,
-                        'text_search_filter': text_search,
-                        'status_filters': status_filters,
-                        'response': str(api_response_error),
-                        'status': api_response_error.http_status,
-                    }
+            paginated_data = self._paginate_data(
+                onboarding_statuses, data_page, onboarding_exam.course_id, query_params
+            )
+            page_user_ids = [user_status['id'] for user_status in paginated_data['results']]
+            if enrollments_are_queryset:
+                enrollment_modes_by_user_id = dict(
+                    enrollments.filter(user_id__in=page_user_ids).values_list('user_id', 'mode')
                 )
+            else:
+                enrollment_modes_by_user_id = {enrollment.user.id: enrollment.mode for enrollment in enrollments}
+            paginated_data['results'] = [
+                {
+                    'username': user_status['username'],
+                    'enrollment_mode': enrollment_modes_by_user_id.get(user_status['id']),
+                    'status': user_status['onboarding_status'],
+                    'modified': user_status['onboarding_modified'],
+                }
+                for user_status in paginated_data['results']
+            ]
+            paginated_data['use_onboarding_profile_api'] = use_onboarding_profile_api
+            return Response(paginated_data)
 
-                return Response(
-                    status=status.HTTP_503_SERVICE_UNAVAILABLE,
-                    data={'detail': _('The onboarding service is temporarily unavailable. Please try again later.')}
-                )
+        # the learners are matched with the onboarding profiles returned by the backend, so all of them are loaded
+        users = []
+        enrollment_modes_by_user_id = {}
+        for enrollment in enrollments:
+            users.append(enrollment.user)
+            enrollment_modes_by_user_id[enrollment.user.id] = enrollment.mode
 
-            LOG.info(
-                'Backend onboarding API returned %(num_profiles)s from the proctoring provider '
-                'for course %(course_id)s.',
+        onboarding_data = []
+        backend = get_backend_provider(name=onboarding_exam.backend)
+
+        onboarding_profile_info, api_response_error = self._get_onboarding_info(
+            backend,
+            onboarding_exam.backend,
+            course_id,
+            status_filters
+        )
+
+        if api_response_error:
+            # if backend raises exception, log message and return data from onboarding exam attempt
+            LOG.warning(
+                'Failed to use backend onboarding status API endpoint for course_id=%(course_id)s'
+                'with query parameters text_search: %(text_search_filter)s, status: %(status_filters)s'
+                'because backend failed to respond. Onboarding status'
+                'will be determined by the users\'s onboarding attempts. '
+                'Status: %(status)s, Response: %(response)s.',
                 {
-                    'num_profiles': len(onboarding_profile_info),
                     'course_id': course_id,
+                    'text_search_filter': text_search,
+                    'status_filters': status_filters,
+                    'response': str(api_response_error),
+                    'status': api_response_error.http_status,
                 }
             )
 
-            obscured_user_ids_to_users = {obscured_user_id(user.id, onboarding_exam.backend): user for user in users}
+            return Response(
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                data={'detail': _('The onboarding service is temporarily unavailable. Please try again later.')}
+            )
 
-            missing_user_ids = []
-            for onboarding_profile in onboarding_profile_info:
-                obscured_id = onboarding_profile['user_id']
-                user = obscured_user_ids_to_users.get(obscured_id)
+        LOG.info(
+            'Backend onboarding API returned %(num_profiles)s from the proctoring provider '
+            'for course %(course_id)s.',
+            {
+                'num_profiles': len(onboarding_profile_info),
+                'course_id': course_id,
+            }
+        )
 
-                if not user:
-                    missing_user_ids.append(onboarding_profile['user_id'])
-                    continue
+        obscured_user_ids_to_users = {obscured_user_id(user.id, onboarding_exam.backend): user for user in users}
+
+        missing_user_ids = []
+        for onboarding_profile in onboarding_profile_info:
+            obscured_id = onboarding_profile['user_id']
+            user = obscured_user_ids_to_users.get(obscured_id)
+
+            if not user:
+                missing_user_ids.append(onboarding_profile['user_id'])
+                continue
 
-                onboarding_status = onboarding_profile['status']
+            onboarding_status = onboarding_profile['status']
+            data = {
+                'username': user.username,
+                'enrollment_mode': enrollment_modes_by_user_id.get(user.id),
+                'status': VerificientOnboardingProfileStatus.get_instructor_status_from_profile_status(
+                    onboarding_status
+                ),
+                'modified': None,
+                'user_id': user.id,
+            }
+            onboarding_data.append(data)
+            del obscured_user_ids_to_users[obscured_id]
+
+        if missing_user_ids:
+            LOG.warning(
+                'Users are present in response whose obscured user IDs do not exist in list of learners '
+                'enrolled in course %(course_id)s with proctoring eligible enrollments. There are a total '
+                'of %(num_missing_ids)s of these. A sample of these IDs is %(obs_id_sample)s.',
+                {
+                    'course_id': course_id,
+                    'num_missing_ids': len(missing_user_ids),
+                    'obs_id_sample': missing_user_ids[0:5],
+                }
+            )
+
+        if status_filters is None or 'not_started' in status_filters:
+            for (obscured_id, user) in obscured_user_ids_to_users.items():
+                # remaining learners that are not represented in the API response
+                # have not started onboarding
                 data = {
                     'username': user.username,
                     'enrollment_mode': enrollment_modes_by_user_id.get(user.id),
-                    'status': VerificientOnboardingProfileStatus.get_instructor_status_from_profile_status(
-                        onboarding_status
-                    ),
+                    'status': InstructorDashboardOnboardingAttemptStatus.not_started,
                     'modified': None,
+                    'user_id': user.id,
                 }
                 onboarding_data.append(data)
-                del obscured_user_ids_to_users[obscured_id]
 
-            if missing_user_ids:
-                LOG.warning(
-                    'Users are present in response whose obscured user IDs do not exist in list of learners '
-                    'enrolled in course %(course_id)s with proctoring eligible enrollments. There are a total '
-                    'of %(num_missing_ids)s of these. A sample of these IDs is %(obs_id_sample)s.',
-                    {
-                        'course_id': course_id,
-                        'num_missing_ids': len(missing_user_ids),
-                        'obs_id_sample': missing_user_ids[0:5],
-                    }
-                )
-
-            if status_filters is None or 'not_started' in status_filters:
-                for (obscured_id, user) in obscured_user_ids_to_users.items():
-                    # remaining learners that are not represented in the API response
-                    # have not started onboarding
-                    data = {
-                        'username': user.username,
-                        'enrollment_mode': enrollment_modes_by_user_id.get(user.id),
-                        'status': InstructorDashboardOnboardingAttemptStatus.not_started,
-                        'modified': None,
-                    }
-                    onboarding_data.append(data)
-        else:
-            onboarding_data = self._get_onboarding_info_no_onboarding_api(
-                course_id,
-                onboarding_exam,
-                users,
-                enrollment_modes_by_user_id,
-            )
-            onboarding_data = self._filter_onboarding_data_by_status_filters(onboarding_data, status_filters)
-
-        query_params = self._get_query_params(text_search, status_filters)
         paginated_data = self._paginate_data(onboarding_data, data_page, onboarding_exam.course_id, query_params)
 
-        # add modified time to each user in the paginated data, as Verificient's API does not currently return this data
+        # add modified time to each user in the paginated data, as Verificient's API does not currently return this
+        # data. Once the onboarding provider has included a modified date in their payload, this can be removed.
         results = paginated_data['results']
-        response_users = [get_user_model().objects.get(username=user['username']) for user in results]
-        response_onboarding_data = self._get_onboarding_info_no_onboarding_api(
-            course_id,
-            onboarding_exam,
-            response_users,
-            enrollment_modes_by_user_id
+        modified_by_user_id = dict(
+            self._get_onboarding_status_queryset(
+                course_id,
+                onboarding_exam.backend,
+                [user['user_id'] for user in results],
+            ).values_list('id', 'onboarding_modified')
         )
-
-        # Get modified date for each learner. Once the onboarding provider has included
-        # a modified date in their payload, this can be removed.
-        modified_dict = {}
-        for attempt in response_onboarding_data:
-            username = attempt['username']
-            modified_dict[username] = attempt['modified']
-
         for user in results:
-            user['modified'] = modified_dict[user['username']]
+            user['modified'] = modified_by_user_id.get(user.pop('user_id'))
 
         paginated_data['results'] = results
         paginated_data['use_onboarding_profile_api'] = use_onboarding_profile_api
 
         return Response(paginated_data)
 
-    def _get_onboarding_info_no_onboarding_api(self, course_id, onboarding_exam, users, enrollment_modes_by_user_id):
+    def _get_onboarding_status_queryset(self, course_id, backend, user_ids, statuses=None):
         """
-        Get the onboarding data for a list of users without using the proctoring provider's onboarding API.
-        This is used as fallback behavior either when the ONBOARDING_PROFILE_INSTRUCTOR_DASHBOARD_API waffle
-        flag is not enabled or when the aforementioned flag is enabled but the API call fails.
+        Build a queryset of the given users annotated with their onboarding status, as should be
+        displayed by the Instructor Dashboard, and the time that status was last modified.
+        This is used either when the ONBOARDING_PROFILE_INSTRUCTOR_DASHBOARD_API waffle flag is not
+        enabled or to complete the data returned by the proctoring provider's onboarding API.
+
+        For each learner, the relevant onboarding attempt in the course is a verified attempt if one
+        exists, otherwise the most recent attempt that was not reset. A learner who has no verified
+        attempt in this course, but was verified for the same backend elsewhere, is reported as
+        approved in another course.
 
         Parameters:
         * course_id: the course ID of the course
-        * onboarding_exam: the ProctoredExam object representing the onboarding exam in the course
-        * users: a list of users for whom we should return onboarding profile data
-        * enrollment_modes_by_user_id: a mapping between users and their enrollment mode in the course
+        * backend: the name of the backend of the onboarding exam in the course
+        * user_ids: the ids of the users for whom we should return onboarding data, either a list or a
+          values queryset of ids
+        * statuses: optional list of InstructorDashboardOnboardingAttemptStatus statuses to filter by
+
+        Returns a values queryset with the keys id, username, onboarding_status and onboarding_modified.
         """
-        # get onboarding attempts for users for the course
         onboarding_attempts = ProctoredExamStudentAttempt.objects.get_proctored_practice_attempts_by_course_id(
-            course_id,
-            users
-        ).values('user_id', 'status', 'modified', 'id')
-
-        # get all of the last verified onboarding attempts of these users
-        last_verified_attempt_dict = get_last_verified_onboarding_attempts_per_user(
-            users,
-            onboarding_exam.backend,
+            course_id
+        ).filter(user_id=OuterRef('pk')).order_by(
+            Case(When(status=ProctoredExamStudentAttemptStatus.verified, then=0), default=1),
+            Case(When(status=ProctoredExamStudentAttemptStatus.onboarding_reset, then=1), default=0),
+            '-modified',
+            '-id',
+        )
+        verifications = OnboardingVerification.objects.filter(
+            user_id=OuterRef('pk'), backend=backend, expires_at__gt=datetime.now(pytz.UTC),
+            verified_attempt__isnull=False,
         )
 
-        # select a verified, or most recent, exam attempt per user
-        onboarding_attempts_per_user = self._get_relevant_attempt_per_user(onboarding_attempts)
-        onboarding_data = []
-        for user in users:
-            user_attempt = onboarding_attempts_per_user.get(user.id, {})
-            other_verified_attempt = last_verified_attempt_dict.get(user.id)
-
-            data = {
-                'username': user.username,
-                'enrollment_mode': enrollment_modes_by_user_id.get(user.id),
-            }
-
-            if (
-                other_verified_attempt and
-                (
-                    not user_attempt or
-                    (user_attempt and user_attempt.get('status') != ProctoredExamStudentAttemptStatus.verified)
-                )
-            ):
-                data['status'] = InstructorDashboardOnboardingAttemptStatus.other_course_approved
-                data['modified'] = other_verified_attempt.modified
-            else:
-                attempt_status = user_attempt.get('status')
+        is_other_course_approved = (
+            Q(other_verified_modified__isnull=False) &
+            (Q(attempt_status__isnull=True) | ~Q(attempt_status=ProctoredExamStudentAttemptStatus.verified))
+        )
+        attempt_status_mapping = [
+            When(attempt_status=attempt_status, then=Value(onboarding_status))
+            for attempt_status, onboarding_status
+            in InstructorDashboardOnboardingAttemptStatus.onboarding_statuses.items()
+        ]
 
+        queryset = get_user_model().objects.filter(id__in=user_ids).annotate(
+            attempt_status=Subquery(onboarding_attempts.values('status')[:1]),
+            attempt_modified=Subquery(onboarding_attempts.values('modified')[:1]),
+            other_verified_modified=Subquery(verifications.values('verified_at')[:1]),
+        ).annotate(
+            onboarding_status=Case(
+                When(
+                    is_other_course_approved,
+                    then=Value(InstructorDashboardOnboardingAttemptStatus.other_course_approved),
+                ),
                 # If the learner's most recent attempt is in the "onboarding_reset" state,
                 # return the onboarding_reset_past_due state.
                 # This is a consequence of a bug in our software that allows a learner to end up
@@ -1072,43 +1204,27 @@ class StudentOnboardingStatusByCourseView(ProctoredAPIView):
                 # The learner should not end up in this state, but while we work on a fix, we should not
                 # display "null" in the Instructor Dashboard Student Onboarding Panel.
                 # TODO: remove as part of MST-745
-                if user_attempt.get('status') == ProctoredExamStudentAttemptStatus.onboarding_reset:
-                    onboarding_status = InstructorDashboardOnboardingAttemptStatus.onboarding_reset_past_due
-                else:
-                    onboarding_status = \
-                        InstructorDashboardOnboardingAttemptStatus.get_onboarding_status_from_attempt_status(
-                            attempt_status
-                        )
-
-                data['status'] = onboarding_status
-                data['modified'] = user_attempt.get('modified')
-
-            onboarding_data.append(data)
-
-        return onboarding_data
-
-    def _filter_onboarding_data_by_status_filters(self, onboarding_data, status_filters):
-        """
-        Filter the list of dictionaries onboarding_data by status_filters.
-
-        Parameters:
-        * onboarding_data: a list of dictionaries representing learners's onboarding profile information
-        * status_filters: a comma separated list of statuses to filter onboarding_data by
-        """
-        # filter the data by status filter
-        # we filter late than the text_search because users without exam attempts
-        # will have an onboarding status of "not_started", and we want to be
-        # able to filter on that status
-        filtered_onboarding_data = onboarding_data
-        if status_filters:
-            statuses = set(status_filters.split(','))
-            filtered_onboarding_data = [
-                data for data
-                in onboarding_data
-                if data['status'] in statuses
-            ]
-
-        return filtered_onboarding_data
+                When(
+                    attempt_status=ProctoredExamStudentAttemptStatus.onboarding_reset,
+                    then=Value(InstructorDashboardOnboardingAttemptStatus.onboarding_reset_past_due),
+                ),
+                When(
+                    attempt_status__isnull=True,
+                    then=Value(InstructorDashboardOnboardingAttemptStatus.not_started),
+                ),
+                *attempt_status_mapping,
+                default=None,
+                output_field=CharField(),
+            ),
+            onboarding_modified=Case(
+                When(is_other_course_approved, then=F('other_verified_modified')),
+                default=F('attempt_modified'),
+                output_field=DateTimeField(),
+            ),
+        )
+        if statuses:
+            queryset = queryset.filter(onboarding_status__in=statuses)
+        return queryset.order_by('id').values('id', 'username', 'onboarding_status', 'onboarding_modified')
 
     def _get_query_params(self, text_search, status_filters):
         """
@@ -1126,41 +1242,13 @@ class StudentOnboardingStatusByCourseView(ProctoredAPIView):
             query_params['statuses'] = status_filters
         return query_params
 
-    def _get_relevant_attempt_per_user(self, attempts):
-        """
-        Given an ordered list of attempts, return, for each learner, their most recent
-        exam attempt. If the learner has a verified attempt, always return verified.
-        If possible, do not return a reset attempt.
-        Parameters:
-        * attempts: an iterable of attempt objects
-        """
-        onboarding_attempts_per_user = {}
-
-        for attempt in attempts:
-            existing_attempt = onboarding_attempts_per_user.get(attempt['user_id'])
-
-            if existing_attempt:
-                # Always return a verified attempt if it exists.
-                if attempt['status'] == ProctoredExamStudentAttemptStatus.verified:
-                    onboarding_attempts_per_user[attempt['user_id']] = attempt
-                # Always return a non reset attempt if its ID is greater
-                if (
-                    existing_attempt['status'] == ProctoredExamStudentAttemptStatus.onboarding_reset
-                    and existing_attempt['id'] < attempt['id']
-                ):
-                    onboarding_attempts_per_user[attempt['user_id']] = attempt
-            else:
-                onboarding_attempts_per_user[attempt['user_id']] = attempt
-
-        return onboarding_attempts_per_user
-
     def _paginate_data(self, data, page_number, course_id, query_params):
         """
         Given data and a page number, return the page of data requested by the page number,
         along with pagination metadata.
 
         Parameters:
-        * data: the data to be paginated
+        * data: the data to be paginated, either a list or a queryset
         * page_number: the page number requested
         * course_id: the course ID associated with the data; this is used to generate next and previous links
         """
@@ -1168,7 +1256,7 @@ class StudentOnboardingStatusByCourseView(ProctoredAPIView):
         data_page = paginator.get_page(page_number)
 
         return {
-            'count': len(data),
+            'count': paginator.count,
             'previous': self._get_url(
                 course_id, **query_params, page=data_page.number-1
                 ) if data_page.has_previous() else None,
@@ -1193,9 +1281,10 @@ class StudentOnboardingStatusByCourseView(ProctoredAPIView):
         query_string = urlencode(kwargs)
         return url + '?' + query_string
 
-    def _get_onboarding_info(self, backend, course_id, status_filters):
+    def _get_onboarding_info(self, backend, backend_name, course_id, status_filters):
         """
-        Get a list of all onboarding profiles from the proctoring provider
+        Get a list of all onboarding profiles from the proctoring provider, requesting all their
+        pages concurrently, or from the cache when they were requested recently
         """
         http_error = None
         results = []
@@ -1222,10 +1311,13 @@ class StudentOnboardingStatusByCourseView(ProctoredAPIView):
             }
         )
         try:
-            request = backend.get_onboarding_profile_info(
-                course_id, **onboarding_profile_kwargs
+            profiles = get_cached_onboarding_profiles(
+                backend_name,
+                course_id,
+                onboarding_profile_kwargs,
+                lambda: backend.get_all_onboarding_profiles(course_id, **onboarding_profile_kwargs),
             )
-            return request.get('results'), http_error
+            return profiles or [], http_error
         except BackendProviderOnboardingProfilesException as exc:
             http_error = exc
             # return on the earliest error
@@ -1566,33 +1658,40 @@ class StudentProctoredGroupedExamAttemptsByCourse(ProctoredAPIView):
         HTTP GET Handler.
         """
         if search_by is not None:
-            exam_attempts = ProctoredExamStudentAttempt.objects.get_filtered_exam_attempts(
-                course_id, search_by
-            )
             attempt_url = reverse('edx_proctoring:proctored_exam.attempts.grouped.search', args=[course_id, search_by])
         else:
-            exam_attempts = ProctoredExamStudentAttempt.objects.get_all_exam_attempts(
-                course_id
-            )
             attempt_url = reverse('edx_proctoring:proctored_exam.attempts.grouped.course', args=[course_id])
 
-        # get the most recent attempt for each unique user/exam combination
-        most_recent_attempts = list(self._get_first_exam_attempt_per_user(exam_attempts).values())
+        # the most recent attempt for each unique user/exam combination is selected by the database
+        most_recent_attempts = ProctoredExamStudentAttempt.objects.get_most_recent_exam_attempts(
+            course_id, search_by
+        )
 
         paginator = Paginator(most_recent_attempts, ATTEMPTS_PER_PAGE)
         page = request.GET.get('page')
         exam_attempts_page = paginator.get_page(page)
+        page_attempts = list(exam_attempts_page.object_list)
 
-        grouped_attempts = []
+        # load and serialize every attempt of the learners and exams on this page at once
+        all_attempts = serialize_attempts(ProctoredExamStudentAttempt.objects.get_attempts_for_user_exam_pairs(
+            {(attempt.user_id, attempt.proctored_exam_id) for attempt in page_attempts}
+        ))
+        attempts_per_user_exam = defaultdict(list)
+        attempts_by_id = {}
+        for serialized_attempt in all_attempts:
+            user_exam = (serialized_attempt['user']['id'], serialized_attempt['proctored_exam']['id'])
+            attempts_per_user_exam[user_exam].append(serialized_attempt)
+            attempts_by_id[serialized_attempt['id']] = serialized_attempt
 
-        for attempt in exam_attempts_page.object_list:
-            # serialize data
-            serialized_attempt = ProctoredExamStudentAttemptSerializer(attempt).data
-            user_id = serialized_attempt['user']['id']
-            exam_id = serialized_attempt['proctored_exam']['id']
-            # add all attempts that aren't the most recently created
-            grouped_past_attempts = get_user_attempts_by_exam_id(user_id, exam_id)
-            serialized_attempt['all_attempts'] = grouped_past_attempts
+        grouped_attempts = []
+        for attempt in page_attempts:
+            if attempt.id in attempts_by_id:
+                # copied, since the attempt is also one of its own all_attempts
+                serialized_attempt = dict(attempts_by_id[attempt.id])
+            else:
+                # deleted since the page was loaded
+                serialized_attempt = ProctoredExamStudentAttemptSerializer(attempt).data
+            serialized_attempt['all_attempts'] = attempts_per_user_exam[(attempt.user_id, attempt.proctored_exam_id)]
             grouped_attempts.append(serialized_attempt)
 
         response_data = {
@@ -1608,26 +1707,6 @@ class StudentProctoredGroupedExamAttemptsByCourse(ProctoredAPIView):
         }
         return Response(response_data)
 
-    def _get_first_exam_attempt_per_user(self, attempts):
-        """
-        Given attempts, return, for each learner, their most recent exam attempt on each exam.
-
-        Parameters:
-        * attempts: an iterable of attempt objects, sorted by most recently created
-        """
-        exam_attempts_per_user = {}
-        for attempt in attempts:
-            # use unique combination of user id and exam id
-            user_exam_key = str(attempt.user_id) + "-" + str(attempt.proctored_exam_id)
-            existing_attempt = exam_attempts_per_user.get(user_exam_key)
-
-            # we know that the first time we encounter a unique user_exam key, it will
-            # be for the most recent attempt
-            if not existing_attempt:
-                exam_attempts_per_user[user_exam_key] = attempt
-
-        return exam_attempts_per_user
-
 
 class ExamAllowanceView(ProctoredAPIView):
     """
@@ -1822,6 +1901,68 @@ class GroupedExamAllowancesByStudent(ProctoredAPIView):
         return Response(response_data)
 
 
+class PagedExamAllowancesByStudent(ProctoredAPIView):
+    """
+    Endpoint for the allowances of a course grouped by student, one page of students at a time
+    /edx_proctoring/v1/proctored_exam/{course_id}/grouped/allowance/paged?search={}&cursor={}
+
+    Supports:
+        HTTP GET: return information about learners' allowances
+
+    **Expected Parameters**
+        * course_id: The unique identifier for the course.
+        * search: Optional. Only return the students whose username starts with this prefix.
+        * cursor: Optional. The username after which the page starts, as found in the `next` link.
+
+    **Expected Response**
+        HTTP GET:
+            The response will contain a dictionary with the following keys:
+            * results: a list of dictionaries, one per student ordered by username, with the keys
+                * username: the username of the student
+                * allowances: the serialized allowances of the student, as returned by
+                  GroupedExamAllowancesByStudent
+            * next: a link to the next page of students, if it exists - None otherwise
+
+    **Exceptions**
+        HTTP GET:
+            * 403 if the requesting user is not staff or course staff for the course associated with
+            the supplied course ID
+    """
+    @method_decorator(require_course_or_global_staff)
+    def get(self, request, course_id):
+        """
+        HTTP GET Handler.
+        """
+        search = request.GET.get('search')
+        users = list(ProctoredExamStudentAllowance.get_users_with_allowances_for_course(
+            course_id, username_prefix=search, after_username=request.GET.get('cursor')
+        )[:ALLOWANCE_USERS_PER_PAGE + 1])
+        has_next = len(users) > ALLOWANCE_USERS_PER_PAGE
+        users = users[:ALLOWANCE_USERS_PER_PAGE]
+
+        allowances_per_user = {user_id: [] for user_id, _ in users}
+        for allowance in ProctoredExamStudentAllowance.get_allowances_for_course(
+            course_id, user_ids=allowances_per_user
+        ).order_by('id'):
+            allowances_per_user[allowance.user_id].append(ProctoredExamStudentAllowanceSerializer(allowance).data)
+
+        next_url = None
+        if has_next:
+            query_params = {'cursor': users[-1][1]}
+            if search:
+                query_params['search'] = search
+            next_url = reverse(
+                'edx_proctoring:proctored_exam.allowance.grouped.course.paged', kwargs={'course_id': course_id}
+            ) + '?' + urlencode(query_params)
+
+        return Response({
+            'results': [
+                {'username': username, 'allowances': allowances_per_user[user_id]} for user_id, username in users
+            ],
+            'next': next_url,
+        })
+
+
 class ActiveExamsForUserView(ProctoredAPIView):
     """
     Endpoint for the Active Exams for a user.
@@ -1901,6 +2042,7 @@ class BaseReviewCallback:
     Base class for review callbacks.
     make_review handles saving reviews and review comments.
     """
+    @instrumented('make_review')
     def make_review(self, attempt, data, backend=None):
         """
         Save the review and review comments
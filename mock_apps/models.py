@@ -11,3 +11,12 @@ class Profile(models.Model):
     """
     user = models.OneToOneField(get_user_model(), on_delete=models.CASCADE)
     name = models.CharField(max_length=100)
+
+
+class CourseEnrollment(models.Model):
+    """
+    .. no_pii: Mock course enrollment
+    """
+    user = models.ForeignKey(get_user_model(), on_delete=models.CASCADE)
+    course_id = models.CharField(max_length=255)
+    mode = models.CharField(max_length=100)